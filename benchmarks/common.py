@@ -0,0 +1,40 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks are plain scripts, run from the repository root as modules, e.g.::
+
+    python -m benchmarks.headers
+
+"""
+
+import gc
+import timeit
+import tracemalloc
+import typing
+
+
+def measure(
+    label: str, func: typing.Callable[[], typing.Any], number: int = 10000
+) -> typing.Tuple[float, int]:
+    """Times a function and measures the memory it allocates per call.
+
+    Prints and returns the mean time per call in microseconds and the mean
+    number of bytes allocated per call.
+
+    """
+    func()
+    elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        calls = max(1, number // 10)
+        results = [func() for _ in range(calls)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    allocated = (after - before) // calls
+
+    print("{:<50} {:>10.2f} us {:>10} B".format(label, elapsed, allocated))
+    return elapsed, allocated
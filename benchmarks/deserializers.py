@@ -0,0 +1,87 @@
+"""Compares the memory allocated unmarshalling multi-megabyte binary uploads,
+with deserializers slicing the body as bytes and as a memoryview."""
+
+import typing
+
+import msgpack  # type: ignore[import-untyped]
+import openapi_core
+import tornado.httputil
+
+from tornado_openapi3.deserializers import MsgpackDeserializer, buffered
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+from benchmarks.common import measure
+
+
+def frame_sizes(value: typing.Union[bytes, memoryview]) -> typing.List[int]:
+    sizes = []
+    while value:
+        size = int.from_bytes(value[:4], "big")
+        sizes.append(len(value[4 : 4 + size]))
+        value = value[4 + size :]
+    return sizes
+
+
+def spec(deserializers: dict) -> openapi_core.OpenAPI:
+    return openapi_core.OpenAPI.from_dict(
+        {
+            "openapi": "3.0.0",
+            "info": {"title": "Benchmark", "version": "1.0.0"},
+            "paths": {
+                "/upload": {
+                    "post": {
+                        "requestBody": {
+                            "content": {
+                                content_type: {"schema": {}}
+                                for content_type in deserializers
+                            }
+                        },
+                        "responses": {"200": {"description": "Success"}},
+                    }
+                }
+            },
+        },
+        config=openapi_core.Config(extra_media_type_deserializers=deserializers),
+    )
+
+
+def upload(content_type: str, body: bytes) -> tornado.httputil.HTTPServerRequest:
+    return tornado.httputil.HTTPServerRequest(
+        method="POST",
+        uri="/upload",
+        headers=tornado.httputil.HTTPHeaders({"Content-Type": content_type}),
+        body=body,
+    )
+
+
+def main() -> None:
+    for megabytes in (1, 8):
+        print("{} MB".format(megabytes))
+        frame = b"x" * 65536
+        body = (len(frame).to_bytes(4, "big") + frame) * (megabytes * 16)
+        request = upload("application/x-frames", body)
+        for label, deserializer in (
+            ("frames, sliced as bytes", frame_sizes),
+            ("frames, sliced as a memoryview", buffered(frame_sizes)),
+        ):
+            compiled = spec({"application/x-frames": deserializer})
+            measure(
+                "  {}".format(label),
+                lambda: unmarshal_request(compiled, TornadoOpenAPIRequest(request)),
+                number=10,
+            )
+        request = upload(
+            "application/msgpack",
+            msgpack.packb([b"x" * 65536] * (megabytes * 16)),
+        )
+        compiled = spec({"application/msgpack": MsgpackDeserializer()})
+        measure(
+            "  msgpack",
+            lambda: unmarshal_request(compiled, TornadoOpenAPIRequest(request)),
+            number=10,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compares unmarshalling bodies of ``oneOf`` schemas with many alternatives,
+with and without a discriminator to select between them."""
+
+import json
+
+import openapi_core
+import tornado.httputil
+
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+from benchmarks.common import measure
+
+
+def spec(variants: int, discriminated: bool) -> openapi_core.OpenAPI:
+    schema: dict = {
+        "oneOf": [
+            {"$ref": "#/components/schemas/Variant{}".format(index)}
+            for index in range(variants)
+        ]
+    }
+    if discriminated:
+        schema["discriminator"] = {"propertyName": "type"}
+    return openapi_core.OpenAPI.from_dict(
+        {
+            "openapi": "3.0.0",
+            "info": {"title": "Benchmark", "version": "1.0.0"},
+            "paths": {
+                "/events": {
+                    "post": {
+                        "requestBody": {
+                            "content": {"application/json": {"schema": schema}}
+                        },
+                        "responses": {"200": {"description": "Success"}},
+                    }
+                }
+            },
+            "components": {
+                "schemas": {
+                    "Variant{}".format(index): {
+                        "type": "object",
+                        "required": ["type", "value"],
+                        "properties": {
+                            "type": {
+                                "type": "string",
+                                "enum": ["Variant{}".format(index)],
+                            },
+                            "value": {"type": "integer"},
+                        },
+                    }
+                    for index in range(variants)
+                }
+            },
+        }
+    )
+
+
+def main() -> None:
+    for variants in (5, 30, 100):
+        print("{} variants".format(variants))
+        request = tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/events",
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=json.dumps(
+                {"type": "Variant{}".format(variants - 1), "value": 1}
+            ).encode(),
+        )
+        for label, discriminated in (
+            ("without a discriminator", False),
+            ("with a discriminator", True),
+        ):
+            compiled = spec(variants, discriminated)
+            measure(
+                "  {}".format(label),
+                lambda: unmarshal_request(compiled, TornadoOpenAPIRequest(request)),
+                number=100,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compares serializing a large specification document for every request with
+serving one serialized ahead of time."""
+
+import json
+
+from tornado_openapi3.documents import SpecDocument
+
+from benchmarks.common import measure
+
+spec_dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Benchmark", "version": "1.0.0"},
+    "paths": {
+        "/resources{}".format(index): {
+            "get": {
+                "parameters": [
+                    {"name": "page", "in": "query", "schema": {"type": "integer"}}
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Success",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "name": {"type": "string"},
+                                        "tags": {
+                                            "type": "array",
+                                            "items": {"type": "string"},
+                                        },
+                                    },
+                                }
+                            }
+                        },
+                    }
+                },
+            }
+        }
+        for index in range(500)
+    },
+}
+
+
+def main() -> None:
+    document = SpecDocument(spec_dict)
+    measure("re-serializing the document", lambda: json.dumps(spec_dict), number=100)
+    measure(
+        "serving a serialized document",
+        lambda: document.representation("json", "gzip, deflate, br"),
+        number=100,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compares validating large form posts with and without reusing the arguments
+Tornado parsed from them."""
+
+import urllib.parse
+
+import openapi_core
+import tornado.httputil
+
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+from benchmarks.common import measure
+
+spec = openapi_core.OpenAPI.from_dict(
+    {
+        "openapi": "3.0.0",
+        "info": {"title": "Benchmark", "version": "1.0.0"},
+        "paths": {
+            "/form": {
+                "post": {
+                    "requestBody": {
+                        "content": {
+                            "application/x-www-form-urlencoded": {
+                                "schema": {
+                                    "type": "object",
+                                    "additionalProperties": {"type": "string"},
+                                }
+                            }
+                        }
+                    },
+                    "responses": {"200": {"description": "Success"}},
+                }
+            }
+        },
+    }
+)
+
+
+def form_post(fields: int, parsed: bool) -> tornado.httputil.HTTPServerRequest:
+    request = tornado.httputil.HTTPServerRequest(
+        method="POST",
+        uri="/form",
+        headers=tornado.httputil.HTTPHeaders(
+            {"Content-Type": "application/x-www-form-urlencoded"}
+        ),
+        body=urllib.parse.urlencode(
+            {"field-{}".format(index): "value " * 20 for index in range(fields)}
+        ).encode(),
+    )
+    if parsed:
+        request._parse_body()
+    return request
+
+
+def main() -> None:
+    for fields in (10, 100, 1000):
+        print("{} fields".format(fields))
+        for label, parsed in (
+            ("re-parsing the body", False),
+            ("reusing parsed arguments", True),
+        ):
+            request = form_post(fields, parsed)
+            measure(
+                "  {}".format(label),
+                lambda: unmarshal_request(spec, TornadoOpenAPIRequest(request)),
+                number=100,
+            )
+
+
+if __name__ == "__main__":
+    main()
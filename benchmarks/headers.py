@@ -0,0 +1,47 @@
+"""Compares adapting header-heavy requests and responses with and without
+copying their headers."""
+
+import io
+
+import tornado.httpclient
+import tornado.httputil
+from werkzeug.datastructures import Headers
+
+from tornado_openapi3.headers import TornadoHeaders
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.responses import TornadoOpenAPIResponse
+
+from benchmarks.common import measure
+
+
+def header_heavy(count: int) -> tornado.httputil.HTTPHeaders:
+    headers = tornado.httputil.HTTPHeaders()
+    headers.add("Content-Type", "application/json")
+    headers.add("Authorization", "Bearer secret")
+    for index in range(count):
+        headers.add("X-Header-{}".format(index), "value-{}".format(index))
+        headers.add("X-Forwarded-For", "10.0.0.{}".format(index % 256))
+    return headers
+
+
+def main() -> None:
+    for count in (10, 50, 200):
+        headers = header_heavy(count)
+        request = tornado.httputil.HTTPServerRequest(
+            method="POST", uri="/resource", headers=headers, body=b"{}"
+        )
+        response = tornado.httpclient.HTTPResponse(
+            tornado.httpclient.HTTPRequest("http://localhost/resource"),
+            200,
+            headers=headers,
+            buffer=io.BytesIO(b"{}"),
+        )
+        print("{} headers".format(len(list(headers.get_all()))))
+        measure("  werkzeug Headers copy", lambda: Headers(headers.get_all()))
+        measure("  TornadoHeaders view", lambda: TornadoHeaders(headers))
+        measure("  TornadoOpenAPIRequest", lambda: TornadoOpenAPIRequest(request))
+        measure("  TornadoOpenAPIResponse", lambda: TornadoOpenAPIResponse(response))
+
+
+if __name__ == "__main__":
+    main()
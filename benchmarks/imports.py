@@ -0,0 +1,35 @@
+"""Compares the time taken to import the package, its handlers and
+openapi-core in fresh interpreters."""
+
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    ("interpreter startup", "pass"),
+    ("import tornado_openapi3", "import tornado_openapi3"),
+    ("import tornado_openapi3.handler", "import tornado_openapi3.handler"),
+    ("import tornado_openapi3.metrics", "import tornado_openapi3.metrics"),
+    ("import openapi_core", "import openapi_core"),
+    ("import tornado_openapi3.operations", "import tornado_openapi3.operations"),
+]
+
+
+def import_time(statement: str, repeat: int = 5) -> float:
+    """Returns the fastest time, in milliseconds, to run a statement in a new
+    interpreter."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - started)
+    return min(times) * 1e3
+
+
+def main() -> None:
+    for label, statement in STATEMENTS:
+        print("{:<50} {:>10.2f} ms".format(label, import_time(statement)))
+
+
+if __name__ == "__main__":
+    main()
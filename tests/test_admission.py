@@ -0,0 +1,167 @@
+import asyncio
+import unittest
+
+import tornado.httpclient
+import tornado.tcpclient
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.admission import AdmissionController, Overloaded
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.metrics import MetricsStore
+from tornado_openapi3.operations import OperationPolicy
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        path: {
+            method: {
+                "operationId": path.strip("/"),
+                "x-priority": priority,
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+        for path, method, priority in (
+            ("/slow", "get", "high"),
+            ("/report", "get", "low"),
+            ("/health", "get", "critical"),
+            ("/upload", "post", "normal"),
+        )
+    },
+}
+
+
+class ControllerTests(unittest.TestCase):
+    def test_in_flight(self) -> None:
+        controller = AdmissionController(max_in_flight=4)
+        low, high = OperationPolicy(priority="low"), OperationPolicy(priority="high")
+        self.assertIsNone(controller.admit(low, 0))
+        self.assertIsNone(controller.admit(low, 0))
+        overloaded = controller.admit(low, 0)
+        self.assertIsInstance(overloaded, Overloaded)
+        self.assertEqual("Server overloaded: 2 requests in flight", str(overloaded))
+        self.assertIsNone(controller.admit(high, 0))
+        self.assertIsNone(controller.admit(high, 0))
+        self.assertIsNotNone(controller.admit(high, 0))
+        self.assertIsNone(controller.admit(OperationPolicy(priority="critical"), 0))
+        self.assertEqual(5, controller.in_flight)
+        self.assertEqual(2, controller.rejected)
+        controller.release()
+        self.assertEqual(4, controller.in_flight)
+
+    def test_queue_time(self) -> None:
+        controller = AdmissionController(max_queue_time=1.0, retry_after=5)
+        overloaded = controller.admit(OperationPolicy(), 0.9)
+        assert overloaded is not None
+        self.assertEqual(5, overloaded.retry_after)
+        self.assertEqual("queued for 0.900s", overloaded.reason)
+        self.assertIsNone(controller.admit(OperationPolicy(priority="high"), 0.9))
+        self.assertIsNone(controller.admit(OperationPolicy(), 0.5))
+
+
+class HandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        self.controller = AdmissionController(
+            max_in_flight=2, max_queue_time=0.05, retry_after=3
+        )
+        self.metrics = MetricsStore()
+        self.release = asyncio.Event()
+        release = self.release
+
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+            async def prepare(self) -> None:
+                if "X-Delay" in self.request.headers:
+                    await asyncio.sleep(0.1)
+                await super().prepare()
+
+            async def get(self) -> None:
+                if self.request.path == "/slow":
+                    await release.wait()
+                self.finish("done")
+
+            post = get
+
+        return tornado.web.Application(
+            [(r".*", Handler)],
+            openapi_admission_controller=self.controller,
+            openapi_metrics=self.metrics,
+        )
+
+    async def wait_for_in_flight(self, count: int) -> None:
+        while self.controller.in_flight != count:
+            await asyncio.sleep(0.001)
+
+    @tornado.testing.gen_test
+    async def test_load_shedding(self) -> None:
+        client = tornado.httpclient.AsyncHTTPClient()
+        slow = client.fetch(self.get_url("/slow"))
+        await self.wait_for_in_flight(1)
+
+        response = await client.fetch(self.get_url("/report"), raise_error=False)
+        self.assertEqual(503, response.code)
+        self.assertEqual("3", response.headers["Retry-After"])
+        self.assertEqual(1, self.metrics.operation("report").errors[-1])
+        self.assertEqual(
+            200, (await client.fetch(self.get_url("/health"), raise_error=False)).code
+        )
+        self.assertEqual(
+            404, (await client.fetch(self.get_url("/missing"), raise_error=False)).code
+        )
+
+        self.release.set()
+        self.assertEqual(b"done", (await slow).body)
+        self.assertEqual(0, self.controller.in_flight)
+        response = await client.fetch(self.get_url("/report"), raise_error=False)
+        self.assertEqual(200, response.code)
+
+    @tornado.testing.gen_test
+    async def test_slow_handlers(self) -> None:
+        client = tornado.httpclient.AsyncHTTPClient()
+        requests = [
+            client.fetch(self.get_url("/slow"), raise_error=False) for _ in range(5)
+        ]
+        while self.controller.in_flight + self.controller.rejected < 5:
+            await asyncio.sleep(0.001)
+        self.assertEqual(2, self.controller.in_flight)
+        self.release.set()
+        codes = sorted(response.code for response in await asyncio.gather(*requests))
+        self.assertEqual([200, 200, 503, 503, 503], codes)
+        self.assertEqual(3, self.controller.rejected)
+        self.assertEqual(0, self.controller.in_flight)
+
+    @tornado.testing.gen_test
+    async def test_closed_connections(self) -> None:
+        stream = await tornado.tcpclient.TCPClient().connect(
+            "127.0.0.1", self.get_http_port()
+        )
+        await stream.write(b"GET /slow HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await self.wait_for_in_flight(1)
+        stream.close()
+        await self.wait_for_in_flight(0)
+        self.release.set()
+        await asyncio.sleep(0.01)
+        self.assertEqual(0, self.controller.in_flight)
+
+    @tornado.testing.gen_test
+    async def test_queue_time(self) -> None:
+        client = tornado.httpclient.AsyncHTTPClient()
+        response = await client.fetch(
+            self.get_url("/report"), headers={"X-Delay": "1"}, raise_error=False
+        )
+        self.assertEqual(503, response.code)
+
+        # Time spent receiving the body is not spent waiting.
+        stream = await tornado.tcpclient.TCPClient().connect(
+            "127.0.0.1", self.get_http_port()
+        )
+        await stream.write(
+            b"POST /upload HTTP/1.1\r\nHost: localhost\r\nContent-Length: 4\r\n\r\n"
+        )
+        await asyncio.sleep(0.1)
+        await stream.write(b"body")
+        status = await stream.read_until(b"\r\n")
+        stream.close()
+        self.assertEqual(b"HTTP/1.1 200 OK\r\n", status)
@@ -0,0 +1,364 @@
+import contextlib
+import io
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+
+from tornado_openapi3.analysis import Finding, Report, Thresholds, analyze, main
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "servers": [
+        {"url": "https://{host}/v1", "variables": {"host": {"default": "example.com"}}}
+    ],
+    "security": [{"key": []}],
+    "paths": {
+        "/users/{id}": {
+            "parameters": [
+                {
+                    "name": "id",
+                    "in": "path",
+                    "required": True,
+                    "schema": {"type": "string", "pattern": "^(a+)+$"},
+                }
+            ],
+            "get": {
+                "operationId": "getUser",
+                "parameters": [
+                    {"$ref": "#/components/parameters/Tags"},
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "explode": False,
+                        "schema": {"type": "array", "items": {"type": "string"}},
+                    },
+                    {
+                        "name": "filter",
+                        "in": "query",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {"active": {"type": "boolean"}},
+                                }
+                            }
+                        },
+                    },
+                    {
+                        "name": "X-Trace",
+                        "in": "header",
+                        "required": True,
+                        "schema": {"type": "string", "format": "uuid"},
+                    },
+                    {
+                        "name": "session",
+                        "in": "cookie",
+                        "required": True,
+                        "schema": {"type": "string", "minLength": 3},
+                    },
+                ],
+                "responses": {"200": {"description": "User"}},
+            },
+        },
+        "/users/me": {
+            "put": {
+                "security": [{"basic": []}],
+                "requestBody": {"$ref": "#/components/requestBodies/User"},
+                "responses": {"200": {"description": "Updated"}},
+            }
+        },
+        "/{a}/{b}": {
+            "parameters": [
+                {"name": "a", "in": "path", "required": True, "schema": {}},
+                {"name": "b", "in": "path", "required": True, "schema": {}},
+            ],
+            "get": {
+                "security": [{"bearer": [], "query": [], "cookie": []}],
+                "responses": {"200": {"description": "Anything"}},
+            },
+        },
+        "/forms": {
+            "servers": [{"url": "/forms-api"}],
+            "post": {
+                "security": [],
+                "requestBody": {
+                    "content": {
+                        "application/x-www-form-urlencoded": {
+                            "schema": {
+                                "type": "object",
+                                "required": ["count", "ratio", "flag"],
+                                "properties": {
+                                    "count": {"type": "integer", "minimum": 2},
+                                    "ratio": {"type": "number"},
+                                    "flag": {"type": "boolean"},
+                                    "size": {"$ref": "#/components/schemas/Size"},
+                                },
+                            }
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Posted"}},
+            },
+        },
+        "/notes": {
+            "post": {
+                "security": [],
+                "requestBody": {
+                    "content": {
+                        "text/plain": {"schema": {"type": "string", "example": "hi"}}
+                    }
+                },
+                "responses": {"200": {"description": "Posted"}},
+            }
+        },
+        "/remote": {
+            "post": {
+                "security": [],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Remote"}
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Posted"}},
+            }
+        },
+        "/": {
+            "delete": {
+                "security": [],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"type": "object", "required": ["missing"]}
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Deleted"}},
+            }
+        },
+    },
+    "components": {
+        "securitySchemes": {
+            "key": {"type": "apiKey", "in": "header", "name": "X-Key"},
+            "query": {"type": "apiKey", "in": "query", "name": "key"},
+            "cookie": {"type": "apiKey", "in": "cookie", "name": "key"},
+            "basic": {"type": "http", "scheme": "basic"},
+            "bearer": {"type": "http", "scheme": "bearer"},
+        },
+        "parameters": {
+            "Tags": {
+                "name": "tags",
+                "in": "query",
+                "schema": {
+                    "type": "array",
+                    "minItems": 2,
+                    "items": {"type": "string", "enum": ["a", "b", "c"]},
+                },
+            }
+        },
+        "requestBodies": {
+            "User": {
+                "content": {
+                    "application/json": {
+                        "schema": {"$ref": "#/components/schemas/User"}
+                    }
+                }
+            }
+        },
+        "schemas": {
+            "User": {
+                "allOf": [
+                    {"$ref": "#/components/schemas/Named"},
+                    {
+                        "type": "object",
+                        "properties": {
+                            "friends": {
+                                "type": "array",
+                                "items": {"$ref": "#/components/schemas/User"},
+                            },
+                            "pet": {"$ref": "#/components/schemas/Pet"},
+                            "nickname": {"type": "string", "pattern": "[a-z]"},
+                        },
+                    },
+                ]
+            },
+            "Named": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": {"type": "string", "default": "Alice"}},
+            },
+            "Pet": {
+                "oneOf": [
+                    {"type": "string"},
+                    {"type": "integer"},
+                    {"type": "number"},
+                    {"type": "boolean"},
+                    {"type": "array"},
+                    {"type": "object"},
+                ]
+            },
+            "Shape": {
+                "discriminator": {"propertyName": "type"},
+                "anyOf": [{"type": "object"}] * 6,
+            },
+            "Size": {"type": "string", "enum": ["s", "m", "l"]},
+            "Item": {"allOf": [{"type": "integer"}, {"minimum": 1}, {}]},
+            "Listed": {"$ref": "#/components/schemas/Pet/oneOf/0"},
+            "Remote": {"$ref": "common.yaml#/Thing"},
+        },
+    },
+}
+
+
+def write_common(directory: str) -> None:
+    with open(os.path.join(directory, "common.yaml"), "w") as f:
+        f.write("Thing:\n  type: object\n")
+
+
+class AnalyzeTests(unittest.TestCase):
+    report: Report
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            write_common(directory)
+            with contextlib.redirect_stderr(io.StringIO()):
+                cls.report = analyze(
+                    spec_dict,
+                    thresholds=Thresholds(max_ref_depth=2, max_enum=2),
+                    iterations=2,
+                    base_uri=pathlib.Path(directory, "openapi.json").as_uri(),
+                )
+
+    def test_compile_time(self) -> None:
+        self.assertGreater(self.report.compile_seconds, 0)
+
+    def test_findings(self) -> None:
+        self.assertEqual(
+            [
+                Finding(
+                    "#/components/schemas/Pet/oneOf",
+                    "alternatives",
+                    "6 alternatives without a discriminator may each be tried "
+                    "against a value",
+                ),
+                Finding(
+                    "#/paths/~1users~1me/put",
+                    "ref-depth",
+                    "validation follows a chain of 3 nested references",
+                ),
+                Finding(
+                    "#/paths/~1users~1{id}/parameters/0/schema/pattern",
+                    "pattern",
+                    "nested quantifier",
+                ),
+                Finding(
+                    "#/components/schemas/User/allOf/1/properties/nickname/pattern",
+                    "unanchored-pattern",
+                    "searched for at every position of a value",
+                ),
+                Finding(
+                    "#/components/parameters/Tags/schema/items/enum",
+                    "enum",
+                    "3 values are compared with a value one at a time",
+                ),
+                Finding(
+                    "#/components/schemas/Size/enum",
+                    "enum",
+                    "3 values are compared with a value one at a time",
+                ),
+                Finding(
+                    "#/paths/~1{a}~1{b}",
+                    "path-wildcard",
+                    "matches every path with 2 segments",
+                ),
+                Finding(
+                    "#/paths/~1{a}~1{b}",
+                    "path-collision",
+                    "matches the same GET requests as /users/{id}",
+                ),
+                Finding(
+                    "#/components/schemas/Remote/$ref",
+                    "unresolved-ref",
+                    "refers to another document, which is not analyzed",
+                ),
+            ],
+            self.report.findings,
+        )
+
+    def test_costs(self) -> None:
+        costs = self.report.costs
+        self.assertEqual(
+            sorted(costs, key=lambda cost: cost.seconds, reverse=True), costs
+        )
+        self.assertEqual(
+            {
+                "getUser": 0,
+                "PUT /users/me": 0,
+                "GET /{a}/{b}": 0,
+                "POST /forms": 0,
+                "POST /notes": 0,
+                "POST /remote": 1,
+                "DELETE /": 1,
+            },
+            {cost.operation_id: cost.errors for cost in costs},
+        )
+
+    def test_format(self) -> None:
+        text = self.report.format(top=1)
+        self.assertIn("9 findings\n", text)
+        self.assertIn(
+            "  #/components/schemas/Pet/oneOf [alternatives]\n"
+            "    6 alternatives without a discriminator may each be tried against a "
+            "value\n",
+            text,
+        )
+        self.assertEqual(
+            1, text.split("Operations by validation cost\n")[1].count("\n")
+        )
+        self.assertIn("(1 errors)", self.report.format())
+
+    def test_to_dict(self) -> None:
+        report = json.loads(json.dumps(self.report.to_dict()))
+        self.assertEqual(self.report.compile_seconds, report["compile_seconds"])
+        self.assertEqual(
+            {"location", "kind", "message"}, set(report["findings"][0].keys())
+        )
+        self.assertEqual(
+            {"operation_id", "seconds", "errors"}, set(report["costs"][0].keys())
+        )
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "openapi.json")
+        write_common(directory.name)
+        with open(self.path, "w") as f:
+            json.dump(spec_dict, f)
+
+    def main(self, *args: str) -> tuple:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            status = main([self.path, "--iterations", "1", *args])
+        return status, stdout.getvalue()
+
+    def test_text_report(self) -> None:
+        status, output = self.main("--top", "2")
+        self.assertEqual(0, status)
+        self.assertIn("Operations by validation cost", output)
+
+    def test_json_report(self) -> None:
+        status, output = self.main("--json", "--max-enum", "10")
+        self.assertEqual(0, status)
+        self.assertNotIn("enum", [f["kind"] for f in json.loads(output)["findings"]])
+
+    def test_strict(self) -> None:
+        self.assertEqual(1, self.main("--strict")[0])
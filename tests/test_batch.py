@@ -0,0 +1,314 @@
+import base64
+import concurrent.futures
+import io
+import json
+import typing
+import unittest
+import unittest.mock
+
+import openapi_core
+from openapi_core.templating.paths.exceptions import OperationNotFound, PathNotFound
+from openapi_core.unmarshalling.request.unmarshallers import (
+    APICallRequestUnmarshaller,
+)
+from openapi_core.unmarshalling.response.unmarshallers import (
+    APICallResponseUnmarshaller,
+)
+import tornado.httpclient
+import tornado.httputil
+
+from tornado_openapi3 import batch
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {
+        "title": "Test API",
+        "version": "1.0.0",
+    },
+    "components": {
+        "schemas": {
+            "resource": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}},
+                "required": ["name"],
+            },
+        },
+    },
+    "paths": {
+        "/resource": {
+            "post": {
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/resource"},
+                        }
+                    },
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        },
+        "/resource/{id}": {
+            "get": {
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Success",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/resource"},
+                            }
+                        },
+                    },
+                    "404": {"description": "Not Found"},
+                },
+            }
+        },
+    },
+}
+
+
+def load_spec() -> openapi_core.OpenAPI:
+    return openapi_core.OpenAPI.from_dict(spec_dict)
+
+
+def server_request(
+    method: str, uri: str, body: typing.Optional[dict] = None
+) -> tornado.httputil.HTTPServerRequest:
+    request = tornado.httputil.HTTPServerRequest(
+        method=method,
+        uri=uri,
+        headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+        body=json.dumps(body).encode() if body is not None else b"",
+        host="localhost",
+    )
+    return request
+
+
+def requests() -> typing.List[tornado.httputil.HTTPServerRequest]:
+    return [
+        server_request("POST", "/resource", {"name": "First"}),
+        server_request("GET", "/resource/1"),
+        server_request("POST", "/resource", {}),
+        server_request("GET", "/missing"),
+        server_request("GET", "/resource/two"),
+        server_request("DELETE", "/resource"),
+        server_request("POST", "/resource", {"name": "Second"}),
+    ]
+
+
+class BatchTests(unittest.TestCase):
+    def assertResults(
+        self,
+        results: typing.List[typing.Any],
+    ) -> None:
+        self.assertEqual(7, len(results))
+        self.assertEqual([], results[0].errors)
+        self.assertEqual({"name": "First"}, results[0].body)
+        self.assertEqual([], results[1].errors)
+        self.assertEqual({"id": 1}, results[1].parameters.path)
+        self.assertEqual(1, len(results[2].errors))
+        self.assertIsInstance(results[3].errors[0], PathNotFound)
+        self.assertEqual(1, len(results[4].errors))
+        self.assertIsInstance(results[5].errors[0], OperationNotFound)
+        self.assertEqual([], results[6].errors)
+        self.assertEqual({"name": "Second"}, results[6].body)
+
+    def test_results_match_individual_validation(self) -> None:
+        spec = load_spec()
+        expected = [
+            spec.unmarshal_request(TornadoOpenAPIRequest(request))
+            for request in requests()
+        ]
+        results = batch.unmarshal_requests(spec, requests())
+        self.assertEqual(
+            [(type(e.body), len(list(e.errors))) for e in expected],
+            [(type(r.body), len(list(r.errors))) for r in results],
+        )
+        self.assertResults(results)
+
+    def test_http_client_requests(self) -> None:
+        request = tornado.httpclient.HTTPRequest(
+            "http://localhost/resource",
+            method="POST",
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=json.dumps({"name": "Name"}),
+        )
+        [result] = batch.unmarshal_requests(load_spec(), [request])
+        self.assertEqual({"name": "Name"}, result.body)
+
+    def test_paths_are_found_once(self) -> None:
+        find_path = APICallRequestUnmarshaller._find_path
+        with unittest.mock.patch.object(
+            APICallRequestUnmarshaller,
+            "_find_path",
+            autospec=True,
+            side_effect=find_path,
+        ) as mock:
+            self.assertResults(batch.unmarshal_requests(load_spec(), requests()))
+        self.assertEqual(7, mock.call_count)
+
+    def test_spec_factory_is_compiled_once(self) -> None:
+        calls = []
+
+        def factory() -> openapi_core.OpenAPI:
+            calls.append(True)
+            return load_spec()
+
+        batch.unmarshal_requests(factory, requests())
+        batch.unmarshal_requests(factory, requests())
+        self.assertEqual(1, len(calls))
+
+    def test_thread_pool(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = batch.unmarshal_requests(
+                load_spec(), requests(), executor=executor, chunksize=1
+            )
+        self.assertResults(results)
+
+    def test_process_pool(self) -> None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            results = batch.unmarshal_requests(load_spec, requests(), executor=executor)
+        self.assertResults(results)
+
+
+def response_pair(
+    uri: str, code: int, body: typing.Optional[dict] = None
+) -> batch.RequestResponsePair:
+    request = tornado.httpclient.HTTPRequest("http://localhost" + uri)
+    response = tornado.httpclient.HTTPResponse(
+        request,
+        code,
+        headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+        buffer=io.BytesIO(json.dumps(body).encode() if body is not None else b""),
+    )
+    return request, response
+
+
+def response_pairs() -> typing.Iterator[batch.RequestResponsePair]:
+    yield response_pair("/resource/1", 200, {"name": "First"})
+    yield response_pair("/resource/2", 200, {})
+    yield response_pair("/resource/3", 404)
+    yield response_pair("/resource/4", 500)
+    yield response_pair("/missing", 200)
+    yield response_pair("/resource/5", 200, {"name": "Second"})
+    yield response_pair("/resource/6", 200, {"name": 6})
+
+
+class ResponseBatchTests(unittest.TestCase):
+    def assertReport(self, report: batch.ResponseReport) -> None:
+        self.assertEqual(6, report.validated)
+        self.assertEqual(3, report.failed)
+        ok = report.operations[("/resource/{id}", "get", 200)]
+        self.assertEqual(4, ok.validated)
+        self.assertEqual(2, ok.failed)
+        self.assertEqual({"InvalidData": 2}, dict(ok.errors))
+        self.assertEqual(2, len(ok.samples))
+        self.assertEqual(0, report.operations[("/resource/{id}", "get", 404)].failed)
+        self.assertEqual(
+            {"ResponseNotFound": 1},
+            dict(report.operations[("/resource/{id}", "get", 500)].errors),
+        )
+        self.assertEqual({("/missing", "get"): 1}, dict(report.unmatched))
+
+    def test_validate_responses(self) -> None:
+        self.assertReport(batch.validate_responses(load_spec(), response_pairs()))
+
+    def test_thread_pool(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            report = batch.validate_responses(
+                load_spec(),
+                response_pairs(),
+                executor=executor,
+                chunksize=1,
+                max_pending=1,
+            )
+        self.assertReport(report)
+
+    def test_paths_are_found_once(self) -> None:
+        find_path = APICallResponseUnmarshaller._find_path
+        with unittest.mock.patch.object(
+            APICallResponseUnmarshaller,
+            "_find_path",
+            autospec=True,
+            side_effect=find_path,
+        ) as mock:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                report = batch.validate_responses(
+                    load_spec(), response_pairs(), executor=executor
+                )
+        self.assertReport(report)
+        self.assertEqual(7, mock.call_count)
+
+    def test_process_pool(self) -> None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            report = batch.validate_responses(
+                load_spec, response_pairs(), executor=executor
+            )
+        self.assertReport(report)
+
+    def test_samples_are_bounded(self) -> None:
+        pairs = [response_pair("/resource/1", 200, {})] * 10
+        report = batch.validate_responses(load_spec(), pairs)
+        summary = report.operations[("/resource/{id}", "get", 200)]
+        self.assertEqual(10, summary.failed)
+        self.assertEqual(batch.OperationSummary.max_samples, len(summary.samples))
+        summary.merge(summary)
+        self.assertEqual(20, summary.failed)
+        self.assertEqual(batch.OperationSummary.max_samples, len(summary.samples))
+
+    def test_format(self) -> None:
+        report = batch.validate_responses(load_spec(), response_pairs())
+        self.assertEqual(
+            [
+                "GET /resource/{id} 200: 2 of 4 failed (InvalidData: 2)",
+                "GET /resource/{id} 404: 0 of 1 failed",
+                "GET /resource/{id} 500: 1 of 1 failed (ResponseNotFound: 1)",
+                "GET /missing: 1 unmatched",
+            ],
+            report.format().splitlines(),
+        )
+
+    def test_har_pairs(self) -> None:
+        def entry(path: str, content: dict) -> dict:
+            return {
+                "request": {
+                    "method": "GET",
+                    "url": "http://localhost" + path,
+                    "headers": [{"name": "Accept", "value": "application/json"}],
+                },
+                "response": {
+                    "status": 200,
+                    "headers": [{"name": "Content-Type", "value": "application/json"}],
+                    "content": content,
+                },
+            }
+
+        har = {
+            "log": {
+                "entries": [
+                    entry("/resource/1", {"text": json.dumps({"name": "Name"})}),
+                    entry(
+                        "/resource/2",
+                        {
+                            "text": base64.b64encode(b'{"name": 2}').decode(),
+                            "encoding": "base64",
+                        },
+                    ),
+                ]
+            }
+        }
+        pairs = list(batch.har_pairs(har))
+        self.assertEqual("application/json", pairs[0][0].headers["Accept"])
+        self.assertEqual(b'{"name": 2}', pairs[1][1].body)
+        report = batch.validate_responses(load_spec(), pairs)
+        self.assertEqual(2, report.validated)
+        self.assertEqual(1, report.failed)
@@ -0,0 +1,205 @@
+import json
+import traceback
+import unittest
+import unittest.mock
+
+import openapi_core
+from openapi_core.unmarshalling.request.datatypes import RequestUnmarshalResult
+from openapi_core.validation.request.exceptions import RequestBodyValidationError
+from openapi_core.validation.schemas.exceptions import InvalidSchemaValue
+import tornado.httputil
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.cache import ValidationCache
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.limits import LimitExceeded, ValidationLimits
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.validators import SchemaErrors
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/search": {
+            "post": {
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}}
+                ],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "terms": {
+                                        "type": "array",
+                                        "items": {"type": "string"},
+                                    }
+                                },
+                                "required": ["terms"],
+                            }
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Results"}},
+            }
+        },
+    },
+}
+
+
+def request(body: bytes, query: str = "") -> TornadoOpenAPIRequest:
+    return TornadoOpenAPIRequest(
+        tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/search" + query,
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=body,
+        )
+    )
+
+
+class ValidationCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.cache = ValidationCache(maxsize=2, ttl=10)
+
+    def unmarshal(self, body: bytes, query: str = "") -> RequestUnmarshalResult:
+        result, _ = unmarshal_request(self.spec, request(body, query), self.cache)
+        return result
+
+    def test_identical_bodies_are_validated_once(self) -> None:
+        body = json.dumps({"terms": ["a", "b"]}).encode()
+        first = self.unmarshal(body)
+        second = self.unmarshal(body)
+        self.assertEqual({"terms": ["a", "b"]}, first.body)
+        self.assertEqual(first.body, second.body)
+        cache = self.cache.cache(self.spec)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+
+    def test_cached_bodies_are_not_shared(self) -> None:
+        body = json.dumps({"terms": ["a"]}).encode()
+        first = self.unmarshal(body).body
+        assert isinstance(first, dict)
+        first["terms"].append("b")
+        self.assertEqual({"terms": ["a"]}, self.unmarshal(body).body)
+
+    def test_invalid_bodies_are_cached(self) -> None:
+        depths = []
+        for _ in range(3):
+            errors = list(self.unmarshal(b"{}").errors)
+            self.assertEqual(1, len(errors))
+            self.assertIsInstance(errors[0], RequestBodyValidationError)
+            depths.append(len(traceback.extract_tb(errors[0].__traceback__)))
+        self.assertEqual(2, self.cache.cache(self.spec).hits)
+        self.assertEqual(1, len(set(depths)))
+
+    def test_exceeded_limits_are_not_cached(self) -> None:
+        body = json.dumps({"terms": ["a"] * 10}).encode()
+        result, _ = unmarshal_request(
+            self.spec, request(body), self.cache, limits=ValidationLimits(max_nodes=5)
+        )
+        self.assertIsInstance(list(result.errors)[0].__cause__, LimitExceeded)
+        self.assertEqual(0, len(self.cache.cache(self.spec)))
+        self.assertEqual([], list(self.unmarshal(body).errors))
+
+    def test_limits_are_part_of_the_key(self) -> None:
+        body = json.dumps({"terms": ["a"] * 10}).encode()
+        self.assertEqual([], list(self.unmarshal(body).errors))
+        result, _ = unmarshal_request(
+            self.spec, request(body), self.cache, limits=ValidationLimits(max_nodes=5)
+        )
+        self.assertIsInstance(list(result.errors)[0].__cause__, LimitExceeded)
+        limits = ValidationLimits(max_nodes=100)
+        for _ in range(2):
+            result, _ = unmarshal_request(
+                self.spec, request(body), self.cache, limits=limits
+            )
+            self.assertEqual([], list(result.errors))
+        self.assertEqual(2, len(self.cache.cache(self.spec)))
+        self.assertEqual(1, self.cache.cache(self.spec).hits)
+
+    def test_max_errors_is_part_of_the_key(self) -> None:
+        body = json.dumps({"terms": [1, 2, 3]}).encode()
+        for max_errors in (None, 1, None, 1):
+            result, _ = unmarshal_request(
+                self.spec, request(body), self.cache, max_errors=max_errors
+            )
+            error = list(result.errors)[0].__cause__
+            assert isinstance(error, InvalidSchemaValue)
+            self.assertEqual(
+                max_errors is not None, isinstance(error.schema_errors, SchemaErrors)
+            )
+        self.assertEqual(2, self.cache.cache(self.spec).hits)
+
+    def test_parameters_are_always_validated(self) -> None:
+        body = json.dumps({"terms": ["a"]}).encode()
+        self.assertEqual(
+            {"limit": 1}, self.unmarshal(body, "?limit=1").parameters.query
+        )
+        result = self.unmarshal(body, "?limit=many")
+        self.assertEqual(1, len(list(result.errors)))
+        self.assertEqual({"terms": ["a"]}, result.body)
+
+    def test_outcomes_expire(self) -> None:
+        errors = []
+        for now in (100, 105, 111):
+            with unittest.mock.patch("time.monotonic", return_value=now):
+                errors.append(list(self.unmarshal(b"{}").errors)[0])
+        self.assertIs(errors[0], errors[1])
+        self.assertIsNot(errors[1], errors[2])
+
+    def test_size_is_bounded(self) -> None:
+        for terms in ("a", "b", "c"):
+            self.unmarshal(json.dumps({"terms": [terms]}).encode())
+        self.assertEqual(2, len(self.cache.cache(self.spec)))
+
+    def test_large_and_empty_bodies_are_not_cached(self) -> None:
+        self.cache.max_body_size = 16
+        self.unmarshal(json.dumps({"terms": ["a" * 16]}).encode())
+        self.unmarshal(b"")
+        self.assertEqual(0, len(self.cache.cache(self.spec)))
+
+    def test_specs_are_cached_separately(self) -> None:
+        other = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.assertIsNot(self.cache.cache(self.spec), self.cache.cache(other))
+
+
+class CachingHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.cache = ValidationCache()
+
+        class Handler(OpenAPIRequestHandler):
+            @property
+            def spec(self) -> openapi_core.OpenAPI:
+                return spec
+
+            async def post(self) -> None:
+                self.finish(self.validated.body)
+
+        return tornado.web.Application(
+            [(r"/search", Handler)], openapi_validation_cache=self.cache
+        )
+
+    def test_repeated_requests(self) -> None:
+        for _ in range(3):
+            response = self.fetch(
+                "/search",
+                method="POST",
+                headers={"Content-Type": "application/json"},
+                body=json.dumps({"terms": ["a"]}),
+            )
+            self.assertEqual(200, response.code)
+            self.assertEqual({"terms": ["a"]}, json.loads(response.body))
+        for response_body in ("{}", "{}"):
+            response = self.fetch(
+                "/search",
+                method="POST",
+                headers={"Content-Type": "application/json"},
+                body=response_body,
+            )
+            self.assertEqual(400, response.code)
@@ -0,0 +1,153 @@
+import json
+
+import openapi_core
+from openapi_core.exceptions import OpenAPIError
+import tornado.httpclient
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.client import OpenAPIClient, compile_spec, specs
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Users", "version": "1.0.0"},
+    "paths": {
+        "/users/{id}": {
+            "parameters": [
+                {
+                    "name": "id",
+                    "in": "path",
+                    "required": True,
+                    "schema": {"type": "integer"},
+                }
+            ],
+            "get": {
+                "responses": {
+                    "200": {
+                        "description": "A user",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "object", "required": ["name"]}
+                            }
+                        },
+                    },
+                    "404": {"description": "Not found"},
+                }
+            },
+        },
+        "/sampled/{id}": {
+            "x-validate-response-sample-rate": 0,
+            "get": {
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "A user",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "object", "required": ["name"]}
+                            }
+                        },
+                    }
+                },
+            },
+        },
+    },
+}
+
+
+class UserHandler(tornado.web.RequestHandler):
+    def get(self, id: str) -> None:
+        if id == "0":
+            raise tornado.web.HTTPError(404)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"name": "Alice"} if id == "1" else {}))
+
+
+class CompileTests(tornado.testing.AsyncTestCase):
+    def test_shared_specs(self) -> None:
+        specs.clear()
+        spec = compile_spec(spec_dict)
+        self.assertIs(spec, compile_spec(json.loads(json.dumps(spec_dict))))
+        self.assertEqual(1, len(specs))
+        client = OpenAPIClient(spec_dict)
+        self.addCleanup(client.close)
+        self.assertIs(spec, client.spec)
+        compiled = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.assertIs(compiled, OpenAPIClient(compiled).spec)
+
+    def test_invalid_policies(self) -> None:
+        invalid = dict(spec_dict, **{"x-validate-response-sample-rate": 2})
+        with self.assertRaisesRegex(ValueError, "sample-rate"):
+            compile_spec(invalid)
+
+
+class ClientTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        return tornado.web.Application(
+            [(r"/users/(\w+)", UserHandler), (r"/sampled/(\w+)", UserHandler)]
+        )
+
+    def client(self, **kwargs: object) -> OpenAPIClient:
+        client = OpenAPIClient(spec_dict, **kwargs)  # type: ignore[arg-type]
+        self.addCleanup(client.close)
+        return client
+
+    @tornado.testing.gen_test
+    async def test_valid_calls(self) -> None:
+        client = self.client(max_concurrency=1)
+        response = await client.fetch(self.get_url("/users/1"))
+        self.assertEqual({"name": "Alice"}, json.loads(response.body))
+        response = await client.fetch(
+            tornado.httpclient.HTTPRequest(self.get_url("/users/0")),
+            raise_error=False,
+        )
+        self.assertEqual(404, response.code)
+        with self.assertRaises(tornado.httpclient.HTTPClientError):
+            await client.fetch(self.get_url("/users/0"))
+
+    @tornado.testing.gen_test
+    async def test_invalid_requests(self) -> None:
+        client = self.client()
+        for path in ("/users/alice", "/unknown"):
+            with self.subTest(path=path):
+                with self.assertRaises(OpenAPIError):
+                    await client.fetch(self.get_url(path))
+        with self.assertRaisesRegex(ValueError, "kwargs"):
+            await client.fetch(
+                tornado.httpclient.HTTPRequest(self.get_url("/users/1")), method="GET"
+            )
+
+    @tornado.testing.gen_test
+    async def test_invalid_responses(self) -> None:
+        with self.assertRaises(OpenAPIError):
+            await self.client(max_errors=1).fetch(self.get_url("/users/2"))
+        response = await self.client(response_sample_rate=0).fetch(
+            self.get_url("/users/2")
+        )
+        self.assertEqual(b"{}", response.body)
+
+    @tornado.testing.gen_test
+    async def test_sampled_responses(self) -> None:
+        client = self.client()
+        response = await client.fetch(self.get_url("/sampled/2"))
+        self.assertEqual(200, response.code)
+        with self.assertRaises(OpenAPIError):
+            await self.client(response_sample_rate=1).fetch(self.get_url("/sampled/2"))
+
+    @tornado.testing.gen_test
+    async def test_logged_errors(self) -> None:
+        client = self.client(raise_errors=False)
+        with self.assertLogs("tornado_openapi3.client", "WARNING") as logs:
+            response = await client.fetch(self.get_url("/users/2"))
+        self.assertEqual(200, response.code)
+        self.assertIn(
+            "Response from GET {} does not match".format(self.get_url("/users/2")),
+            logs.output[0],
+        )
@@ -0,0 +1,76 @@
+import gzip
+import typing
+import unittest
+import zlib
+
+from tornado_openapi3.decompression import (
+    DecompressionError,
+    Decompressor,
+    UnsupportedEncoding,
+)
+from tornado_openapi3.limits import LimitExceeded
+
+content = bytes(range(256)) * 1000
+
+
+def decompress(decompressor: Decompressor, body: bytes, chunk_size: int) -> bytes:
+    chunks: typing.List[bytes] = []
+    for start in range(0, len(body), chunk_size):
+        chunks.extend(decompressor.decompress(body[start : start + chunk_size]))
+    chunks.append(decompressor.finish())
+    return b"".join(chunks)
+
+
+class DecompressorTests(unittest.TestCase):
+    def test_encodings(self) -> None:
+        for encoding, body in (
+            ("gzip", gzip.compress(content)),
+            ("X-Gzip", gzip.compress(content)),
+            ("deflate", zlib.compress(content)),
+            ("identity", content),
+            ("", content),
+        ):
+            for chunk_size in (1000, len(body)):
+                with self.subTest(encoding=encoding, chunk_size=chunk_size):
+                    decompressor = Decompressor(encoding)
+                    self.assertEqual(
+                        content, decompress(decompressor, body, chunk_size)
+                    )
+                    self.assertEqual(len(content), decompressor.size)
+
+    def test_chunk_size(self) -> None:
+        decompressor = Decompressor("gzip", chunk_size=100)
+        chunks = list(decompressor.decompress(gzip.compress(content)))
+        self.assertEqual(content, b"".join(chunks))
+        self.assertEqual(100, max(len(chunk) for chunk in chunks))
+
+    def test_unsupported_encodings(self) -> None:
+        for encoding in ("br", "gzip, deflate"):
+            with self.subTest(encoding=encoding):
+                with self.assertRaises(UnsupportedEncoding) as context:
+                    Decompressor(encoding)
+                self.assertEqual(encoding, context.exception.encoding)
+
+    def test_max_size(self) -> None:
+        bomb = gzip.compress(b"\0" * 10000000)
+        decompressor = Decompressor("gzip", max_size=100000)
+        with self.assertRaises(LimitExceeded) as context:
+            decompress(decompressor, bomb, 1000)
+        self.assertEqual(413, context.exception.status_code)
+        self.assertLessEqual(decompressor.size, 100000 + decompressor.chunk_size)
+        with self.assertRaises(LimitExceeded):
+            decompress(Decompressor(max_size=100), content, 1000)
+        self.assertEqual(
+            content, decompress(Decompressor(max_size=len(content)), content, 1000)
+        )
+
+    def test_malformed_bodies(self) -> None:
+        body = gzip.compress(content)
+        for name, malformed in (
+            ("not compressed", content),
+            ("truncated", body[: len(body) // 2]),
+            ("trailing data", body + b"more"),
+        ):
+            with self.subTest(name=name):
+                with self.assertRaises(DecompressionError):
+                    decompress(Decompressor("gzip"), malformed, 1000)
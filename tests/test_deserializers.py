@@ -0,0 +1,112 @@
+import typing
+import unittest
+
+import cbor2
+import msgpack  # type: ignore[import-untyped]
+import openapi_core
+from openapi_core.validation.request.exceptions import RequestBodyValidationError
+import tornado.httputil
+
+from tornado_openapi3.deserializers import (
+    CBORDeserializer,
+    MsgpackDeserializer,
+    buffered,
+)
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+schema = {
+    "type": "object",
+    "required": ["name"],
+    "properties": {"name": {"type": "string"}, "sizes": {"type": "array"}},
+}
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/upload": {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/msgpack": {"schema": schema},
+                        "application/cbor": {"schema": schema},
+                        "application/x-frames": {
+                            "schema": {"type": "array", "items": {"type": "integer"}}
+                        },
+                    }
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+    },
+}
+
+views: typing.List[memoryview] = []
+
+
+@buffered
+def frame_sizes(value: memoryview) -> typing.List[int]:
+    """Returns the size of each length-prefixed frame in a body."""
+    views.append(value)
+    sizes = []
+    while value:
+        size = int.from_bytes(value[:4], "big")
+        sizes.append(len(value[4 : 4 + size]))
+        value = value[4 + size :]
+    return sizes
+
+
+class DeserializerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(
+            spec_dict,
+            config=openapi_core.Config(
+                extra_media_type_deserializers={
+                    "application/msgpack": MsgpackDeserializer(),
+                    "application/cbor": CBORDeserializer(),
+                    "application/x-frames": frame_sizes,
+                }
+            ),
+        )
+
+    def unmarshal(
+        self, content_type: str, body: bytes
+    ) -> typing.Tuple[typing.Any, list]:
+        request = tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/upload",
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": content_type}),
+            body=body,
+        )
+        result, _ = unmarshal_request(self.spec, TornadoOpenAPIRequest(request))
+        return result.body, list(result.errors)
+
+    def test_binary_formats(self) -> None:
+        value = {"name": "a", "sizes": [1, 2]}
+        for content_type, dumps in (
+            ("application/msgpack", msgpack.packb),
+            ("application/cbor", cbor2.dumps),
+        ):
+            with self.subTest(content_type=content_type):
+                self.assertEqual(
+                    (value, []), self.unmarshal(content_type, dumps(value))
+                )
+                _, errors = self.unmarshal(content_type, dumps({"sizes": []}))
+                self.assertIsInstance(errors[0], RequestBodyValidationError)
+                _, errors = self.unmarshal(content_type, dumps(value)[:-2])
+                self.assertIsInstance(errors[0], RequestBodyValidationError)
+
+    def test_options(self) -> None:
+        self.assertEqual(b"a", MsgpackDeserializer(raw=True)(msgpack.packb("a")))
+        self.assertEqual(("a",), CBORDeserializer(immutable=True)(cbor2.dumps(["a"])))
+
+    def test_buffered(self) -> None:
+        body = b"".join(
+            len(frame).to_bytes(4, "big") + frame for frame in (b"abc", b"", b"de")
+        )
+        views.clear()
+        self.assertEqual(([3, 0, 2], []), self.unmarshal("application/x-frames", body))
+        self.assertIsInstance(views[0], memoryview)
+        self.assertIs(body, views[0].obj)
+        self.assertEqual("frame_sizes", frame_sizes.__name__)
@@ -0,0 +1,194 @@
+import json
+import typing
+import unittest
+
+import openapi_core
+from openapi_schema_validator import OAS30ReadValidator
+import tornado.httputil
+
+from tornado_openapi3.discriminators import (
+    DiscriminatingSchemaValidator,
+    discriminator,
+    table,
+)
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+
+def event(name: str) -> dict:
+    return {
+        "type": "object",
+        "required": ["type", name],
+        "properties": {"type": {"type": "string"}, name: {"type": "integer"}},
+    }
+
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        path: {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/" + schema}
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+        for path, schema in (
+            ("/events", "Event"),
+            ("/mapped", "Mapped"),
+            ("/any", "Any"),
+            ("/plain", "Plain"),
+        )
+    },
+    "components": {
+        "schemas": {
+            "Event": {
+                "oneOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                    {"$ref": "#/components/schemas/Loose"},
+                ],
+                "discriminator": {"propertyName": "type"},
+            },
+            "Mapped": {
+                "oneOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                ],
+                "discriminator": {
+                    "propertyName": "type",
+                    "mapping": {
+                        "created": "Created",
+                        "deleted": "#/components/schemas/Deleted",
+                        "missing": "#/components/schemas/Loose",
+                    },
+                },
+            },
+            "Any": {
+                "anyOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                ],
+                "discriminator": {"propertyName": "type"},
+            },
+            "Plain": {
+                "oneOf": [
+                    {"$ref": "#/components/schemas/Created"},
+                    {"$ref": "#/components/schemas/Deleted"},
+                ]
+            },
+            "Created": event("created"),
+            "Deleted": event("deleted"),
+            "Loose": {"type": "object"},
+        }
+    },
+}
+
+
+class TableTests(unittest.TestCase):
+    def setUp(self) -> None:
+        spec = openapi_core.OpenAPI.from_dict(spec_dict).spec
+        self.schemas = spec / "components" / "schemas"
+
+    def validator(self, name: str) -> DiscriminatingSchemaValidator:
+        return DiscriminatingSchemaValidator(
+            self.schemas / name, OAS30ReadValidator({})
+        )
+
+    def test_implicit_mapping(self) -> None:
+        self.assertEqual(
+            {"Created": 0, "Deleted": 1, "Loose": 2},
+            table(spec_dict["components"]["schemas"]["Event"], "oneOf"),
+        )
+
+    def test_explicit_mapping(self) -> None:
+        self.assertEqual(
+            {"Created": 0, "Deleted": 1, "deleted": 1},
+            table(spec_dict["components"]["schemas"]["Mapped"], "oneOf"),
+        )
+
+    def test_discriminators(self) -> None:
+        self.assertEqual(
+            ("type", {"Created": 0, "Deleted": 1}),
+            discriminator(self.schemas / "Any", "anyOf"),
+        )
+        for schema in (
+            self.schemas / "Any",
+            self.schemas / "Plain",
+            self.schemas / "Created",
+            self.schemas / "Created" / "required",
+        ):
+            with self.subTest(schema=schema):
+                self.assertIsNone(discriminator(schema, "oneOf"))
+
+    def test_select(self) -> None:
+        validator = self.validator("Event")
+        self.assertEqual(1, validator.select("oneOf", {"type": "Deleted"}))
+        self.assertEqual(
+            {(self.schemas / "Event", "oneOf")}, set(validator.discriminators)
+        )
+        evolved = validator.evolve(self.schemas / "Mapped")
+        self.assertIs(validator.discriminators, evolved.discriminators)
+        self.assertEqual(1, evolved.select("oneOf", {"type": "deleted"}))
+        self.assertEqual(2, len(validator.discriminators))
+
+    def test_unselected_values(self) -> None:
+        for name, value in (
+            ("Plain", {"type": "Created"}),
+            ("Event", ["Created"]),
+            ("Event", {}),
+            ("Event", {"type": 1}),
+            ("Event", {"type": "Unknown"}),
+        ):
+            with self.subTest(name=name, value=value):
+                self.assertIsNone(self.validator(name).select("oneOf", value))
+
+
+class DispatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def unmarshal(
+        self, path: str, body: typing.Any, max_errors: typing.Optional[int] = None
+    ) -> typing.Tuple[typing.Any, list]:
+        request = tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri=path,
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=json.dumps(body).encode(),
+        )
+        result, _ = unmarshal_request(
+            self.spec, TornadoOpenAPIRequest(request), max_errors=max_errors
+        )
+        return result.body, list(result.errors)
+
+    def test_selected_alternatives(self) -> None:
+        # Valid against both Created and Loose, which oneOf alone would reject.
+        value = {"type": "Created", "created": 1}
+        for path in ("/events", "/any"):
+            for max_errors in (None, 1):
+                with self.subTest(path=path, max_errors=max_errors):
+                    body, errors = self.unmarshal(path, value, max_errors)
+                    self.assertEqual([], errors)
+                    self.assertEqual(value, body)
+
+    def test_invalid_alternatives(self) -> None:
+        for path in ("/events", "/mapped", "/any"):
+            with self.subTest(path=path):
+                _, errors = self.unmarshal(path, {"type": "Created", "deleted": 1})
+                self.assertEqual(1, len(errors))
+
+    def test_unselected_alternatives(self) -> None:
+        self.assertEqual(1, len(self.unmarshal("/events", {"type": "Unknown"})[1]))
+        self.assertEqual(1, len(self.unmarshal("/any", {"type": "Unknown"})[1]))
+        self.assertEqual(1, len(self.unmarshal("/mapped", {"type": "created"})[1]))
+        self.assertEqual(
+            ({"type": "Created", "created": 1}, []),
+            self.unmarshal("/plain", {"type": "Created", "created": 1}),
+        )
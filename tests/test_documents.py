@@ -0,0 +1,143 @@
+import gzip
+import json
+import unittest
+
+import tornado.httpclient
+import tornado.testing
+import tornado.web
+import yaml  # type: ignore[import-untyped]
+
+from tornado_openapi3.documents import SpecDocument, SpecDocumentHandler
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0", "description": "é" * 1000},
+    "paths": {"/": {"get": {"responses": {200: {"description": "Success"}}}}},
+}
+
+
+class DocumentTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.document = SpecDocument(spec_dict)
+
+    def test_serialization(self) -> None:
+        json_document = self.document.representation("json")
+        self.assertEqual("application/json", json_document.content_type)
+        self.assertEqual("identity", json_document.encoding)
+        self.assertEqual(
+            json.loads(json.dumps(spec_dict)), json.loads(json_document.body)
+        )
+        yaml_document = self.document.representation("yaml")
+        self.assertEqual("application/yaml", yaml_document.content_type)
+        self.assertEqual(spec_dict, yaml.safe_load(yaml_document.body))
+        self.assertNotEqual(json_document.etag, yaml_document.etag)
+
+    def test_encodings(self) -> None:
+        identity = self.document.representation("json")
+        for accept_encoding, encoding in (
+            ("gzip", "gzip"),
+            ("deflate, gzip;q=0.5", "gzip"),
+            ("*", "gzip"),
+            ("*;q=0.5, gzip;q=0", "identity"),
+            ("gzip;q=zero", "identity"),
+            ("identity, ,", "identity"),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                representation = self.document.representation("json", accept_encoding)
+                self.assertEqual(encoding, representation.encoding)
+        encoded = self.document.representation("json", "gzip")
+        self.assertEqual(identity.body, gzip.decompress(encoded.body))
+        self.assertEqual(identity.etag[:-1] + '-gzip"', encoded.etag)
+
+    def test_incompressible_documents(self) -> None:
+        document = SpecDocument({})
+        self.assertEqual("identity", document.representation("json", "gzip").encoding)
+
+    def test_update(self) -> None:
+        etag = self.document.representation("json").etag
+        updated = dict(spec_dict, info={"title": "Updated", "version": "2.0.0"})
+        self.document.update(updated)
+        self.assertIs(updated, self.document.spec_dict)
+        self.assertNotEqual(etag, self.document.representation("json").etag)
+
+
+class HandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        self.document = SpecDocument(spec_dict)
+        options = {"document": self.document}
+        return tornado.web.Application(
+            [
+                (r"/openapi\.(\w+)", SpecDocumentHandler, options),
+                (
+                    r"/openapi",
+                    SpecDocumentHandler,
+                    dict(options, cache_control="public, max-age=60"),
+                ),
+            ]
+        )
+
+    def get(
+        self, path: str, method: str = "GET", **headers: str
+    ) -> tornado.httpclient.HTTPResponse:
+        return self.fetch(
+            path,
+            method=method,
+            headers={name.replace("_", "-"): value for name, value in headers.items()},
+            decompress_response=False,
+        )
+
+    def test_formats(self) -> None:
+        for path, accept, content_type in (
+            ("/openapi.json", "application/yaml", "application/json"),
+            ("/openapi.yaml", "", "application/yaml"),
+            ("/openapi.yml", "", "application/yaml"),
+            ("/openapi", "", "application/json"),
+            (
+                "/openapi",
+                "application/yaml, application/json;q=0.5",
+                "application/yaml",
+            ),
+            ("/openapi", "application/*", "application/json"),
+            ("/openapi", "text/html", "application/json"),
+        ):
+            with self.subTest(path=path, accept=accept):
+                headers = {"Accept": accept} if accept else {}
+                response = self.get(path, **headers)
+                self.assertEqual(200, response.code)
+                self.assertEqual(content_type, response.headers["Content-Type"])
+        self.assertEqual(404, self.get("/openapi.xml").code)
+
+    def test_headers(self) -> None:
+        response = self.get("/openapi.json", Accept_Encoding="gzip")
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual("no-cache", response.headers["Cache-Control"])
+        self.assertEqual("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(
+            self.document.representation("json", "gzip").body, response.body
+        )
+        response = self.get("/openapi")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual("public, max-age=60", response.headers["Cache-Control"])
+        self.assertEqual(
+            ["Accept", "Accept-Encoding"], response.headers.get_list("Vary")
+        )
+
+    def test_conditional_requests(self) -> None:
+        etag = self.get("/openapi.json").headers["Etag"]
+        self.assertEqual(etag, self.document.representation("json").etag)
+        response = self.get("/openapi.json", If_None_Match=etag)
+        self.assertEqual(304, response.code)
+        self.assertEqual(etag, response.headers["Etag"])
+        self.assertEqual(b"", response.body)
+        self.assertEqual(200, self.get("/openapi.yaml", If_None_Match=etag).code)
+        self.document.update({"openapi": "3.0.0"})
+        self.assertEqual(200, self.get("/openapi.json", If_None_Match=etag).code)
+
+    def test_head(self) -> None:
+        response = self.get("/openapi.json", method="HEAD")
+        self.assertEqual(200, response.code)
+        self.assertEqual(b"", response.body)
+        self.assertEqual(
+            str(len(self.document.representation("json").body)),
+            response.headers["Content-Length"],
+        )
@@ -0,0 +1,234 @@
+import json
+import typing
+import unittest
+
+import openapi_core
+import tornado.httpclient
+import tornado.httputil
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.cache import ValidationCache
+from tornado_openapi3.formats import BatchFormatter, collect
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.multipart import StreamingMultipartHandler
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.types import Formatter
+
+
+class CustomerIds:
+    def __init__(self) -> None:
+        self.calls: typing.List[typing.Sequence[str]] = []
+
+    async def validate_many(self, values: typing.Sequence[str]) -> typing.List[bool]:
+        self.calls.append(values)
+        return [value.startswith("c") for value in values]
+
+    def unmarshal(self, value: str) -> str:
+        return value.upper()
+
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/orders": {
+            "post": {
+                "parameters": [
+                    {
+                        "name": "customer",
+                        "in": "query",
+                        "required": True,
+                        "schema": {"type": "string", "format": "customer-id"},
+                    }
+                ],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "shared": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "string",
+                                            "format": "customer-id",
+                                        },
+                                    },
+                                    "count": {"type": "integer"},
+                                },
+                            }
+                        },
+                        "multipart/form-data": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "owner": {
+                                        "type": "string",
+                                        "format": "customer-id",
+                                    }
+                                },
+                            }
+                        },
+                    }
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+    },
+}
+
+
+class FormatterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_batches(self) -> None:
+        ids = CustomerIds()
+        formatter = BatchFormatter(ids)
+        self.assertFalse(formatter.validate("c1"))
+        with collect() as batch:
+            self.assertFalse(batch)
+            for value in ("c1", "x1", "c1"):
+                self.assertTrue(formatter.validate(value))
+            self.assertTrue(formatter.validate(1))  # type: ignore[arg-type]
+        self.assertTrue(batch)
+        self.assertFalse(formatter.validate("c2"))
+        with collect(batch):
+            self.assertTrue(formatter.validate("c1"))
+        self.assertEqual(((formatter, "c1"), (formatter, "x1")), batch.items())
+        (error,) = await batch.check()
+        self.assertIs(formatter, error.formatter)
+        self.assertEqual("x1", error.value)
+        self.assertEqual("Value 'x1' does not match its format", str(error))
+        self.assertEqual([["c1", "x1"]], ids.calls)
+        self.assertEqual("C1", formatter.unmarshal("c1"))
+
+    async def test_cache(self) -> None:
+        ids = CustomerIds()
+        formatter = BatchFormatter(ids, cache_size=10)
+        self.assertEqual([True, False], await formatter.validate_many(["c1", "x1"]))
+        self.assertEqual(
+            [False, True, True], await formatter.validate_many(["x1", "c1", "c2"])
+        )
+        self.assertEqual([True], await formatter.validate_many(["c2"]))
+        self.assertEqual([["c1", "x1"], ["c2"]], ids.calls)
+
+    async def test_cached_bodies(self) -> None:
+        ids = CustomerIds()
+        formatter = BatchFormatter(ids)
+        spec = openapi_core.OpenAPI.from_dict(
+            spec_dict,
+            config=openapi_core.Config(
+                extra_format_validators={"customer-id": formatter.validate},
+                extra_format_unmarshallers={"customer-id": formatter.unmarshal},
+            ),
+        )
+        cache = ValidationCache()
+        request = TornadoOpenAPIRequest(
+            tornado.httputil.HTTPServerRequest(
+                method="POST",
+                uri="/orders?customer=c1",
+                headers=tornado.httputil.HTTPHeaders(
+                    {"Content-Type": "application/json"}
+                ),
+                body=b'{"shared": ["x1"]}',
+            )
+        )
+        for _ in range(2):
+            with collect() as batch:
+                result, _ = unmarshal_request(spec, request, cache)
+            self.assertEqual([], result.errors)
+            self.assertEqual(["x1"], [error.value for error in await batch.check()])
+        # Values cannot be checked outside of collect(), whether or not the
+        # body is cached.
+        for _ in range(2):
+            result, _ = unmarshal_request(spec, request, cache)
+            self.assertEqual(2, len(list(result.errors)))
+        self.assertEqual([["c1", "x1"], ["c1", "x1"]], ids.calls)
+
+
+class OrderTestCase(tornado.testing.AsyncHTTPTestCase):
+    handler_class: typing.Type[OpenAPIRequestHandler] = OpenAPIRequestHandler
+
+    def get_app(self) -> tornado.web.Application:
+        self.ids = CustomerIds()
+        formatters: typing.Dict[str, Formatter] = {
+            "customer-id": BatchFormatter(self.ids)
+        }
+
+        class OrderHandler(self.handler_class):  # type: ignore[name-defined]
+            spec_dict = spec_dict
+            custom_formatters = formatters
+
+            def post(self) -> None:
+                self.finish(
+                    {
+                        "customer": self.validated.parameters.query["customer"],
+                        "body": self.validated.body,
+                    }
+                )
+
+        return tornado.web.Application(
+            [(r"/orders", OrderHandler)], openapi_validation_cache=ValidationCache()
+        )
+
+    def post(self, customer: str, body: dict) -> tornado.httpclient.HTTPResponse:
+        return self.fetch(
+            "/orders?customer=" + customer,
+            method="POST",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps(body),
+        )
+
+
+class HandlerTests(OrderTestCase):
+    def test_valid_values(self) -> None:
+        response = self.post("c1", {"shared": ["c2", "c1"]})
+        self.assertEqual(200, response.code)
+        self.assertEqual(
+            {"customer": "C1", "body": {"shared": ["C2", "C1"]}},
+            json.loads(response.body),
+        )
+        self.assertEqual([["c1", "c2"]], self.ids.calls)
+
+    def test_invalid_values(self) -> None:
+        self.assertEqual(400, self.post("c1", {"shared": ["x1"]}).code)
+        self.assertEqual(400, self.post("x1", {}).code)
+        self.assertEqual(2, len(self.ids.calls))
+
+    def test_invalid_requests(self) -> None:
+        self.assertEqual(400, self.post("c1", {"shared": ["c1"], "count": "a"}).code)
+        self.assertEqual([], self.ids.calls)
+
+    def test_cached_bodies(self) -> None:
+        for _ in range(3):
+            self.assertEqual(400, self.post("c1", {"shared": ["x1"]}).code)
+        for _ in range(2):
+            self.assertEqual(200, self.post("c1", {"shared": ["c2"]}).code)
+        self.assertEqual(5, len(self.ids.calls))
+
+
+class StreamingHandlerTests(OrderTestCase):
+    handler_class = StreamingMultipartHandler
+
+    def test_buffered_bodies(self) -> None:
+        for _ in range(2):
+            self.assertEqual(400, self.post("c1", {"shared": ["x1"]}).code)
+        self.assertEqual(200, self.post("c1", {"shared": ["c2"]}).code)
+        self.assertEqual(
+            [["c1"], ["x1"], ["c1"], ["x1"], ["c1"], ["c2"]], self.ids.calls
+        )
+
+    def test_streamed_bodies(self) -> None:
+        for owner, code in (("c2", 200), ("x1", 400)):
+            with self.subTest(owner=owner):
+                response = self.fetch(
+                    "/orders?customer=c1",
+                    method="POST",
+                    headers={"Content-Type": "multipart/form-data; boundary=b"},
+                    body=(
+                        '--b\r\nContent-Disposition: form-data; name="owner"\r\n'
+                        "\r\n{}\r\n--b--\r\n".format(owner)
+                    ),
+                )
+                self.assertEqual(code, response.code)
+        self.assertEqual([["c1"], ["c2"], ["c1"], ["x1"]], self.ids.calls)
@@ -1,15 +1,19 @@
+import copy
 import datetime
 import json
 import re
 import typing
 import unittest.mock
+import urllib.parse
 
 from openapi_core.exceptions import OpenAPIError
 import tornado.httpclient
+import tornado.httputil
 import tornado.web
 import tornado.testing
 
 from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.operations import DEFAULT_POLICY
 from tornado_openapi3.types import Deserializer, Formatter
 
 
@@ -103,6 +107,7 @@ class DefaultSchemaTest(tornado.testing.AsyncHTTPTestCase):
 
         class RequestHandler(OpenAPIRequestHandler):
             async def prepare(self) -> None:
+                test.assertIs(DEFAULT_POLICY, self.operation_policy)
                 with test.assertRaises(NotImplementedError):
                     self.spec
 
@@ -161,6 +166,36 @@ class DefaultDeserializers(tornado.testing.AsyncHTTPTestCase):
         self.assertEqual(200, response.code)
 
 
+class SpecCompilationTests(unittest.TestCase):
+    def spec(self, cls: typing.Type[OpenAPIRequestHandler]) -> typing.Any:
+        request = tornado.httputil.HTTPServerRequest(
+            method="GET", uri="/resource", connection=unittest.mock.Mock()
+        )
+        return cls(tornado.web.Application(), request).spec
+
+    def test_specs_are_compiled_once(self) -> None:
+        class Handler(ResourceHandler):
+            spec_dict = copy.deepcopy(ResourceHandler.spec_dict)
+
+        class OtherHandler(ResourceHandler):
+            pass
+
+        spec = self.spec(Handler)
+        self.assertIs(spec, self.spec(Handler))
+        self.assertIsNot(spec, self.spec(OtherHandler))
+        Handler.spec_dict = copy.deepcopy(Handler.spec_dict)
+        self.assertIs(spec, self.spec(Handler))
+        Handler.spec_dict = dict(Handler.spec_dict, info={"title": "", "version": ""})
+        self.assertIsNot(spec, self.spec(Handler))
+
+    def test_invalid_policies(self) -> None:
+        class Handler(ResourceHandler):
+            spec_dict = dict(ResourceHandler.spec_dict, **{"x-validation": "some"})
+
+        with self.assertRaisesRegex(ValueError, "x-validation"):
+            self.spec(Handler)
+
+
 class RequestHandlerTests(tornado.testing.AsyncHTTPTestCase):
     def get_app(self) -> tornado.web.Application:
         return tornado.web.Application(
@@ -247,7 +282,7 @@ class RequestHandlerTests(tornado.testing.AsyncHTTPTestCase):
 
     def test_unexpected_openapi_error(self) -> None:
         with unittest.mock.patch(
-            "openapi_core.OpenAPI.unmarshal_request",
+            "tornado_openapi3.operations.unmarshal_request",
             side_effect=OpenAPIError,
         ):
             response = self.fetch(
@@ -272,3 +307,157 @@ class RequestHandlerTests(tornado.testing.AsyncHTTPTestCase):
             body=json.dumps({"name": "Name", "date": "01/01/2020"}),
         )
         self.assertEqual(200, response.code)
+
+
+class FailFastTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class ItemsHandler(OpenAPIRequestHandler):
+            spec_dict = {
+                "openapi": "3.0.0",
+                "info": {"title": "Test API", "version": "1.0.0"},
+                "paths": {
+                    "/items": {
+                        "post": {
+                            "requestBody": {
+                                "content": {
+                                    "application/json": {
+                                        "schema": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "required": ["id"],
+                                            },
+                                        }
+                                    }
+                                }
+                            },
+                            "responses": {"200": {"description": "Success"}},
+                        }
+                    }
+                },
+            }
+
+            def on_openapi_error(self, status_code: int, error: OpenAPIError) -> None:
+                schema_errors = getattr(error.__cause__, "schema_errors")
+                self.set_status(status_code)
+                self.finish(
+                    {
+                        "found": len(schema_errors.found),
+                        "total": len(list(schema_errors)),
+                    }
+                )
+
+        return tornado.web.Application(
+            [(r"/items", ItemsHandler)], openapi_max_validation_errors=1
+        )
+
+    def test_validation_stops_at_first_error(self) -> None:
+        response = self.fetch(
+            "/items",
+            method="POST",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps([{}] * 100),
+        )
+        self.assertEqual(400, response.code)
+        self.assertEqual({"found": 1, "total": 100}, json.loads(response.body))
+
+
+class WriteValidatedTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        user = {"type": "object", "required": ["name"]}
+
+        class UserHandler(OpenAPIRequestHandler):
+            spec_dict = {
+                "openapi": "3.0.0",
+                "info": {"title": "Test API", "version": "1.0.0"},
+                "paths": {
+                    "/user": {
+                        "get": {
+                            "responses": {
+                                "200": {
+                                    "description": "A user",
+                                    "content": {
+                                        "application/json": {"schema": user},
+                                        "text/csv": {"schema": {"type": "string"}},
+                                        "application/octet-stream": {},
+                                    },
+                                },
+                                "204": {"description": "No user"},
+                                "404": {
+                                    "description": "Not found",
+                                    "content": {"*/*": {"schema": {"type": "string"}}},
+                                },
+                            }
+                        }
+                    },
+                    "/sampled": {
+                        "get": {
+                            "x-validate-response-sample-rate": 0,
+                            "responses": {
+                                "200": {
+                                    "description": "A user",
+                                    "content": {"application/json": {"schema": user}},
+                                }
+                            },
+                        }
+                    },
+                },
+            }
+
+            async def get(self) -> None:
+                status = int(self.get_argument("status", "200"))
+                value = json.loads(self.get_argument("value"))
+                content_type = self.get_argument("content_type", None)
+                self.write_validated(value, status, content_type)
+
+        return tornado.web.Application([(r".*", UserHandler)])
+
+    def get(
+        self, path: str, value: typing.Any, **arguments: str
+    ) -> tornado.httpclient.HTTPResponse:
+        query = urllib.parse.urlencode(dict(arguments, value=json.dumps(value)))
+        return self.fetch("{}?{}".format(path, query))
+
+    def test_valid_responses(self) -> None:
+        response = self.get("/user", {"name": "Alice"})
+        self.assertEqual(200, response.code)
+        self.assertEqual("application/json", response.headers["Content-Type"])
+        self.assertEqual({"name": "Alice"}, json.loads(response.body))
+
+    def test_invalid_responses(self) -> None:
+        with self.assertLogs("tornado.application", "ERROR") as logs:
+            response = self.get("/user", {})
+        self.assertEqual(500, response.code)
+        self.assertIn("InvalidData", logs.output[0])
+
+    def test_empty_responses(self) -> None:
+        response = self.get("/user", None, status="204")
+        self.assertEqual(204, response.code)
+        self.assertEqual(b"", response.body)
+
+    def test_content_types(self) -> None:
+        response = self.get("/user", "a,b", content_type="text/csv")
+        self.assertEqual("text/csv", response.headers["Content-Type"])
+        self.assertEqual(b"a,b", response.body)
+
+        response = self.get("/user", "Not found", status="404")
+        self.assertEqual("application/json", response.headers["Content-Type"])
+        self.assertEqual(b'"Not found"', response.body)
+
+        with self.assertLogs("tornado.application", "ERROR") as logs:
+            response = self.get("/user", "a,b", content_type="text/html")
+        self.assertEqual(500, response.code)
+        self.assertIn("DataValidationError", logs.output[0])
+
+    def test_unserializable_responses(self) -> None:
+        with self.assertLogs("tornado.application", "ERROR") as logs:
+            response = self.get("/user", 1, content_type="application/octet-stream")
+        self.assertEqual(500, response.code)
+        self.assertIn(
+            "Cannot serialize int as application/octet-stream", logs.output[0]
+        )
+
+    def test_unsampled_responses_are_not_validated(self) -> None:
+        response = self.get("/sampled", {})
+        self.assertEqual(200, response.code)
+        self.assertEqual(b"{}", response.body)
@@ -0,0 +1,68 @@
+import unittest
+
+from hypothesis import given
+import tornado.httputil
+from werkzeug.datastructures import Headers
+
+from tornado_openapi3.headers import TornadoHeaders
+
+from tests import common
+
+
+def tornado_headers(headers: Headers) -> tornado.httputil.HTTPHeaders:
+    result = tornado.httputil.HTTPHeaders()
+    for key, value in headers.items():
+        result.add(key, value)
+    return result
+
+
+class TornadoHeadersTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tornado_headers = tornado.httputil.HTTPHeaders()
+        self.tornado_headers.add("Content-Type", "application/json")
+        self.tornado_headers.add("X-Forwarded-For", "10.0.0.1")
+        self.tornado_headers.add("X-Forwarded-For", "10.0.0.2")
+        self.headers = TornadoHeaders(self.tornado_headers)
+
+    def test_lookup_is_case_insensitive(self) -> None:
+        self.assertEqual("application/json", self.headers["content-type"])
+        self.assertIn("CONTENT-TYPE", self.headers)
+
+    def test_lookup_returns_first_value(self) -> None:
+        self.assertEqual("10.0.0.1", self.headers["X-Forwarded-For"])
+
+    def test_missing_header(self) -> None:
+        with self.assertRaises(KeyError):
+            self.headers["Authorization"]
+        self.assertNotIn("Authorization", self.headers)
+        self.assertIsNone(self.headers.get("Authorization"))
+
+    def test_getlist(self) -> None:
+        self.assertEqual(
+            ["10.0.0.1", "10.0.0.2"], self.headers.getlist("x-forwarded-for")
+        )
+        self.assertEqual([], self.headers.getlist("Authorization"))
+
+    def test_iteration(self) -> None:
+        self.assertEqual(["Content-Type", "X-Forwarded-For"], sorted(self.headers))
+        self.assertEqual(2, len(self.headers))
+
+    def test_headers_are_not_copied(self) -> None:
+        self.tornado_headers.add("Authorization", "Bearer secret")
+        self.assertEqual("Bearer secret", self.headers["Authorization"])
+
+    def test_equality(self) -> None:
+        self.assertEqual(self.headers, TornadoHeaders(self.tornado_headers.copy()))
+        self.assertEqual(self.headers, Headers(self.tornado_headers.get_all()))
+        self.assertNotEqual(self.headers, Headers())
+        self.assertNotEqual(self.headers, "Content-Type: application/json")
+
+    def test_repr(self) -> None:
+        self.assertIn("('Content-Type', 'application/json')", repr(self.headers))
+
+    @given(common.headers)
+    def test_matches_werkzeug_headers(self, headers: Headers) -> None:
+        adapted = TornadoHeaders(tornado_headers(headers))
+        self.assertEqual(adapted, headers)
+        for key in headers.keys():
+            self.assertEqual(headers.getlist(key), adapted.getlist(key))
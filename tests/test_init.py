@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import unittest
+
+import tornado_openapi3
+import tornado_openapi3.handler
+import tornado_openapi3.metrics
+
+
+class PackageTests(unittest.TestCase):
+    def test_exports(self) -> None:
+        self.assertIs(
+            tornado_openapi3.handler.OpenAPIRequestHandler,
+            tornado_openapi3.OpenAPIRequestHandler,
+        )
+        self.assertIs(
+            tornado_openapi3.metrics.MetricsStore, tornado_openapi3.MetricsStore
+        )
+        for name in tornado_openapi3.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(tornado_openapi3, name))
+                self.assertIn(name, dir(tornado_openapi3))
+
+    def test_unknown_names(self) -> None:
+        with self.assertRaisesRegex(AttributeError, "missing"):
+            getattr(tornado_openapi3, "missing")
+
+    def test_openapi_core_is_imported_lazily(self) -> None:
+        script = "\n".join(
+            [
+                "import sys",
+                "import tornado_openapi3",
+                "import tornado_openapi3.handler",
+                "import tornado_openapi3.metrics",
+                "assert 'openapi_core' not in sys.modules",
+                "tornado_openapi3.OpenAPIRequestHandler",
+                "assert 'openapi_core' not in sys.modules",
+                "tornado_openapi3.OperationPolicy",
+                "assert 'openapi_core' in sys.modules",
+            ]
+        )
+        subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,218 @@
+import json
+import typing
+import unittest
+import unittest.mock
+
+import openapi_core
+import tornado.httputil
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.limits import Budget, LimitExceeded, ValidationLimits, budget
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/documents": {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "tags": {
+                                        "type": "array",
+                                        "items": {"type": "string"},
+                                    },
+                                    "metadata": {"type": "object"},
+                                },
+                            }
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Success"}},
+            },
+            "get": {
+                "parameters": [
+                    {
+                        "name": "q",
+                        "in": "query",
+                        "schema": {"type": "array", "items": {"type": "string"}},
+                    }
+                ],
+                "responses": {"200": {"description": "Success"}},
+            },
+        }
+    },
+}
+
+
+def request(body: typing.Any) -> TornadoOpenAPIRequest:
+    return TornadoOpenAPIRequest(
+        tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/documents",
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=json.dumps(body).encode(),
+        )
+    )
+
+
+def nested(depth: int) -> dict:
+    value: dict = {}
+    for _ in range(depth):
+        value = {"child": value}
+    return value
+
+
+class BudgetTests(unittest.TestCase):
+    def test_depth(self) -> None:
+        checker = Budget(ValidationLimits(max_depth=3))
+        checker.check_value(nested(2))
+        checker.check_value([[["leaf"]]])
+        with self.assertRaises(LimitExceeded) as context:
+            checker.check_value(nested(3))
+        self.assertEqual("max_depth", context.exception.limit)
+        self.assertEqual(400, context.exception.status_code)
+
+    def test_array_items(self) -> None:
+        checker = Budget(ValidationLimits(max_array_items=3))
+        checker.check_value({"tags": ["a", "b", "c"]})
+        with self.assertRaises(LimitExceeded) as context:
+            checker.check_value({"tags": ["a", "b", "c", "d"]})
+        self.assertEqual(413, context.exception.status_code)
+
+    def test_unlimited_values_are_not_walked(self) -> None:
+        checker = Budget(ValidationLimits(max_nodes=10))
+        with unittest.mock.patch("time.monotonic") as monotonic:
+            checker.check_value([nested(100)] * 1000)
+        monotonic.assert_not_called()
+
+    def test_nodes(self) -> None:
+        checker = Budget(ValidationLimits(max_nodes=2))
+        checker.visit()
+        checker.visit()
+        with self.assertRaises(LimitExceeded) as context:
+            checker.visit()
+        self.assertEqual("max_nodes", context.exception.limit)
+        self.assertEqual(413, context.exception.status_code)
+
+    def test_time(self) -> None:
+        with unittest.mock.patch("time.monotonic", return_value=100):
+            checker = Budget(ValidationLimits(max_seconds=1))
+        with unittest.mock.patch("time.monotonic", return_value=100.5):
+            for _ in range(1000):
+                checker.visit()
+            checker.check_value(list(range(1000)))
+        with unittest.mock.patch("time.monotonic", return_value=102):
+            with self.assertRaises(LimitExceeded) as context:
+                checker.check_value(list(range(1000)))
+            self.assertEqual("max_seconds", context.exception.limit)
+            self.assertEqual(400, context.exception.status_code)
+            with self.assertRaises(LimitExceeded):
+                for _ in range(1000):
+                    checker.visit()
+
+    def test_paused_time(self) -> None:
+        with unittest.mock.patch("time.monotonic", return_value=100):
+            checker = Budget(ValidationLimits(max_seconds=1))
+            with budget(checker):
+                pass
+        # Time spent outside of the budget is not counted.
+        with unittest.mock.patch("time.monotonic", return_value=110):
+            with budget(checker):
+                checker.check_time()
+        with unittest.mock.patch("time.monotonic", return_value=120):
+            with budget(checker):
+                with unittest.mock.patch("time.monotonic", return_value=121.5):
+                    with self.assertRaises(LimitExceeded):
+                        checker.check_time()
+
+
+class UnmarshalRequestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def error(self, body: typing.Any, limits: ValidationLimits) -> LimitExceeded:
+        result, _ = unmarshal_request(self.spec, request(body), limits=limits)
+        errors = list(result.errors)
+        self.assertEqual(1, len(errors))
+        cause = errors[0].__cause__
+        assert isinstance(cause, LimitExceeded)
+        return cause
+
+    def test_within_limits(self) -> None:
+        limits = ValidationLimits(
+            max_depth=3, max_array_items=10, max_nodes=100, max_seconds=10
+        )
+        result, _ = unmarshal_request(
+            self.spec, request({"tags": ["a"], "metadata": {}}), limits=limits
+        )
+        self.assertEqual([], list(result.errors))
+
+    def test_body_limits(self) -> None:
+        self.assertEqual(
+            "max_depth",
+            self.error({"metadata": nested(5)}, ValidationLimits(max_depth=3)).limit,
+        )
+        self.assertEqual(
+            "max_array_items",
+            self.error(
+                {"tags": ["a"] * 11}, ValidationLimits(max_array_items=10)
+            ).limit,
+        )
+        self.assertEqual(
+            "max_nodes",
+            self.error({"tags": ["a"] * 100}, ValidationLimits(max_nodes=50)).limit,
+        )
+
+    def test_keywords_are_only_counted_within_a_budget(self) -> None:
+        unmarshal_request(self.spec, request({"tags": ["a"] * 100}), limits=None)
+        with budget(None):
+            unmarshal_request(self.spec, request({"tags": ["a"] * 100}))
+
+    def test_keywords_are_only_counted_with_limits(self) -> None:
+        with budget(ValidationLimits(max_nodes=1)):
+            result, _ = unmarshal_request(self.spec, request({"tags": ["a"] * 100}))
+        self.assertEqual([], list(result.errors))
+
+
+class LimitsHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+            async def get(self) -> None:
+                self.finish()
+
+            async def post(self) -> None:
+                self.finish()
+
+        return tornado.web.Application(
+            [(r"/documents", Handler)],
+            openapi_validation_limits=ValidationLimits(
+                max_depth=3, max_array_items=10, max_nodes=50
+            ),
+        )
+
+    def post(self, body: typing.Any) -> int:
+        return self.fetch(
+            "/documents",
+            method="POST",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps(body),
+        ).code
+
+    def test_limits(self) -> None:
+        self.assertEqual(200, self.post({"tags": ["a"], "metadata": nested(1)}))
+        self.assertEqual(400, self.post({"metadata": nested(5)}))
+        self.assertEqual(413, self.post({"tags": ["a"] * 11}))
+
+    def test_parameter_limits(self) -> None:
+        self.assertEqual(200, self.fetch("/documents?q=a").code)
+        self.assertEqual(413, self.fetch("/documents?" + "&".join(["q=a"] * 50)).code)
@@ -0,0 +1,347 @@
+"""Allocation and memory regression tests for the validation path.
+
+Each test measures the memory allocated while adapting or validating
+representative requests and responses and fails if it exceeds a budget. The
+budgets leave headroom over the measured values; if a change legitimately
+raises them, update the budget alongside the change.
+
+"""
+
+import gc
+import io
+import json
+import os
+import tracemalloc
+import typing
+import unittest
+
+import openapi_core
+import tornado.httpclient
+import tornado.httputil
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.responses import TornadoOpenAPIResponse
+
+#: Budgets for the memory kept alive by each adapted request or response, and
+#: for the peak memory allocated while creating one, in bytes and blocks.
+REQUEST_RETAINED_BYTES = 800
+REQUEST_RETAINED_BLOCKS = 10
+REQUEST_PEAK_BYTES = 2_500
+RESPONSE_RETAINED_BYTES = 400
+RESPONSE_RETAINED_BLOCKS = 5
+RESPONSE_PEAK_BYTES = 1_600
+
+#: Budgets for the memory kept alive by each handler after prepare() and for
+#: the peak memory allocated by a single call to prepare(), in bytes, for
+#: each of the specs below.
+PREPARE_RETAINED_BYTES = {
+    "minimal": 8_000,
+    "parameters": 12_000,
+    "nested": 20_000,
+}
+PREPARE_PEAK_BYTES = {
+    "minimal": 30_000,
+    "parameters": 40_000,
+    "nested": 100_000,
+}
+
+#: The number of requests validated when checking for leaks, and the growth in
+#: live objects and resident memory allowed over that run after warming up.
+LEAK_ITERATIONS = 300
+LEAK_OBJECTS = 100
+LEAK_RSS_BYTES = 8 * 1024 * 1024
+
+SPECS: typing.Dict[str, dict] = {
+    "minimal": {
+        "openapi": "3.0.0",
+        "info": {"title": "Minimal", "version": "1.0.0"},
+        "paths": {
+            "/resource": {"get": {"responses": {"200": {"description": "Success"}}}}
+        },
+    },
+    "parameters": {
+        "openapi": "3.0.0",
+        "info": {"title": "Parameters", "version": "1.0.0"},
+        "paths": {
+            "/resource/{id}": {
+                "get": {
+                    "parameters": [
+                        {
+                            "name": "id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "integer"},
+                        },
+                        {
+                            "name": "fields",
+                            "in": "query",
+                            "schema": {"type": "array", "items": {"type": "string"}},
+                        },
+                        {
+                            "name": "X-Request-Id",
+                            "in": "header",
+                            "schema": {"type": "string"},
+                        },
+                    ],
+                    "responses": {"200": {"description": "Success"}},
+                }
+            }
+        },
+    },
+    "nested": {
+        "openapi": "3.0.0",
+        "info": {"title": "Nested", "version": "1.0.0"},
+        "components": {
+            "schemas": {
+                "item": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "maxLength": 64},
+                        "quantity": {"type": "integer", "minimum": 0},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["name", "quantity"],
+                },
+                "order": {
+                    "type": "object",
+                    "properties": {
+                        "customer": {"type": "string"},
+                        "items": {
+                            "type": "array",
+                            "items": {"$ref": "#/components/schemas/item"},
+                        },
+                    },
+                    "required": ["customer", "items"],
+                },
+            }
+        },
+        "paths": {
+            "/resource": {
+                "post": {
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/order"}
+                            }
+                        },
+                    },
+                    "responses": {"200": {"description": "Success"}},
+                }
+            }
+        },
+    },
+}
+
+ORDER = {
+    "customer": "Customer",
+    "items": [
+        {"name": "Item {}".format(i), "quantity": i, "tags": ["a", "b"]}
+        for i in range(10)
+    ],
+}
+
+
+class Connection:
+    """A stand-in for an HTTP connection that allocates nothing."""
+
+    def set_close_callback(
+        self, callback: typing.Optional[typing.Callable[[], None]]
+    ) -> None:
+        pass
+
+
+def server_request(spec_name: str) -> tornado.httputil.HTTPServerRequest:
+    headers = tornado.httputil.HTTPHeaders()
+    headers.add("Content-Type", "application/json")
+    headers.add("X-Request-Id", "abc123")
+    headers.add("Cookie", "session=abc")
+    if spec_name == "parameters":
+        return tornado.httputil.HTTPServerRequest(
+            method="GET",
+            uri="/resource/1?fields=name&fields=date",
+            headers=headers,
+            host="localhost",
+            connection=Connection(),  # type: ignore[arg-type]
+        )
+    if spec_name == "nested":
+        return tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/resource",
+            headers=headers,
+            body=json.dumps(ORDER).encode(),
+            host="localhost",
+            connection=Connection(),  # type: ignore[arg-type]
+        )
+    return tornado.httputil.HTTPServerRequest(
+        method="GET",
+        uri="/resource",
+        headers=headers,
+        host="localhost",
+        connection=Connection(),  # type: ignore[arg-type]
+    )
+
+
+def http_response() -> tornado.httpclient.HTTPResponse:
+    headers = tornado.httputil.HTTPHeaders()
+    headers.add("Content-Type", "application/json")
+    headers.add("Cache-Control", "no-cache")
+    return tornado.httpclient.HTTPResponse(
+        tornado.httpclient.HTTPRequest("http://localhost/resource"),
+        200,
+        headers=headers,
+        buffer=io.BytesIO(b"{}"),
+    )
+
+
+def handler_class(spec_name: str) -> typing.Type[OpenAPIRequestHandler]:
+    compiled = openapi_core.OpenAPI.from_dict(SPECS[spec_name])
+
+    class Handler(OpenAPIRequestHandler):
+        @property
+        def spec(self) -> openapi_core.OpenAPI:
+            return compiled
+
+        def on_openapi_error(
+            self, status_code: int, error: openapi_core.exceptions.OpenAPIError
+        ) -> None:
+            raise AssertionError(error)
+
+    return Handler
+
+
+def prepare(
+    handler_class: typing.Type[OpenAPIRequestHandler],
+    application: tornado.web.Application,
+    request: tornado.httputil.HTTPServerRequest,
+) -> OpenAPIRequestHandler:
+    handler = handler_class(application, request)
+    coroutine = handler.prepare()
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        pass
+    else:  # pragma: no cover
+        raise AssertionError("prepare() did not complete synchronously")
+    return handler
+
+
+class Allocations(typing.NamedTuple):
+    retained_bytes: int
+    retained_blocks: int
+    peak_bytes: int
+
+
+def measure(func: typing.Callable[[], typing.Any], count: int = 100) -> Allocations:
+    """Measures the memory allocated by calls to a function.
+
+    Returns the memory kept alive by each call's result, and the peak memory
+    allocated while making a single call, ignoring the first call to allow
+    for any caches to be populated. The peak is the smallest of several calls,
+    to discount allocations made by tracers such as coverage.
+
+    """
+    func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(5):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        peak_bytes = min(peaks)
+
+        gc.collect()
+        start = tracemalloc.take_snapshot()
+        results = [func() for _ in range(count)]
+        end = tracemalloc.take_snapshot()
+        statistics = end.compare_to(start, "filename")
+        retained_bytes = sum(stat.size_diff for stat in statistics)
+        retained_blocks = sum(stat.count_diff for stat in statistics)
+        del results
+    finally:
+        tracemalloc.stop()
+    return Allocations(
+        retained_bytes=retained_bytes // count,
+        retained_blocks=retained_blocks // count,
+        peak_bytes=peak_bytes,
+    )
+
+
+def rss() -> int:
+    """Returns the current resident set size of this process in bytes.
+
+    Only available on platforms with ``/proc/self/statm``, such as Linux.
+
+    """
+    with open("/proc/self/statm") as statm:
+        resident = int(statm.read().split()[1])
+    return resident * os.sysconf("SC_PAGE_SIZE")
+
+
+class AllocationTests(unittest.TestCase):
+    def test_request_allocations(self) -> None:
+        request = server_request("parameters")
+        allocations = measure(lambda: TornadoOpenAPIRequest(request))
+        self.assertLessEqual(allocations.retained_bytes, REQUEST_RETAINED_BYTES)
+        self.assertLessEqual(allocations.retained_blocks, REQUEST_RETAINED_BLOCKS)
+        self.assertLessEqual(allocations.peak_bytes, REQUEST_PEAK_BYTES)
+
+    def test_response_allocations(self) -> None:
+        response = http_response()
+        allocations = measure(lambda: TornadoOpenAPIResponse(response))
+        self.assertLessEqual(allocations.retained_bytes, RESPONSE_RETAINED_BYTES)
+        self.assertLessEqual(allocations.retained_blocks, RESPONSE_RETAINED_BLOCKS)
+        self.assertLessEqual(allocations.peak_bytes, RESPONSE_PEAK_BYTES)
+
+    def test_prepare_allocations(self) -> None:
+        application = tornado.web.Application()
+        for spec_name in SPECS:
+            with self.subTest(spec=spec_name):
+                handler = handler_class(spec_name)
+                request = server_request(spec_name)
+                allocations = measure(
+                    lambda: prepare(handler, application, request), count=10
+                )
+                self.assertLessEqual(
+                    allocations.retained_bytes, PREPARE_RETAINED_BYTES[spec_name]
+                )
+                self.assertLessEqual(
+                    allocations.peak_bytes, PREPARE_PEAK_BYTES[spec_name]
+                )
+
+
+class LeakTests(unittest.TestCase):
+    def setUp(self) -> None:
+        application = tornado.web.Application()
+        handlers = {name: handler_class(name) for name in SPECS}
+        requests = {name: server_request(name) for name in SPECS}
+
+        def run(iterations: int) -> None:
+            for _ in range(iterations):
+                for name in SPECS:
+                    prepare(handlers[name], application, requests[name])
+
+        self.run_requests = run
+        run(LEAK_ITERATIONS // 10)
+        gc.collect()
+
+    def test_steady_state_objects(self) -> None:
+        objects_before = len(gc.get_objects())
+        self.run_requests(LEAK_ITERATIONS)
+        gc.collect()
+        self.assertLessEqual(len(gc.get_objects()) - objects_before, LEAK_OBJECTS)
+
+    @unittest.skipUnless(
+        os.path.exists("/proc/self/statm"), "resident memory is not available"
+    )
+    def test_steady_state_memory(self) -> None:
+        rss_before = rss()
+        self.run_requests(LEAK_ITERATIONS)
+        gc.collect()
+        self.assertLessEqual(rss() - rss_before, LEAK_RSS_BYTES)
@@ -0,0 +1,129 @@
+import unittest
+
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.metrics import Histogram, MetricsHandler, MetricsStore
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/users": {
+            "post": {
+                "operationId": "createUser",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"type": "object", "required": ["name"]}
+                        }
+                    }
+                },
+                "responses": {"201": {"description": "Created"}},
+            },
+            "get": {"responses": {"200": {"description": "Users"}}},
+        }
+    },
+}
+
+
+class HistogramTests(unittest.TestCase):
+    def test_observe(self) -> None:
+        histogram = Histogram([1, 0.1])
+        for value in (0.05, 0.1, 0.5, 1, 2):
+            histogram.observe(value)
+        self.assertEqual((0.1, 1), histogram.buckets)
+        self.assertEqual([2, 2, 1], list(histogram.counts))
+        self.assertEqual(5, histogram.count)
+        self.assertAlmostEqual(3.65, histogram.sum)
+
+
+class MetricsStoreTests(unittest.TestCase):
+    def test_operations_are_created_once(self) -> None:
+        store = MetricsStore()
+        self.assertIs(store.operation("a"), store.operation("a"))
+        self.assertIs(store.operation(None), store.operation(""))
+
+    def test_render(self) -> None:
+        store = MetricsStore(buckets=[0.1, 1])
+        metrics = store.operation('a"b')
+        metrics.validation.observe(0.5)
+        metrics.request.observe(0.05)
+        metrics.count_error(400)
+        metrics.count_error(400)
+        self.assertEqual(
+            "\n".join(
+                [
+                    "# HELP openapi_validation_seconds Time spent validating requests.",
+                    "# TYPE openapi_validation_seconds histogram",
+                    'openapi_validation_seconds_bucket{operation="a\\"b",le="0.1"} 0',
+                    'openapi_validation_seconds_bucket{operation="a\\"b",le="1"} 1',
+                    'openapi_validation_seconds_bucket{operation="a\\"b",le="+Inf"} 1',
+                    'openapi_validation_seconds_sum{operation="a\\"b"} 0.5',
+                    'openapi_validation_seconds_count{operation="a\\"b"} 1',
+                    "# HELP openapi_request_seconds Time spent handling requests.",
+                    "# TYPE openapi_request_seconds histogram",
+                    'openapi_request_seconds_bucket{operation="a\\"b",le="0.1"} 1',
+                    'openapi_request_seconds_bucket{operation="a\\"b",le="1"} 1',
+                    'openapi_request_seconds_bucket{operation="a\\"b",le="+Inf"} 1',
+                    'openapi_request_seconds_sum{operation="a\\"b"} 0.05',
+                    'openapi_request_seconds_count{operation="a\\"b"} 1',
+                    "# HELP openapi_errors_total Requests rejected by validation.",
+                    "# TYPE openapi_errors_total counter",
+                    'openapi_errors_total{operation="a\\"b",status="400"} 2',
+                    "",
+                ]
+            ),
+            store.render(),
+        )
+
+
+class MetricsHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+            async def get(self) -> None:
+                self.finish()
+
+            async def post(self) -> None:
+                self.set_status(201)
+                self.finish()
+
+        self.store = MetricsStore()
+        return tornado.web.Application(
+            [
+                (r"/metrics", MetricsHandler, {"store": self.store}),
+                (r".*", Handler),
+            ],
+            openapi_metrics=self.store,
+        )
+
+    def test_metrics(self) -> None:
+        headers = {"Content-Type": "application/json"}
+        self.fetch("/users", method="POST", headers=headers, body='{"name": "a"}')
+        self.fetch("/users", method="POST", headers=headers, body="{}")
+        self.fetch("/users")
+        self.fetch("/unknown")
+
+        self.assertEqual(
+            ["", "GET /users", "createUser"], sorted(self.store.operations)
+        )
+        create = self.store.operation("createUser")
+        self.assertEqual(2, create.validation.count)
+        self.assertEqual(2, create.request.count)
+        self.assertEqual(1, self.store.operation("GET /users").request.count)
+
+        response = self.fetch("/metrics")
+        self.assertEqual(200, response.code)
+        self.assertEqual(
+            "text/plain; version=0.0.4; charset=utf-8",
+            response.headers["Content-Type"],
+        )
+        body = response.body.decode()
+        self.assertIn(
+            'openapi_errors_total{operation="createUser",status="400"} 1', body
+        )
+        self.assertIn('openapi_errors_total{operation="",status="404"} 1', body)
+        self.assertIn('openapi_request_seconds_count{operation="createUser"} 2', body)
@@ -0,0 +1,495 @@
+import gzip
+import json
+import typing
+import zlib
+import unittest
+import unittest.mock
+
+import tornado.gen
+import tornado.tcpclient
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.multipart import (
+    MultipartError,
+    MultipartParser,
+    Part,
+    StreamingMultipartHandler,
+)
+from tornado_openapi3.limits import LimitExceeded, ValidationLimits
+
+BOUNDARY = "----boundary"
+
+
+def multipart(*parts: typing.Tuple[str, str, bytes]) -> bytes:
+    body = b"preamble"
+    for headers, _, content in parts:
+        body += "\r\n--{}\r\n{}\r\n\r\n".format(BOUNDARY, headers).encode() + content
+    return body + "\r\n--{}--\r\nepilogue".format(BOUNDARY).encode()
+
+
+def field(name: str, value: bytes, content_type: typing.Optional[str] = None) -> tuple:
+    headers = 'Content-Disposition: form-data; name="{}"'.format(name)
+    if content_type:
+        headers += "\r\nContent-Type: {}".format(content_type)
+    return headers, name, value
+
+
+def upload(name: str, filename: str, value: bytes) -> tuple:
+    return (
+        'Content-Disposition: form-data; name="{}"; filename="{}"\r\n'
+        "Content-Type: application/octet-stream".format(name, filename),
+        name,
+        value,
+    )
+
+
+class ParserTests(unittest.TestCase):
+    def parse(self, body: bytes, chunk_size: int, **kwargs: typing.Any) -> list:
+        parts: typing.List[Part] = []
+        parser = MultipartParser(BOUNDARY.encode(), parts.append, **kwargs)
+        for start in range(0, len(body), chunk_size):
+            parser.feed(body[start : start + chunk_size])
+        self.assertTrue(parser.finished)
+        parser.close()
+        return parts
+
+    def test_chunking(self) -> None:
+        body = multipart(
+            field("title", b"Hello\r\n--not a boundary"),
+            upload("file", "a.bin", bytes(range(256)) * 10),
+        )
+        for chunk_size in (1, 7, 64, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                title, file = self.parse(body, chunk_size)
+                self.assertEqual("title", title.name)
+                self.assertIsNone(title.filename)
+                self.assertEqual("Hello\r\n--not a boundary", title.text())
+                self.assertEqual("file", file.name)
+                self.assertEqual("a.bin", file.filename)
+                self.assertEqual("application/octet-stream", file.content_type)
+                self.assertEqual(2560, file.size)
+                self.assertEqual(bytes(range(256)) * 10, file.read())
+
+    def test_delimiter_at_start(self) -> None:
+        body = multipart(field("a", b"1"))[len("preamble") + 2 :]
+        (part,) = self.parse(body, 3)
+        self.assertEqual(b"1", part.read())
+        self.assertEqual("<Part 'a' filename=None size=1>", repr(part))
+
+    def test_spooling(self) -> None:
+        small, large = self.parse(
+            multipart(upload("a", "a", b"x" * 10), upload("b", "b", b"x" * 100)),
+            16,
+            spool_threshold=50,
+        )
+        self.assertFalse(getattr(small.file, "_rolled"))
+        self.assertTrue(getattr(large.file, "_rolled"))
+
+    def test_field_size(self) -> None:
+        with self.assertRaises(LimitExceeded):
+            self.parse(multipart(field("a", b"x" * 100)), 16, max_field_size=50)
+        self.parse(multipart(upload("a", "a", b"x" * 100)), 16, max_field_size=50)
+
+    def test_malformed_bodies(self) -> None:
+        for body, message in (
+            (b"--" + BOUNDARY.encode() + b"garbage\r\n", "delimiter"),
+            (b"--" + BOUNDARY.encode() + b"x" * 100, "delimiter"),
+            (b"--" + BOUNDARY.encode() + b"\r\n" + b"x" * 100, "too large"),
+            (b"--" + BOUNDARY.encode() + b"\r\n\r\n", "no name"),
+        ):
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(MultipartError, message):
+                    self.parse(body, 1000, max_header_size=50)
+
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/upload": {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "multipart/form-data": {
+                            "schema": {
+                                "type": "object",
+                                "required": ["file", "metadata"],
+                                "additionalProperties": False,
+                                "properties": {
+                                    "file": {"type": "string", "format": "binary"},
+                                    "metadata": {
+                                        "type": "object",
+                                        "required": ["title"],
+                                    },
+                                    "count": {"type": "integer"},
+                                    "tags": {
+                                        "type": "array",
+                                        "items": {"type": "string"},
+                                    },
+                                },
+                            },
+                            "encoding": {
+                                "metadata": {"contentType": "application/json"}
+                            },
+                        },
+                        "application/json": {
+                            "schema": {"type": "object", "required": ["url"]}
+                        },
+                    }
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/open": {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "multipart/form-data": {
+                            "schema": {
+                                "type": "object",
+                                "additionalProperties": {"type": "integer"},
+                            }
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/loose": {
+            "post": {
+                "requestBody": {
+                    "content": {"multipart/form-data": {"schema": {"type": "object"}}}
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/unchecked": {
+            "post": {
+                "x-validation": "params",
+                "requestBody": {
+                    "content": {
+                        "multipart/form-data": {
+                            "schema": {"type": "object", "required": ["missing"]}
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/json": {
+            "post": {
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"type": "object"}}}
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/limited": {
+            "post": {
+                "x-max-body-size": 1000,
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"type": "object"}}}
+                },
+                "responses": {"200": {"description": "Uploaded"}},
+            }
+        },
+        "/empty": {"post": {"responses": {"200": {"description": "Done"}}}},
+    },
+}
+
+
+class StreamingHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class UploadHandler(StreamingMultipartHandler):
+            spec_dict = spec_dict
+            spool_threshold = 100
+            max_field_size = 1000
+            max_decompressed_size = 100000
+
+            async def post(self) -> None:
+                body = self.validated.body
+                assert body is not None
+                self.finish(
+                    {
+                        name: (
+                            {"filename": value.filename, "size": value.size}
+                            if isinstance(value, Part)
+                            else value
+                        )
+                        for name, value in body.items()
+                    }
+                )
+
+        return tornado.web.Application([(r".*", UploadHandler)])
+
+    def post(
+        self,
+        path: str,
+        body: bytes,
+        content_type: typing.Optional[str] = None,
+        encoding: typing.Optional[str] = None,
+    ) -> typing.Tuple[int, typing.Any]:
+        headers = {
+            "Content-Type": content_type
+            or "multipart/form-data; boundary={}".format(BOUNDARY)
+        }
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        response = self.fetch(path, method="POST", headers=headers, body=body)
+        return response.code, json.loads(response.body) if response.body else None
+
+    def test_valid_uploads(self) -> None:
+        self.assertEqual(
+            (
+                200,
+                {
+                    "file": {"filename": "a.bin", "size": 1000},
+                    "metadata": {"title": "A"},
+                    "count": 3,
+                    "tags": ["a", "b"],
+                },
+            ),
+            self.post(
+                "/upload",
+                multipart(
+                    field("metadata", b'{"title": "A"}'),
+                    field("count", b"3"),
+                    field("tags", b"a"),
+                    field("tags", b"b"),
+                    upload("file", "a.bin", b"x" * 1000),
+                ),
+            ),
+        )
+
+    def test_invalid_uploads(self) -> None:
+        file = upload("file", "a", b"")
+        metadata = field("metadata", b'{"title": "A"}')
+        for name, parts in (
+            ("invalid field", [file, field("metadata", b"{}")]),
+            ("invalid json", [file, field("metadata", b"{", "application/json")]),
+            ("uncastable field", [file, metadata, field("count", b"three")]),
+            ("missing part", [file]),
+            ("unexpected part", [file, metadata, field("other", b"")]),
+            ("repeated part", [file, metadata, metadata]),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(400, self.post("/upload", multipart(*parts))[0])
+
+    def test_malformed_uploads(self) -> None:
+        body = multipart(field("metadata", b"{}"))
+        self.assertEqual(400, self.post("/upload", body[: len(body) // 2])[0])
+        self.assertEqual(400, self.post("/upload", body.replace(b"\r\n\r\n", b""))[0])
+
+    def test_missing_boundaries(self) -> None:
+        body = multipart(field("metadata", b"{}"))
+        for content_type in ("multipart/form-data", "multipart/form-data; boundary="):
+            with self.subTest(content_type=content_type):
+                self.assertEqual(400, self.post("/upload", body, content_type)[0])
+
+    def test_large_fields(self) -> None:
+        body = multipart(
+            field("metadata", b" " * 1001), upload("file", "a", b"x" * 1000000)
+        )
+        self.assertEqual(413, self.post("/upload", body)[0])
+
+    def test_additional_properties(self) -> None:
+        self.assertEqual(
+            (200, {"a": 1}), self.post("/open", multipart(field("a", b"1")))
+        )
+        self.assertEqual(400, self.post("/open", multipart(field("a", b"b")))[0])
+        self.assertEqual(
+            (200, {"a": "b"}), self.post("/loose", multipart(field("a", b"b")))
+        )
+
+    def test_unvalidated_uploads(self) -> None:
+        self.assertEqual(
+            (200, {"count": "3"}),
+            self.post("/unchecked", multipart(field("count", b"3"))),
+        )
+        self.assertEqual(
+            (200, {"count": "3"}), self.post("/empty", multipart(field("count", b"3")))
+        )
+
+    def test_unsupported_uploads(self) -> None:
+        self.assertEqual(415, self.post("/json", multipart())[0])
+        self.assertEqual(404, self.post("/unknown", multipart())[0])
+
+    def test_buffered_bodies(self) -> None:
+        self.assertEqual(
+            (200, {"url": "a"}),
+            self.post("/upload", b'{"url": "a"}', "application/json"),
+        )
+        self.assertEqual(400, self.post("/upload", b"{}", "application/json")[0])
+
+    def test_compressed_uploads(self) -> None:
+        self.assertEqual(
+            (
+                200,
+                {
+                    "file": {"filename": "a.bin", "size": 50000},
+                    "metadata": {"title": "A"},
+                },
+            ),
+            self.post(
+                "/upload",
+                gzip.compress(
+                    multipart(
+                        field("metadata", b'{"title": "A"}'),
+                        upload("file", "a.bin", b"x" * 50000),
+                    )
+                ),
+                encoding="gzip",
+            ),
+        )
+        self.assertEqual(
+            (200, {"url": "a"}),
+            self.post(
+                "/upload",
+                zlib.compress(b'{"url": "a"}'),
+                "application/json",
+                encoding="deflate",
+            ),
+        )
+
+    def test_compressed_body_limits(self) -> None:
+        bomb = multipart(upload("file", "a", b"\0" * 200000))
+        self.assertEqual(
+            413, self.post("/upload", gzip.compress(bomb), encoding="gzip")[0]
+        )
+        body = json.dumps({"a": "x" * 1000}).encode()
+        self.assertEqual(
+            413,
+            self.post("/limited", gzip.compress(body), "application/json", "gzip")[0],
+        )
+        self.assertEqual(413, self.post("/limited", body, "application/json")[0])
+        self.assertEqual(
+            (200, {"a": "x"}),
+            self.post(
+                "/limited", gzip.compress(b'{"a": "x"}'), "application/json", "gzip"
+            ),
+        )
+
+    def test_malformed_compressed_bodies(self) -> None:
+        body = gzip.compress(
+            multipart(field("metadata", b'{"title": "A"}'), upload("file", "a", b""))
+        )
+        self.assertEqual(200, self.post("/upload", body, encoding="gzip")[0])
+        self.assertEqual(400, self.post("/upload", body[:-10], encoding="gzip")[0])
+        self.assertEqual(400, self.post("/upload", b"not gzip", encoding="gzip")[0])
+        self.assertEqual(415, self.post("/upload", body, encoding="br")[0])
+
+    @tornado.testing.gen_test
+    async def test_aborted_uploads(self) -> None:
+        body = multipart(
+            field("metadata", b'{"title": "A"}'), upload("file", "a", b"x" * 1000)
+        )
+        with unittest.mock.patch.object(Part, "close", autospec=True) as close:
+            stream = await tornado.tcpclient.TCPClient().connect(
+                "127.0.0.1", self.get_http_port()
+            )
+            await stream.write(
+                "POST /upload HTTP/1.1\r\n"
+                "Host: localhost\r\n"
+                "Content-Type: multipart/form-data; boundary={}\r\n"
+                "Content-Length: {}\r\n\r\n".format(BOUNDARY, len(body)).encode()
+                + body[: len(body) // 2]
+            )
+            await tornado.gen.sleep(0.1)
+            self.assertEqual(0, close.call_count)
+            stream.close()
+            while close.call_count < 2:
+                await tornado.gen.sleep(0.01)
+        self.assertEqual(
+            {"metadata", "file"}, {part.name for (part,), _ in close.call_args_list}
+        )
+
+
+class DerivedHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        self.calls: typing.List[str] = []
+        calls = self.calls
+
+        class UploadHandler(StreamingMultipartHandler):
+            spec_dict = spec_dict
+
+            def post(self) -> None:
+                calls.append("base")
+                self.finish()
+
+        class DerivedHandler(UploadHandler):
+            def post(self) -> None:
+                calls.append("derived")
+                super().post()
+
+        return tornado.web.Application([(r".*", DerivedHandler)])
+
+    def test_bodies_are_validated_once(self) -> None:
+        headers = {"Content-Type": "multipart/form-data; boundary={}".format(BOUNDARY)}
+        with unittest.mock.patch.object(
+            StreamingMultipartHandler,
+            "_finish_body",
+            autospec=True,
+            side_effect=StreamingMultipartHandler._finish_body,
+        ) as validate:
+            response = self.fetch(
+                "/unchecked",
+                method="POST",
+                headers=headers,
+                body=multipart(field("count", b"3")),
+            )
+        self.assertEqual(200, response.code)
+        self.assertEqual(1, validate.call_count)
+        self.assertEqual(["derived", "base"], self.calls)
+
+    def test_invalid_bodies(self) -> None:
+        response = self.fetch(
+            "/upload",
+            method="POST",
+            headers={
+                "Content-Type": "multipart/form-data; boundary={}".format(BOUNDARY)
+            },
+            body=multipart(field("metadata", b"{}")),
+        )
+        self.assertEqual(400, response.code)
+        self.assertEqual([], self.calls)
+
+
+class StreamingLimitsTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class UploadHandler(StreamingMultipartHandler):
+            spec_dict = spec_dict
+
+            async def post(self) -> None:
+                self.finish()
+
+        return tornado.web.Application(
+            [(r".*", UploadHandler)],
+            openapi_validation_limits=ValidationLimits(max_depth=5, max_nodes=100),
+        )
+
+    def post(self, path: str, *parts: tuple) -> int:
+        return self.fetch(
+            path,
+            method="POST",
+            headers={
+                "Content-Type": "multipart/form-data; boundary={}".format(BOUNDARY)
+            },
+            body=multipart(*parts),
+        ).code
+
+    def test_fields_share_limits(self) -> None:
+        fields = [field("a{}".format(i), b"1") for i in range(200)]
+        self.assertEqual(200, self.post("/open", *fields[:10]))
+        self.assertEqual(413, self.post("/open", *fields))
+
+    def test_field_depth(self) -> None:
+        metadata = {"title": "A", "nested": [[[[["deep"]]]]]}
+        self.assertEqual(
+            400,
+            self.post(
+                "/upload",
+                field("metadata", json.dumps(metadata).encode()),
+                upload("file", "a", b""),
+            ),
+        )
@@ -0,0 +1,246 @@
+import json
+import unittest
+import unittest.mock
+
+import openapi_core
+from openapi_core.templating.paths.exceptions import PathNotFound
+from openapi_core.validation.request.exceptions import SecurityValidationError
+import tornado.httputil
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.operations import (
+    DEFAULT_POLICY,
+    OperationPolicy,
+    find_policy,
+    policy,
+    read_policies,
+    unmarshal_body,
+    unmarshal_request,
+)
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+body_schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "x-validate-response-sample-rate": 0.5,
+    "components": {
+        "securitySchemes": {"bearer": {"type": "http", "scheme": "bearer"}},
+    },
+    "paths": {
+        "/telemetry": {
+            "post": {
+                "x-validation": "none",
+                "x-priority": "low",
+                "x-max-body-size": 1024,
+                "requestBody": {
+                    "content": {"application/json": {"schema": body_schema}}
+                },
+                "responses": {"204": {"description": "Accepted"}},
+            }
+        },
+        "/search": {
+            "x-validation": "params",
+            "post": {
+                "security": [{"bearer": []}],
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}}
+                ],
+                "requestBody": {
+                    "content": {"application/json": {"schema": body_schema}}
+                },
+                "responses": {"200": {"description": "Results"}},
+            },
+        },
+        "/admin": {
+            "x-validation": "params",
+            "post": {
+                "x-validation": "full",
+                "x-validate-response-sample-rate": 1,
+                "requestBody": {
+                    "content": {"application/json": {"schema": body_schema}}
+                },
+                "responses": {"200": {"description": "Success"}},
+            },
+        },
+    },
+}
+
+
+def request(
+    path: str, body: dict, authorization: str = "Bearer secret"
+) -> TornadoOpenAPIRequest:
+    return TornadoOpenAPIRequest(
+        tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri=path,
+            headers=tornado.httputil.HTTPHeaders(
+                {"Content-Type": "application/json", "Authorization": authorization}
+            ),
+            body=json.dumps(body).encode(),
+        )
+    )
+
+
+class OperationPolicyTests(unittest.TestCase):
+    def test_defaults(self) -> None:
+        self.assertEqual("full", DEFAULT_POLICY.validation)
+        self.assertEqual(1.0, DEFAULT_POLICY.response_sample_rate)
+        self.assertIsNone(DEFAULT_POLICY.max_body_size)
+
+    def test_invalid_validation_level(self) -> None:
+        with self.assertRaises(ValueError):
+            OperationPolicy(validation="some")
+
+    def test_invalid_sample_rate(self) -> None:
+        with self.assertRaises(ValueError):
+            OperationPolicy(response_sample_rate=1.5)
+
+    def test_invalid_priority(self) -> None:
+        with self.assertRaises(ValueError):
+            OperationPolicy(priority="urgent")
+
+    def test_invalid_max_body_size(self) -> None:
+        with self.assertRaises(ValueError):
+            OperationPolicy(max_body_size=-1)
+
+    def test_sample_response(self) -> None:
+        self.assertTrue(OperationPolicy(response_sample_rate=1).sample_response())
+        self.assertFalse(OperationPolicy(response_sample_rate=0).sample_response())
+        with unittest.mock.patch("random.random", return_value=0.3):
+            self.assertTrue(OperationPolicy(response_sample_rate=0.5).sample_response())
+            self.assertFalse(
+                OperationPolicy(response_sample_rate=0.2).sample_response()
+            )
+
+
+class UnmarshalRequestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def test_policies_are_inherited(self) -> None:
+        _, telemetry = unmarshal_request(self.spec, request("/telemetry", {}))
+        _, search = unmarshal_request(self.spec, request("/search", {}))
+        _, admin = unmarshal_request(self.spec, request("/admin", {}))
+        self.assertEqual(
+            OperationPolicy("none", 0.5, priority="low", max_body_size=1024), telemetry
+        )
+        self.assertEqual(OperationPolicy("params", 0.5), search)
+        self.assertEqual(OperationPolicy("full", 1.0), admin)
+
+    def test_find_policy(self) -> None:
+        self.assertEqual(
+            "low", find_policy(self.spec, request("/telemetry", {})).priority
+        )
+        self.assertIs(DEFAULT_POLICY, find_policy(self.spec, request("/missing", {})))
+
+    def test_read_policies(self) -> None:
+        policies = read_policies(self.spec)
+        self.assertIs(policies, read_policies(self.spec))
+        self.assertEqual(
+            ["POST /telemetry", "POST /search", "POST /admin"],
+            [operation_policy.operation_id for operation_policy in policies.values()],
+        )
+        invalid = dict(spec_dict, **{"x-priority": "urgent"})
+        with self.assertRaisesRegex(ValueError, "x-priority"):
+            read_policies(openapi_core.OpenAPI.from_dict(invalid))
+
+    def test_policies_are_read_once(self) -> None:
+        paths = self.spec.spec / "paths"
+        path = paths / "/admin"
+        operation = path / "post"
+        self.assertIs(
+            policy(self.spec, path, operation), policy(self.spec, path, operation)
+        )
+
+    def test_unknown_path(self) -> None:
+        result, operation_policy = unmarshal_request(self.spec, request("/missing", {}))
+        self.assertIsInstance(list(result.errors)[0], PathNotFound)
+        self.assertIs(DEFAULT_POLICY, operation_policy)
+
+    def test_no_validation(self) -> None:
+        result, _ = unmarshal_request(self.spec, request("/telemetry?x=1", {}))
+        self.assertEqual([], result.errors)
+        self.assertIsNone(result.body)
+
+    def test_parameter_validation(self) -> None:
+        result, _ = unmarshal_request(self.spec, request("/search?limit=10", {}))
+        self.assertEqual([], result.errors)
+        self.assertEqual({"limit": 10}, result.parameters.query)
+        self.assertEqual({"bearer": "secret"}, result.security)
+        self.assertIsNone(result.body)
+
+    def test_invalid_parameters(self) -> None:
+        result, _ = unmarshal_request(self.spec, request("/search?limit=ten", {}))
+        self.assertEqual(1, len(list(result.errors)))
+        self.assertEqual({"bearer": "secret"}, result.security)
+
+    def test_missing_security(self) -> None:
+        result, _ = unmarshal_request(
+            self.spec, request("/search?limit=10", {}, authorization="")
+        )
+        self.assertIsInstance(list(result.errors)[0], SecurityValidationError)
+
+    def test_full_validation(self) -> None:
+        result, _ = unmarshal_request(self.spec, request("/admin", {}))
+        self.assertEqual(1, len(list(result.errors)))
+        result, _ = unmarshal_request(self.spec, request("/admin", {"name": "Name"}))
+        self.assertEqual([], result.errors)
+        self.assertEqual({"name": "Name"}, result.body)
+
+    def test_body_validation(self) -> None:
+        result, _ = unmarshal_request(
+            self.spec, request("/admin", {}), validate_body=False
+        )
+        self.assertEqual([], result.errors)
+        self.assertIsNone(result.body)
+        self.assertEqual(
+            1, len(list(unmarshal_body(self.spec, request("/admin", {})).errors))
+        )
+        self.assertEqual(
+            {"name": "Name"},
+            unmarshal_body(self.spec, request("/admin", {"name": "Name"})).body,
+        )
+        self.assertIsNone(unmarshal_body(self.spec, request("/search", {})).body)
+        self.assertIsInstance(
+            list(unmarshal_body(self.spec, request("/missing", {})).errors)[0],
+            PathNotFound,
+        )
+
+
+class PolicyHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+            async def post(self) -> None:
+                self.finish(self.operation_policy.validation)
+
+        return tornado.web.Application([(r".*", Handler)])
+
+    def post(self, path: str, body: dict) -> tornado.httpclient.HTTPResponse:
+        return self.fetch(
+            path,
+            method="POST",
+            headers={
+                "Authorization": "Bearer secret",
+                "Content-Type": "application/json",
+            },
+            body=json.dumps(body),
+        )
+
+    def test_operation_policies_are_applied(self) -> None:
+        response = self.post("/telemetry", {})
+        self.assertEqual(200, response.code)
+        self.assertEqual(b"none", response.body)
+        response = self.post("/search", {})
+        self.assertEqual(200, response.code)
+        self.assertEqual(b"params", response.body)
+        self.assertEqual(400, self.post("/admin", {}).code)
@@ -0,0 +1,257 @@
+import json
+import time
+import unittest
+import unittest.mock
+
+import openapi_core
+import tornado.httputil
+import tornado.web
+
+from tornado_openapi3 import patterns, validators
+from tornado_openapi3.client import compile_spec, specs
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.registry import SpecRegistry
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+CATASTROPHIC = r"^(a|aa)+$"
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "components": {
+        "schemas": {
+            "resource": {
+                "type": "object",
+                "properties": {
+                    "code": {"type": "string", "pattern": CATASTROPHIC},
+                    "pattern": {"type": "string", "pattern": "^[a-z]+$"},
+                },
+            }
+        }
+    },
+    "paths": {
+        "/resource/{id}": {
+            "post": {
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string", "pattern": r"^(\w+\s?)*$"},
+                    }
+                ],
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/resource"}
+                        }
+                    }
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+    },
+}
+
+
+def request(body: dict, id: str = "abc") -> TornadoOpenAPIRequest:
+    return TornadoOpenAPIRequest(
+        tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/resource/" + id,
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": "application/json"}),
+            body=json.dumps(body).encode(),
+        )
+    )
+
+
+class RiskTests(unittest.TestCase):
+    def test_nested_quantifiers(self) -> None:
+        for pattern in (
+            r"(a+)+$",
+            r"^(\w+\s?)*$",
+            r"(x+x+)+y",
+            r"(?:a{2,5})*",
+            r"^(?:x|(a+)+)$",
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertEqual("nested quantifier", patterns.risk(pattern))
+
+    def test_overlapping_alternation(self) -> None:
+        for pattern in (CATASTROPHIC, r"(\wa|\db)+", r"(ab|[a-c]d)*$", r"(a|.)*"):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(
+                    "repeated alternation with overlapping branches",
+                    patterns.risk(pattern),
+                )
+
+    def test_safe_patterns(self) -> None:
+        for pattern in (
+            r"^[a-z]+$",
+            r"^(ab|cd)*$",
+            r"^\d{4}-\d{2}-\d{2}$",
+            r"(ab?)+",
+            r"^(?:[ab]c|d)+$",
+            r"^(x|y|\b)$",
+            r"^(?:(a|b)c|(d|e)f)$",
+            r"^(?:(a)b|(c)d|\bx)+$",
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertIsNone(patterns.risk(pattern))
+
+    def test_invalid_pattern(self) -> None:
+        reason = patterns.risk("(")
+        assert reason is not None
+        self.assertTrue(reason.startswith("invalid pattern"))
+
+
+class AnalyzeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def test_find_patterns(self) -> None:
+        self.assertEqual(
+            {
+                "#/components/schemas/resource/properties/code/pattern",
+                "#/components/schemas/resource/properties/pattern/pattern",
+                "#/paths/~1resource~1{id}/post/parameters/0/schema/pattern",
+            },
+            {location for location, _ in patterns.find_patterns(self.spec)},
+        )
+
+    def test_analyze(self) -> None:
+        self.assertEqual(
+            [
+                patterns.PatternReport(
+                    "#/components/schemas/resource/properties/code/pattern",
+                    CATASTROPHIC,
+                    "repeated alternation with overlapping branches",
+                ),
+                patterns.PatternReport(
+                    "#/paths/~1resource~1{id}/post/parameters/0/schema/pattern",
+                    r"^(\w+\s?)*$",
+                    "nested quantifier",
+                ),
+            ],
+            patterns.analyze(self.spec),
+        )
+
+    def test_precompile_reports_once(self) -> None:
+        with self.assertLogs("tornado_openapi3.patterns", "WARNING") as logs:
+            reports = patterns.precompile(self.spec)
+            patterns.precompile(openapi_core.OpenAPI.from_dict(spec_dict))
+        self.assertEqual(patterns.analyze(self.spec), reports)
+        self.assertEqual(2, len(logs.records))
+        self.assertEqual([], patterns.precompile(self.spec))
+        self.assertIn(CATASTROPHIC, patterns._compiled)
+
+    def test_precompile_invalid_patterns(self) -> None:
+        spec = openapi_core.OpenAPI.from_dict(
+            {
+                "openapi": "3.0.0",
+                "info": {"title": "Test API", "version": "1.0.0"},
+                "paths": {},
+                "components": {"schemas": {"bad": {"pattern": "("}}},
+            }
+        )
+        with self.assertLogs("tornado_openapi3.patterns", "WARNING") as logs:
+            self.assertEqual([], patterns.precompile(spec))
+        self.assertIn("Could not compile", logs.output[0])
+
+    def test_specs_are_precompiled_when_loaded(self) -> None:
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+        registry = SpecRegistry()
+        registry.add("/v1", spec_dict)
+        specs.clear()
+        request = tornado.httputil.HTTPServerRequest(
+            method="GET", uri="/", connection=unittest.mock.Mock()
+        )
+        for spec in (
+            Handler(tornado.web.Application(), request).spec,
+            registry.spec("/v1"),
+            compile_spec(spec_dict),
+        ):
+            self.assertIn(spec, patterns._precompiled)
+
+        # Validating requests does not precompile specs that were not loaded
+        # by one of the above.
+        validators.request_unmarshaller(self.spec)
+        self.assertNotIn(self.spec, patterns._precompiled)
+
+
+class EngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = patterns.get_engine()
+
+    def tearDown(self) -> None:
+        patterns.set_engine(self.engine)
+
+    def test_default_engine(self) -> None:
+        self.assertIs(type(self.engine), patterns.PatternEngine)
+        self.assertTrue(patterns.compile_pattern("^a")("abc"))
+        self.assertIs(patterns.compile_pattern("^a"), patterns.compile_pattern("^a"))
+
+    def test_set_engine_discards_compiled_patterns(self) -> None:
+        matcher = patterns.compile_pattern("^a")
+        patterns.set_engine(patterns.PatternEngine())
+        self.assertIsNot(matcher, patterns.compile_pattern("^a"))
+
+    def test_re2_engine(self) -> None:
+        patterns.set_engine(patterns.RE2Engine())
+        start = time.perf_counter()
+        self.assertFalse(patterns.compile_pattern(CATASTROPHIC)("a" * 64 + "!"))
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_re2_engine_fallback(self) -> None:
+        patterns.set_engine(patterns.RE2Engine())
+        with self.assertLogs("tornado_openapi3.patterns", "WARNING"):
+            matcher = patterns.compile_pattern(r"^(a)\1$")
+        self.assertTrue(matcher("aa"))
+
+    def test_timeout_engine(self) -> None:
+        patterns.set_engine(patterns.TimeoutEngine(0.05))
+        spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        start = time.perf_counter()
+        result, _ = unmarshal_request(spec, request({"code": "a" * 64 + "!"}))
+        self.assertLess(time.perf_counter() - start, 5)
+        errors = list(result.errors)
+        self.assertEqual(1, len(errors))
+        self.assertIn("in time", str(errors[0].__cause__))
+
+
+class ValidationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def test_matching_values(self) -> None:
+        result, _ = unmarshal_request(
+            self.spec, request({"code": "aaa", "pattern": "abc"})
+        )
+        self.assertEqual([], list(result.errors))
+
+    def test_mismatched_values(self) -> None:
+        result, _ = unmarshal_request(self.spec, request({"pattern": "ABC"}))
+        errors = list(result.errors)
+        self.assertEqual(1, len(errors))
+        self.assertIn("does not match", str(errors[0].__cause__))
+
+    def test_mismatched_parameters(self) -> None:
+        result, _ = unmarshal_request(self.spec, request({}, id="a-b"))
+        self.assertEqual(1, len(list(result.errors)))
+
+    def test_non_string_values_are_ignored(self) -> None:
+        validator = patterns.validator_class(self.validator_class())({"pattern": "^a$"})
+        self.assertEqual([], list(validator.iter_errors(1)))
+
+    def test_validator_classes_are_extended_once(self) -> None:
+        self.assertIs(
+            patterns.validator_class(self.validator_class()),
+            patterns.validator_class(self.validator_class()),
+        )
+
+    def validator_class(self) -> type:
+        factory = getattr(self.spec.request_unmarshaller, "schema_validators_factory")
+        return factory.schema_validator_class
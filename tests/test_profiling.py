@@ -0,0 +1,182 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+import unittest.mock
+
+import openapi_core
+import tornado.httputil
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.profiling import REDACTED, ValidationProfiler, summarize
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+spec_dict: dict = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/users/{id}": {
+            "post": {
+                "operationId": "updateUser",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string"},
+                    }
+                ],
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"type": "object"}}}
+                },
+                "responses": {"200": {"description": "Success"}},
+            }
+        }
+    },
+}
+
+
+def request(uri: str = "/users/alice?token=secret") -> TornadoOpenAPIRequest:
+    return TornadoOpenAPIRequest(
+        tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri=uri,
+            headers=tornado.httputil.HTTPHeaders(
+                {"Content-Type": "application/json", "Authorization": "Bearer secret"}
+            ),
+            body=b'{"name": "Alice"}',
+        )
+    )
+
+
+class ProfilerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def profile(self, profiler: ValidationProfiler) -> None:
+        openapi_request = request()
+        with self.assertLogs("tornado_openapi3.profiling", "WARNING"):
+            with profiler.profile(self.spec, openapi_request):
+                unmarshal_request(self.spec, openapi_request)
+
+    def test_slow_requests_are_recorded(self) -> None:
+        profiler = ValidationProfiler(self.directory.name, threshold=0)
+        self.profile(profiler)
+        self.assertEqual(
+            ["validation-000.json", "validation-000.prof"],
+            sorted(os.listdir(self.directory.name)),
+        )
+        base = os.path.join(self.directory.name, "validation-000")
+        functions = getattr(pstats.Stats(base + ".prof"), "stats")
+        self.assertIn("unmarshal_request", [name for _, _, name in functions])
+        with open(base + ".json") as f:
+            summary = json.load(f)
+        self.assertEqual("updateUser", summary["operationId"])
+        self.assertEqual("/users/{id}", summary["path"])
+        self.assertGreater(summary["elapsed"], 0)
+
+    def test_profiles_are_bounded(self) -> None:
+        profiler = ValidationProfiler(self.directory.name, threshold=0, max_profiles=2)
+        for _ in range(3):
+            self.profile(profiler)
+        self.assertEqual(
+            [
+                "validation-000.json",
+                "validation-000.prof",
+                "validation-001.json",
+                "validation-001.prof",
+            ],
+            sorted(os.listdir(self.directory.name)),
+        )
+
+    def test_fast_requests_are_not_recorded(self) -> None:
+        profiler = ValidationProfiler(self.directory.name, threshold=60)
+        with profiler.profile(self.spec, request()):
+            pass
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def test_unsampled_requests_are_not_profiled(self) -> None:
+        profiler = ValidationProfiler(self.directory.name, threshold=0, sample_rate=0)
+        with unittest.mock.patch("cProfile.Profile") as profile:
+            with profiler.profile(self.spec, request()):
+                pass
+        profile.assert_not_called()
+
+    def test_active_profilers_are_left_alone(self) -> None:
+        profiler = ValidationProfiler(self.directory.name, threshold=0)
+        with unittest.mock.patch(
+            "cProfile.Profile.enable", side_effect=ValueError("already active")
+        ):
+            with profiler.profile(self.spec, request()):
+                pass
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def test_invalid_settings(self) -> None:
+        with self.assertRaises(ValueError):
+            ValidationProfiler(self.directory.name, max_profiles=0)
+        with self.assertRaises(ValueError):
+            ValidationProfiler(self.directory.name, sample_rate=2)
+
+
+class SummarizeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def test_summary_is_redacted(self) -> None:
+        self.assertEqual(
+            {
+                "operationId": "updateUser",
+                "method": "POST",
+                "path": "/users/{id}",
+                "headers": {
+                    "Content-Type": "application/json",
+                    "Authorization": REDACTED,
+                },
+                "query": {"token": REDACTED},
+                "body_size": 17,
+            },
+            summarize(self.spec, request()),
+        )
+
+    def test_unknown_paths(self) -> None:
+        summary = summarize(self.spec, request("/unknown"))
+        self.assertIsNone(summary["operationId"])
+        self.assertIsNone(summary["path"])
+
+
+class ProfilerHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        super().setUp()
+
+    def get_app(self) -> tornado.web.Application:
+        class Handler(OpenAPIRequestHandler):
+            spec_dict = spec_dict
+
+            async def post(self, id: str) -> None:
+                self.finish()
+
+        return tornado.web.Application(
+            [(r"/users/(.*)", Handler)],
+            openapi_validation_profiler=ValidationProfiler(
+                self.directory.name, threshold=0
+            ),
+        )
+
+    def test_profiler(self) -> None:
+        with self.assertLogs("tornado_openapi3.profiling", "WARNING"):
+            response = self.fetch(
+                "/users/alice",
+                method="POST",
+                headers={"Content-Type": "application/json"},
+                body="{}",
+            )
+        self.assertEqual(200, response.code)
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
@@ -0,0 +1,187 @@
+import copy
+import json
+import typing
+import unittest
+
+import tornado.testing
+import tornado.web
+
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.registry import SpecRegistry
+from tornado_openapi3.types import Formatter
+
+from tests.test_handler import USDateFormatter
+
+
+def spec(required: typing.List[str]) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "Test API",
+            "version": "1.0.0",
+        },
+        "components": {
+            "schemas": {
+                "date": {"type": "string", "format": "usdate"},
+                "resource": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "date": {"$ref": "#/components/schemas/date"},
+                    },
+                    "required": required,
+                },
+            },
+        },
+        "paths": {
+            "/resource": {
+                "post": {
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/resource"},
+                            }
+                        },
+                    },
+                    "responses": {"200": {"description": "Success"}},
+                }
+            }
+        },
+    }
+
+
+class SpecRegistryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = SpecRegistry()
+        self.registry.add("/v1/", spec(["name"]))
+        self.registry.add("/v2", spec(["name", "date"]))
+        self.registry.add("/v2/admin", spec(["name"]))
+
+    def test_longest_prefix_matches(self) -> None:
+        self.assertEqual("/v1", self.registry.prefix("/v1/resource"))
+        self.assertEqual("/v2", self.registry.prefix("/v2"))
+        self.assertEqual("/v2/admin", self.registry.prefix("/v2/admin/resource"))
+        self.assertEqual("/v2", self.registry.prefix("/v2/administrator"))
+
+    def test_prefixes_match_whole_segments(self) -> None:
+        self.assertIsNone(self.registry.prefix("/v10/resource"))
+        self.assertIsNone(self.registry.spec("/v10/resource"))
+        self.assertIsNone(self.registry.spec_dict("/v10/resource"))
+
+    def test_root_prefix(self) -> None:
+        self.registry.add("/", spec([]))
+        self.assertEqual("", self.registry.prefix("/v10/resource"))
+        self.assertEqual("", self.registry.prefix("/"))
+        spec_dict = self.registry.spec_dict("/")
+        assert spec_dict is not None
+        self.assertEqual([{"url": "/"}], spec_dict["servers"])
+
+    def test_prefixes_must_be_unique(self) -> None:
+        with self.assertRaises(ValueError):
+            self.registry.add("/v1", spec([]))
+
+    def test_prefix_is_used_as_default_server(self) -> None:
+        spec_dict = self.registry.spec_dict("/v1/resource")
+        assert spec_dict is not None
+        self.assertEqual([{"url": "/v1"}], spec_dict["servers"])
+
+    def test_servers_are_preserved(self) -> None:
+        spec_dict = spec([])
+        spec_dict["servers"] = [{"url": "https://example.com/api"}]
+        self.registry.add("/api", spec_dict)
+        mounted = self.registry.spec_dict("/api")
+        assert mounted is not None
+        self.assertEqual(spec_dict["servers"], mounted["servers"])
+
+    def test_added_specs_are_not_modified(self) -> None:
+        spec_dict = spec([])
+        original = copy.deepcopy(spec_dict)
+        self.registry.add("/v3", spec_dict)
+        self.assertEqual(original, spec_dict)
+
+    def test_identical_components_are_shared(self) -> None:
+        v1 = self.registry.spec_dict("/v1")
+        v2 = self.registry.spec_dict("/v2")
+        admin = self.registry.spec_dict("/v2/admin")
+        assert v1 is not None and v2 is not None and admin is not None
+        v1_schemas = v1["components"]["schemas"]
+        v2_schemas = v2["components"]["schemas"]
+        admin_schemas = admin["components"]["schemas"]
+        self.assertIs(v1_schemas["date"], v2_schemas["date"])
+        self.assertIsNot(v1_schemas["resource"], v2_schemas["resource"])
+        self.assertIs(v1_schemas["resource"], admin_schemas["resource"])
+
+    def test_specs_without_components(self) -> None:
+        spec_dict = spec([])
+        del spec_dict["components"]
+        spec_dict["paths"] = {}
+        self.registry.add("/empty", spec_dict)
+        self.assertIsNotNone(self.registry.spec("/empty"))
+
+    def test_component_extensions(self) -> None:
+        spec_dict = spec([])
+        spec_dict["components"]["x-owner"] = "team"
+        self.registry.add("/v3", spec_dict)
+        mounted = self.registry.spec_dict("/v3")
+        assert mounted is not None
+        self.assertEqual("team", mounted["components"]["x-owner"])
+
+    def test_specs_are_compiled_once(self) -> None:
+        self.assertIs(self.registry.spec("/v1/a"), self.registry.spec("/v1/b"))
+        self.assertIsNot(self.registry.spec("/v1/a"), self.registry.spec("/v2/a"))
+
+    def test_invalid_policies(self) -> None:
+        self.registry.add("/v3", dict(spec(["name"]), **{"x-max-body-size": -1}))
+        with self.assertRaisesRegex(ValueError, "x-max-body-size"):
+            self.registry.spec("/v3")
+
+
+class ResourceHandler(OpenAPIRequestHandler):
+    async def post(self) -> None:
+        body = self.validated.body
+        assert isinstance(body, dict)
+        self.finish(json.dumps({"date": str(body.get("date"))}))
+
+
+class RegistryHandlerTests(tornado.testing.AsyncHTTPTestCase):
+    def get_app(self) -> tornado.web.Application:
+        registry = SpecRegistry()
+        formatters: typing.Dict[str, Formatter] = {"usdate": USDateFormatter()}
+        registry.add("/v1", spec(["name"]), custom_formatters=formatters)
+        registry.add("/v2", spec(["name", "date"]), custom_formatters=formatters)
+
+        class UnregisteredHandler(OpenAPIRequestHandler):
+            spec_dict = spec(["name"])
+
+            async def post(self) -> None:
+                self.finish()
+
+        return tornado.web.Application(
+            [
+                (r"/v1/resource", ResourceHandler),
+                (r"/v2/resource", ResourceHandler),
+                (r"/resource", UnregisteredHandler),
+            ],
+            openapi_registry=registry,
+        )
+
+    def post(self, path: str, body: dict) -> tornado.httpclient.HTTPResponse:
+        return self.fetch(
+            path,
+            method="POST",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps(body),
+        )
+
+    def test_requests_are_validated_against_their_prefix(self) -> None:
+        self.assertEqual(200, self.post("/v1/resource", {"name": "Name"}).code)
+        self.assertEqual(400, self.post("/v2/resource", {"name": "Name"}).code)
+
+    def test_custom_formatters(self) -> None:
+        response = self.post("/v2/resource", {"name": "Name", "date": "01/02/2020"})
+        self.assertEqual(200, response.code)
+        self.assertEqual({"date": "2020-01-02"}, json.loads(response.body))
+
+    def test_unregistered_paths_use_handler_spec(self) -> None:
+        self.assertEqual(200, self.post("/resource", {"name": "Name"}).code)
+        self.assertEqual(400, self.post("/resource", {}).code)
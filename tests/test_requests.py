@@ -7,6 +7,7 @@ import urllib.parse
 
 from hypothesis import given, provisional
 import hypothesis.strategies as s
+import openapi_core
 import openapi_core.datatypes
 import openapi_core.protocols
 from openapi_core.validation.request.datatypes import RequestParameters
@@ -14,6 +15,8 @@ import tornado.httpclient
 import tornado.httputil
 from werkzeug.datastructures import ImmutableMultiDict
 
+from tornado_openapi3.cache import ValidationCache
+from tornado_openapi3.operations import unmarshal_request
 import tornado_openapi3.requests
 
 from tests import common
@@ -194,3 +197,201 @@ class RequestTests(unittest.TestCase):
             self.openapi_to_tornado_server_request(request)
         )
         self.assertOpenAPIRequestsEqual(converted, request)
+
+
+class RequestCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tornado_openapi3.requests.url_cache.clear()
+        tornado_openapi3.requests.cookie_cache.clear()
+
+    def tearDown(self) -> None:
+        tornado_openapi3.requests.url_cache.maxsize = 1024
+        tornado_openapi3.requests.cookie_cache.maxsize = 1024
+
+    def request(self) -> tornado.httpclient.HTTPRequest:
+        headers = tornado.httputil.HTTPHeaders()
+        headers.add("Cookie", "session=abc; theme=dark")
+        return tornado.httpclient.HTTPRequest(
+            "http://example.com/health?verbose=1&verbose=2", headers=headers
+        )
+
+    def test_repeated_requests_share_parsed_parameters(self) -> None:
+        first = tornado_openapi3.requests.TornadoOpenAPIRequest(self.request())
+        second = tornado_openapi3.requests.TornadoOpenAPIRequest(self.request())
+        self.assertIs(first.parameters.query, second.parameters.query)
+        self.assertIs(first.parameters.cookie, second.parameters.cookie)
+        self.assertEqual(
+            ImmutableMultiDict([("verbose", "1"), ("verbose", "2")]),
+            second.parameters.query,
+        )
+        self.assertEqual("dark", second.parameters.cookie["theme"])
+        self.assertEqual("/health", second.path)
+        self.assertEqual("http://example.com", second.host_url)
+        self.assertEqual(1, tornado_openapi3.requests.url_cache.hits)
+        self.assertEqual(1, tornado_openapi3.requests.url_cache.misses)
+        self.assertEqual(1, tornado_openapi3.requests.cookie_cache.hits)
+
+    def test_caching_can_be_disabled(self) -> None:
+        tornado_openapi3.requests.url_cache.maxsize = 0
+        tornado_openapi3.requests.cookie_cache.maxsize = 0
+        first = tornado_openapi3.requests.TornadoOpenAPIRequest(self.request())
+        second = tornado_openapi3.requests.TornadoOpenAPIRequest(self.request())
+        self.assertIsNot(first.parameters.query, second.parameters.query)
+        self.assertEqual(first.parameters.query, second.parameters.query)
+        self.assertEqual(first.parameters.cookie, second.parameters.cookie)
+
+
+class FormBodyTests(unittest.TestCase):
+    spec = openapi_core.OpenAPI.from_dict(
+        {
+            "openapi": "3.0.0",
+            "info": {"title": "Test API", "version": "1.0.0"},
+            "paths": {
+                "/form": {
+                    "post": {
+                        "requestBody": {
+                            "content": {
+                                content_type: {
+                                    "schema": {
+                                        "type": "object",
+                                        "required": ["name"],
+                                        "properties": {
+                                            "name": {"type": "string"},
+                                            "age": {"type": "integer"},
+                                        },
+                                    }
+                                }
+                                for content_type in (
+                                    "application/x-www-form-urlencoded",
+                                    "multipart/form-data",
+                                )
+                            }
+                        },
+                        "responses": {"200": {"description": "Success"}},
+                    }
+                }
+            },
+        }
+    )
+
+    def request(
+        self, body: bytes, content_type: str = "application/x-www-form-urlencoded"
+    ) -> tornado.httputil.HTTPServerRequest:
+        request = tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/form",
+            headers=tornado.httputil.HTTPHeaders({"Content-Type": content_type}),
+            body=body,
+        )
+        request._parse_body()
+        return request
+
+    def multipart(self) -> tornado.httputil.HTTPServerRequest:
+        return self.request(
+            b"--x\r\n"
+            b'Content-Disposition: form-data; name="name"\r\n\r\n'
+            b"Alice\r\n"
+            b"--x\r\n"
+            b'Content-Disposition: form-data; name="age"; filename="age.txt"\r\n'
+            b"Content-Type: text/plain\r\n\r\n"
+            b"42\r\n"
+            b"--x--\r\n",
+            "multipart/form-data; boundary=x",
+        )
+
+    def test_urlencoded_arguments(self) -> None:
+        request = self.request(b"name=Alice&age=42&age=43&blank=")
+        body = tornado_openapi3.requests.TornadoOpenAPIRequest(request).body
+        assert isinstance(body, tornado_openapi3.requests.FormBody)
+        self.assertIs(request.body, body.body)
+        self.assertEqual(len(request.body), len(body))
+        self.assertEqual(
+            ImmutableMultiDict([("name", "Alice"), ("age", "42"), ("age", "43")]),
+            body.arguments,
+        )
+
+    def test_multipart_arguments(self) -> None:
+        request = self.multipart()
+        body = tornado_openapi3.requests.TornadoOpenAPIRequest(request).body
+        assert isinstance(body, tornado_openapi3.requests.FormBody)
+        self.assertEqual(
+            ImmutableMultiDict([("name", b"Alice"), ("age", b"42")]), body.arguments
+        )
+
+    def test_unparsed_bodies(self) -> None:
+        for request in (
+            tornado.httputil.HTTPServerRequest(method="POST", uri="/", body=b"a=b"),
+            tornado.httputil.HTTPServerRequest(method="POST", uri="/"),
+            tornado.httpclient.HTTPRequest("http://example.com", body=b"a=b"),
+        ):
+            body = tornado_openapi3.requests.TornadoOpenAPIRequest(request).body
+            self.assertNotIsInstance(body, tornado_openapi3.requests.FormBody)
+            self.assertEqual(request.body, body)
+
+    def test_changed_bodies(self) -> None:
+        request = self.request(b"name=Alice")
+        openapi_request = tornado_openapi3.requests.TornadoOpenAPIRequest(request)
+        self.assertIs(openapi_request.body, openapi_request.body)
+        request.body = b"name=Bob"
+        request.body_arguments = {"name": [b"Bob"]}
+        body = openapi_request.body
+        assert isinstance(body, tornado_openapi3.requests.FormBody)
+        self.assertEqual(b"name=Bob", body.body)
+        self.assertEqual("Bob", body.arguments["name"])
+
+    def test_validation(self) -> None:
+        unparsed = tornado.httputil.HTTPServerRequest(
+            method="POST",
+            uri="/form",
+            headers=tornado.httputil.HTTPHeaders(
+                {"Content-Type": "application/x-www-form-urlencoded"}
+            ),
+            body=b"name=Alice&age=42",
+        )
+        for request in (self.request(b"name=Alice&age=42"), self.multipart(), unparsed):
+            result, _ = unmarshal_request(
+                self.spec, tornado_openapi3.requests.TornadoOpenAPIRequest(request)
+            )
+            self.assertEqual([], result.errors)
+            self.assertEqual({"name": "Alice", "age": 42}, result.body)
+        result, _ = unmarshal_request(
+            self.spec,
+            tornado_openapi3.requests.TornadoOpenAPIRequest(self.request(b"age=42")),
+        )
+        self.assertEqual(1, len(list(result.errors)))
+
+    def test_cached_validation(self) -> None:
+        cache = ValidationCache()
+        for _ in range(2):
+            result, _ = unmarshal_request(
+                self.spec,
+                tornado_openapi3.requests.TornadoOpenAPIRequest(
+                    self.request(b"name=Alice")
+                ),
+                cache,
+            )
+            self.assertEqual({"name": "Alice"}, result.body)
+        self.assertEqual(1, cache.cache(self.spec).hits)
+
+    def test_custom_deserializers(self) -> None:
+        values = []
+
+        def loads(value: bytes) -> dict:
+            values.append(value)
+            return dict(urllib.parse.parse_qsl(value.decode()))
+
+        spec = openapi_core.OpenAPI.from_dict(
+            self.spec.spec.contents(),
+            config=openapi_core.Config(
+                extra_media_type_deserializers={
+                    "application/x-www-form-urlencoded": loads
+                }
+            ),
+        )
+        request = self.request(b"name=Alice")
+        result, _ = unmarshal_request(
+            spec, tornado_openapi3.requests.TornadoOpenAPIRequest(request)
+        )
+        self.assertEqual({"name": "Alice"}, result.body)
+        self.assertEqual([request.body], values)
+        self.assertIs(request.body, values[0])
@@ -1,4 +1,6 @@
+import json
 import unittest
+import unittest.mock
 
 from tornado_openapi3 import util
 
@@ -14,3 +16,55 @@ class TestMimetypeParsing(unittest.TestCase):
         self.assertEqual(
             "application/custom+json", util.parse_mimetype("application/custom+json")
         )
+
+
+class TestJSONSerialization(unittest.TestCase):
+    def test_json_dumps_without_orjson(self) -> None:
+        value = {"name": "Café", "tags": ["a", 1, None, True]}
+        with unittest.mock.patch.object(util, "orjson", None):
+            serialized = util.json_dumps(value)
+        self.assertEqual(b'{"name":"Caf\\u00e9","tags":["a",1,null,true]}', serialized)
+        self.assertEqual(json.loads(util.json_dumps(value)), json.loads(serialized))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_and_set(self) -> None:
+        cache: util.LRUCache[str, int] = util.LRUCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(1, cache.get("a"))
+        self.assertIn("a", cache)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_least_recently_used_items_are_evicted(self) -> None:
+        cache: util.LRUCache[str, int] = util.LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(2, len(cache))
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+
+    def test_resizing_evicts_items(self) -> None:
+        cache: util.LRUCache[str, int] = util.LRUCache(maxsize=3)
+        for key, value in zip("abc", range(3)):
+            cache.set(key, value)
+        cache.maxsize = 1
+        self.assertEqual(1, cache.maxsize)
+        self.assertEqual(["c"], [key for key in "abc" if key in cache])
+
+    def test_zero_size_disables_caching(self) -> None:
+        cache: util.LRUCache[str, int] = util.LRUCache(maxsize=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self) -> None:
+        cache: util.LRUCache[str, int] = util.LRUCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        cache.clear()
+        self.assertEqual((0, 0, 0), (len(cache), cache.hits, cache.misses))
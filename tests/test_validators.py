@@ -0,0 +1,110 @@
+import typing
+import unittest
+
+from jsonschema_path import SchemaPath
+import openapi_core
+from openapi_core.validation.schemas.exceptions import InvalidSchemaValue
+
+from tornado_openapi3 import validators
+
+from tests.test_batch import spec_dict
+
+
+class CachingValidatorsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+
+    def test_request_unmarshaller_is_reused(self) -> None:
+        self.assertIs(
+            validators.request_unmarshaller(self.spec),
+            validators.request_unmarshaller(self.spec),
+        )
+
+    def test_response_unmarshaller_is_reused(self) -> None:
+        self.assertIs(
+            validators.response_unmarshaller(self.spec),
+            validators.response_unmarshaller(self.spec),
+        )
+
+    def test_spec_unmarshallers_are_not_modified(self) -> None:
+        unmarshaller = validators.request_unmarshaller(self.spec)
+        self.assertIsNot(self.spec.request_unmarshaller, unmarshaller)
+        self.assertNotIsInstance(
+            getattr(self.spec.request_unmarshaller, "schema_validators_factory"),
+            validators.CachingSchemaValidatorsFactory,
+        )
+
+    def test_schema_validators_are_compiled_once(self) -> None:
+        unmarshaller = validators.request_unmarshaller(self.spec)
+        factory = unmarshaller.schema_validators_factory
+        schema = self.spec.spec / "components" / "schemas" / "resource"
+        self.assertIs(factory.create(schema), factory.create(schema))
+
+    def test_schema_unmarshallers_are_built_once(self) -> None:
+        unmarshaller = validators.request_unmarshaller(self.spec)
+        factory = unmarshaller.schema_unmarshallers_factory
+        schema = self.spec.spec / "components" / "schemas" / "resource"
+        self.assertIs(factory.create(schema), factory.create(schema))
+
+
+class CappedValidatorsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        self.schema = SchemaPath.from_dict(
+            {"type": "array", "items": {"type": "string"}}
+        )
+
+    def validate(self, max_errors: int, value: typing.Any) -> InvalidSchemaValue:
+        unmarshaller = validators.request_unmarshaller(self.spec, max_errors)
+        validator = unmarshaller.schema_validators_factory.create(self.schema)
+        self.assertIsInstance(validator, validators.CappedSchemaValidator)
+        with self.assertRaises(InvalidSchemaValue) as context:
+            validator.validate(value)
+        return context.exception
+
+    def test_unmarshallers_are_reused_per_cap(self) -> None:
+        self.assertIs(
+            validators.request_unmarshaller(self.spec, 1),
+            validators.request_unmarshaller(self.spec, 1),
+        )
+        self.assertIsNot(
+            validators.request_unmarshaller(self.spec, 1),
+            validators.request_unmarshaller(self.spec),
+        )
+        self.assertIs(
+            validators.response_unmarshaller(self.spec, 1),
+            validators.response_unmarshaller(self.spec, 1),
+        )
+
+    def test_validation_stops_at_cap(self) -> None:
+        errors = self.validate(2, list(range(10))).schema_errors
+        assert isinstance(errors, validators.SchemaErrors)
+        self.assertEqual(2, len(errors.found))
+        self.assertIn("SchemaErrors([", repr(errors))
+
+    def test_remaining_errors_are_found_lazily(self) -> None:
+        errors = self.validate(1, list(range(10))).schema_errors
+        iterator = iter(errors)
+        next(iterator)
+        next(iterator)
+        assert isinstance(errors, validators.SchemaErrors)
+        self.assertEqual(2, len(errors.found))
+        self.assertEqual(10, len(list(errors)))
+        self.assertEqual(10, len(list(errors)))
+
+    def test_valid_values(self) -> None:
+        unmarshaller = validators.request_unmarshaller(self.spec, 1)
+        validator = unmarshaller.schema_validators_factory.create(self.schema)
+        validator.validate(["a", "b"])
+
+    def test_evolved_validators_are_capped(self) -> None:
+        validator = validators.CappedSchemaValidator(
+            self.schema,
+            validators.request_unmarshaller(self.spec)
+            .schema_validators_factory.create(self.schema)
+            .validator,
+            max_errors=3,
+        )
+        evolved = validator.evolve(self.schema / "items")
+        self.assertIsInstance(evolved, validators.CappedSchemaValidator)
+        self.assertEqual(3, evolved.max_errors)
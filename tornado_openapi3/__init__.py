@@ -1,11 +1,96 @@
-# from tornado_openapi3.handler import OpenAPIRequestHandler
-# from tornado_openapi3.requests import RequestValidator, TornadoRequestFactory
-# from tornado_openapi3.responses import ResponseValidator, TornadoResponseFactory
-
-# __all__ = [
-#     "OpenAPIRequestHandler",
-#     "RequestValidator",
-#     "ResponseValidator",
-#     "TornadoRequestFactory",
-#     "TornadoResponseFactory",
-# ]
+"""Tornado OpenAPI 3 request and response validation.
+
+The most commonly used classes may be imported from the package itself. They are
+loaded from their modules on first use, so importing the package does not import
+Tornado's web framework or openapi-core.
+
+"""
+
+import importlib
+import typing
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from tornado_openapi3.admission import AdmissionController
+    from tornado_openapi3.cache import ValidationCache
+    from tornado_openapi3.client import OpenAPIClient
+    from tornado_openapi3.documents import SpecDocument, SpecDocumentHandler
+    from tornado_openapi3.formats import BatchFormatter
+    from tornado_openapi3.handler import OpenAPIRequestHandler
+    from tornado_openapi3.headers import TornadoHeaders
+    from tornado_openapi3.limits import LimitExceeded, ValidationLimits
+    from tornado_openapi3.metrics import MetricsHandler, MetricsStore
+    from tornado_openapi3.multipart import StreamingMultipartHandler
+    from tornado_openapi3.operations import OperationPolicy
+    from tornado_openapi3.profiling import ValidationProfiler
+    from tornado_openapi3.registry import SpecRegistry
+    from tornado_openapi3.requests import TornadoOpenAPIRequest
+    from tornado_openapi3.responses import TornadoOpenAPIResponse
+    from tornado_openapi3.testing import AsyncOpenAPITestCase
+    from tornado_openapi3.types import AsyncFormatter, Deserializer, Formatter
+
+_exports = {
+    "AdmissionController": "tornado_openapi3.admission",
+    "AsyncFormatter": "tornado_openapi3.types",
+    "AsyncOpenAPITestCase": "tornado_openapi3.testing",
+    "BatchFormatter": "tornado_openapi3.formats",
+    "Deserializer": "tornado_openapi3.types",
+    "Formatter": "tornado_openapi3.types",
+    "LimitExceeded": "tornado_openapi3.limits",
+    "MetricsHandler": "tornado_openapi3.metrics",
+    "MetricsStore": "tornado_openapi3.metrics",
+    "OpenAPIClient": "tornado_openapi3.client",
+    "OpenAPIRequestHandler": "tornado_openapi3.handler",
+    "OperationPolicy": "tornado_openapi3.operations",
+    "SpecDocument": "tornado_openapi3.documents",
+    "SpecDocumentHandler": "tornado_openapi3.documents",
+    "SpecRegistry": "tornado_openapi3.registry",
+    "StreamingMultipartHandler": "tornado_openapi3.multipart",
+    "TornadoHeaders": "tornado_openapi3.headers",
+    "TornadoOpenAPIRequest": "tornado_openapi3.requests",
+    "TornadoOpenAPIResponse": "tornado_openapi3.responses",
+    "ValidationCache": "tornado_openapi3.cache",
+    "ValidationLimits": "tornado_openapi3.limits",
+    "ValidationProfiler": "tornado_openapi3.profiling",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        ) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    return sorted(set(globals()) | set(_exports))
+
+
+__all__ = [
+    "AdmissionController",
+    "AsyncFormatter",
+    "AsyncOpenAPITestCase",
+    "BatchFormatter",
+    "Deserializer",
+    "Formatter",
+    "LimitExceeded",
+    "MetricsHandler",
+    "MetricsStore",
+    "OpenAPIClient",
+    "OpenAPIRequestHandler",
+    "OperationPolicy",
+    "SpecDocument",
+    "SpecDocumentHandler",
+    "SpecRegistry",
+    "StreamingMultipartHandler",
+    "TornadoHeaders",
+    "TornadoOpenAPIRequest",
+    "TornadoOpenAPIResponse",
+    "ValidationCache",
+    "ValidationLimits",
+    "ValidationProfiler",
+]
@@ -0,0 +1,103 @@
+import threading
+import typing
+
+from openapi_core.exceptions import OpenAPIError
+
+from tornado_openapi3.operations import OperationPolicy
+
+#: The fraction of an :class:`AdmissionController`'s limits available to
+#: requests of each priority. Requests to ``critical`` operations are always
+#: admitted.
+DEFAULT_SHARES: typing.Mapping[str, float] = {"low": 0.5, "normal": 0.8, "high": 1.0}
+
+
+class Overloaded(OpenAPIError):
+    """A request was turned away by an :class:`AdmissionController`."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return "Server overloaded: {}".format(self.reason)
+
+
+class AdmissionController:
+    """Sheds load before requests are validated once a server is overloaded.
+
+    Under a load spike, every request is validated before it is handled,
+    competing for the same CPU and pushing up latency for all of them. An
+    admission controller tracks the requests in flight (from the start of their
+    validation until they are finished, or their client disconnects) and how
+    long each request waited between being received and being validated, which
+    grows as the IOLoop falls behind. Requests are received once their body has
+    been, or their headers if their body is streamed, so slow uploads do not
+    count as waiting. Requests arriving while there are ``max_in_flight``
+    requests in flight, or that have waited more than ``max_queue_time``
+    seconds, are rejected before they are validated, and
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler` answers them with
+    ``503 Service Unavailable`` and a ``Retry-After`` header of
+    ``retry_after`` seconds.
+
+    Requests are admitted up to a share of each limit depending on their
+    operation's ``x-priority`` (see
+    :class:`~tornado_openapi3.operations.OperationPolicy`), so that lower
+    priority requests are turned away first. Shares default to
+    :data:`DEFAULT_SHARES`, and requests to ``critical`` operations are always
+    admitted.
+
+    To use an admission controller, pass it to your application as the
+    ``openapi_admission_controller`` setting.
+
+    """
+
+    def __init__(
+        self,
+        max_in_flight: typing.Optional[int] = None,
+        max_queue_time: typing.Optional[float] = None,
+        retry_after: int = 1,
+        shares: typing.Mapping[str, float] = DEFAULT_SHARES,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue_time = max_queue_time
+        self.retry_after = retry_after
+        self.shares = shares
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def admit(
+        self, policy: OperationPolicy, queue_time: float
+    ) -> typing.Optional[Overloaded]:
+        """Admits a request, or returns the reason it was turned away.
+
+        Each admitted request must be released with :meth:`release` once it is
+        finished.
+
+        """
+        share = self.shares.get(policy.priority)
+        with self._lock:
+            reason = None if share is None else self._overloaded(share, queue_time)
+            if reason is not None:
+                self.rejected += 1
+                return Overloaded(reason, self.retry_after)
+            self.in_flight += 1
+            return None
+
+    def _overloaded(self, share: float, queue_time: float) -> typing.Optional[str]:
+        if self.max_queue_time is not None and queue_time > self.max_queue_time * share:
+            return "queued for {:.3f}s".format(queue_time)
+        if (
+            self.max_in_flight is not None
+            and self.in_flight >= self.max_in_flight * share
+        ):
+            return "{} requests in flight".format(self.in_flight)
+        return None
+
+    def release(self) -> None:
+        """Records that an admitted request is finished."""
+        with self._lock:
+            self.in_flight -= 1
+
+
+__all__ = ["AdmissionController", "DEFAULT_SHARES", "Overloaded"]
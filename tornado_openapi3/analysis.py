@@ -0,0 +1,595 @@
+import argparse
+import base64
+import dataclasses
+import json
+import pathlib
+import re
+import sys
+import time
+import typing
+import urllib.parse
+
+import openapi_core
+import tornado.httpclient
+import tornado.httputil
+import yaml  # type: ignore[import-untyped]
+
+from tornado_openapi3 import patterns, validators
+from tornado_openapi3.operations import unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+_FORMAT_EXAMPLES = {
+    "date": "2020-01-01",
+    "date-time": "2020-01-01T00:00:00Z",
+    "time": "00:00:00Z",
+    "email": "user@example.com",
+    "uuid": "00000000-0000-0000-0000-000000000000",
+    "uri": "https://example.com/",
+    "hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "byte": "eA==",
+}
+
+#: How deeply synthetic values are generated for nested and recursive schemas.
+_MAX_EXAMPLE_DEPTH = 8
+
+
+@dataclasses.dataclass(frozen=True)
+class Thresholds:
+    """The sizes above which spec constructs are reported by :func:`analyze`."""
+
+    #: The most ``oneOf`` or ``anyOf`` alternatives allowed without a
+    #: ``discriminator``.
+    max_alternatives: int = 5
+
+    #: The longest chain of nested ``$ref`` references an operation may use.
+    max_ref_depth: int = 8
+
+    #: The most values allowed in an ``enum``.
+    max_enum: int = 100
+
+
+class Finding(typing.NamedTuple):
+    """A spec construct that makes validation expensive."""
+
+    #: A JSON pointer to the construct within the specification.
+    location: str
+
+    #: The kind of construct: ``alternatives``, ``ref-depth``, ``pattern``,
+    #: ``unanchored-pattern``, ``enum``, ``path-collision``, ``path-wildcard`` or
+    #: ``unresolved-ref``.
+    kind: str
+
+    #: Why the construct is considered expensive.
+    message: str
+
+
+class OperationCost(typing.NamedTuple):
+    """The cost of validating a synthetic request to an operation."""
+
+    #: The ``operationId`` of the operation, or its method and path template.
+    operation_id: str
+
+    #: The mean time, in seconds, taken to validate the request.
+    seconds: float
+
+    #: The number of errors found validating the request. Synthetic requests are
+    #: built from the operation's schemas, but may not satisfy all of them.
+    errors: int
+
+
+@dataclasses.dataclass
+class Report:
+    """The results of analyzing a specification."""
+
+    #: The time, in seconds, taken to compile the specification and prepare its
+    #: request unmarshaller.
+    compile_seconds: float
+
+    findings: typing.List[Finding]
+
+    #: The cost of validating each operation, most expensive first.
+    costs: typing.List[OperationCost]
+
+    def to_dict(self) -> dict:
+        return {
+            "compile_seconds": self.compile_seconds,
+            "findings": [finding._asdict() for finding in self.findings],
+            "costs": [cost._asdict() for cost in self.costs],
+        }
+
+    def format(self, top: typing.Optional[int] = None) -> str:
+        """Formats the report as text, listing at most ``top`` operations."""
+        lines = ["Compiled in {:.1f} ms".format(self.compile_seconds * 1e3), ""]
+        lines.append("{} findings".format(len(self.findings)))
+        for finding in self.findings:
+            lines.append("  {} [{}]".format(finding.location, finding.kind))
+            lines.append("    {}".format(finding.message))
+        lines.append("")
+        lines.append("Operations by validation cost")
+        for cost in self.costs[:top]:
+            lines.append(
+                "  {:>10.1f} us  {}{}".format(
+                    cost.seconds * 1e6,
+                    cost.operation_id,
+                    "  ({} errors)".format(cost.errors) if cost.errors else "",
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+
+def analyze(
+    spec_dict: dict,
+    config: typing.Optional[openapi_core.Config] = None,
+    thresholds: Thresholds = Thresholds(),
+    iterations: int = 100,
+    base_uri: str = "",
+) -> Report:
+    """Reports the constructs in a specification that make validation expensive.
+
+    The specification is compiled as
+    :attr:`~tornado_openapi3.handler.OpenAPIRequestHandler.spec` compiles it,
+    and the time taken is reported. It is then searched for:
+
+    * ``oneOf`` and ``anyOf`` schemas with many alternatives and no
+      ``discriminator``, every one of which may be tried against a value,
+    * operations whose schemas follow long chains of nested ``$ref`` references,
+    * ``pattern`` s that may backtrack catastrophically (see
+      :func:`~tornado_openapi3.patterns.risk`), or are not anchored with ``^``
+      and so are searched for at every position of a value,
+    * large ``enum`` s, whose values are compared one at a time,
+    * path templates that match the same requests as another (with the same
+      HTTP method), and templates made up entirely of parameters, which match
+      every path of their length.
+
+    References to other documents, which are resolved against ``base_uri``, are
+    not searched but reported as ``unresolved-ref`` findings.
+
+    Finally, a synthetic request is built from the schemas of each operation and
+    validated ``iterations`` times, and the operations are ranked by the mean
+    time taken.
+
+    """
+    started = time.perf_counter()
+    spec = openapi_core.OpenAPI.from_dict(spec_dict, config=config, base_uri=base_uri)
+    patterns.precompile(spec)
+    validators.request_unmarshaller(spec)
+    compile_seconds = time.perf_counter() - started
+
+    with spec.spec.open() as contents:
+        findings = list(_find_alternatives(contents, "#", thresholds))
+        findings.extend(_find_ref_depths(contents, thresholds))
+        for location, pattern in patterns.find_patterns(spec):
+            reason = patterns.risk(pattern)
+            if reason:
+                findings.append(Finding(location, "pattern", reason))
+            elif not pattern.startswith("^"):
+                findings.append(
+                    Finding(
+                        location,
+                        "unanchored-pattern",
+                        "searched for at every position of a value",
+                    )
+                )
+        findings.extend(_find_enums(contents, "#", thresholds))
+        findings.extend(_find_path_problems(contents))
+        findings.extend(_find_external_refs(contents, "#"))
+        costs = sorted(
+            (
+                _operation_cost(spec, contents, path, method, iterations)
+                for path, method in _operations(contents)
+            ),
+            key=lambda cost: cost.seconds,
+            reverse=True,
+        )
+    return Report(compile_seconds, findings, costs)
+
+
+def _escape(key: typing.Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _children(value: typing.Any, location: str) -> typing.Iterator[tuple]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key, item, "{}/{}".format(location, _escape(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield index, item, "{}/{}".format(location, index)
+
+
+def _find_alternatives(
+    value: typing.Any, location: str, thresholds: Thresholds
+) -> typing.Iterator[Finding]:
+    if isinstance(value, dict) and "discriminator" not in value:
+        for keyword in ("oneOf", "anyOf"):
+            alternatives = value.get(keyword)
+            if (
+                isinstance(alternatives, list)
+                and len(alternatives) > thresholds.max_alternatives
+            ):
+                yield Finding(
+                    "{}/{}".format(location, keyword),
+                    "alternatives",
+                    "{} alternatives without a discriminator may each be tried "
+                    "against a value".format(len(alternatives)),
+                )
+    for _, item, child in _children(value, location):
+        yield from _find_alternatives(item, child, thresholds)
+
+
+def _find_enums(
+    value: typing.Any, location: str, thresholds: Thresholds
+) -> typing.Iterator[Finding]:
+    for key, item, child in _children(value, location):
+        if key == "enum" and isinstance(item, list):
+            if len(item) > thresholds.max_enum:
+                yield Finding(
+                    child,
+                    "enum",
+                    "{} values are compared with a value one at a time".format(
+                        len(item)
+                    ),
+                )
+        else:
+            yield from _find_enums(item, child, thresholds)
+
+
+def _resolve(contents: typing.Any, ref: str) -> typing.Any:
+    """Returns the target of a reference, or ``None`` if it is in another document.
+
+    Local references are checked when the specification is compiled.
+
+    """
+    if not ref.startswith("#"):
+        return None
+    value = contents
+    for part in ref[1:].split("/")[1:]:
+        part = urllib.parse.unquote(part).replace("~1", "/").replace("~0", "~")
+        value = value[int(part)] if isinstance(value, list) else value[part]
+    return value
+
+
+def _refs(value: typing.Any) -> typing.Iterator[str]:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str):
+            yield ref
+            return
+        for item in value.values():
+            yield from _refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _refs(item)
+
+
+def _ref_depth(
+    contents: typing.Any,
+    value: typing.Any,
+    depths: typing.Dict[str, int],
+    resolving: typing.Set[str],
+) -> int:
+    depth = 0
+    for ref in _refs(value):
+        if ref not in depths:
+            if ref in resolving:
+                # Recursive schemas are resolved lazily, as values are validated.
+                continue
+            resolving.add(ref)
+            target = _resolve(contents, ref)
+            # References to other documents are not followed.
+            depths[ref] = 1 + (
+                0 if target is None else _ref_depth(contents, target, depths, resolving)
+            )
+            resolving.discard(ref)
+        depth = max(depth, depths[ref])
+    return depth
+
+
+def _find_external_refs(value: typing.Any, location: str) -> typing.Iterator[Finding]:
+    for key, item, child in _children(value, location):
+        if key == "$ref" and isinstance(item, str) and not item.startswith("#"):
+            yield Finding(
+                child,
+                "unresolved-ref",
+                "refers to another document, which is not analyzed",
+            )
+        else:
+            yield from _find_external_refs(item, child)
+
+
+def _find_ref_depths(
+    contents: typing.Any, thresholds: Thresholds
+) -> typing.Iterator[Finding]:
+    depths: typing.Dict[str, int] = {}
+    for path, method in _operations(contents):
+        operation = contents["paths"][path][method]
+        depth = _ref_depth(contents, operation, depths, set())
+        if depth > thresholds.max_ref_depth:
+            yield Finding(
+                "#/paths/{}/{}".format(_escape(path), method),
+                "ref-depth",
+                "validation follows a chain of {} nested references".format(depth),
+            )
+
+
+def _operations(contents: typing.Any) -> typing.Iterator[typing.Tuple[str, str]]:
+    for path, item in (contents.get("paths") or {}).items():
+        for method in _METHODS:
+            if isinstance(item.get(method), dict):
+                yield path, method
+
+
+_TEMPLATE_SEGMENT = re.compile(r"\{[^}]*\}")
+
+
+def _find_path_problems(contents: typing.Any) -> typing.Iterator[Finding]:
+    templates = [
+        (
+            path,
+            path.strip("/").split("/"),
+            [method for method in _METHODS if isinstance(item.get(method), dict)],
+        )
+        for path, item in (contents.get("paths") or {}).items()
+    ]
+    for index, (path, segments, methods) in enumerate(templates):
+        location = "#/paths/{}".format(_escape(path))
+        if segments != [""] and all(
+            _TEMPLATE_SEGMENT.fullmatch(segment) for segment in segments
+        ):
+            yield Finding(
+                location,
+                "path-wildcard",
+                "matches every path with {} segments".format(len(segments)),
+            )
+        for other, other_segments, other_methods in templates[:index]:
+            # Templates only shadow each other for the methods they share.
+            shared = [method for method in methods if method in other_methods]
+            if (
+                shared
+                and len(segments) == len(other_segments)
+                and all(
+                    a == b or "{" in a or "{" in b
+                    for a, b in zip(segments, other_segments)
+                )
+            ):
+                yield Finding(
+                    location,
+                    "path-collision",
+                    "matches the same {} requests as {}".format(
+                        ", ".join(method.upper() for method in shared), other
+                    ),
+                )
+
+
+def _example(contents: typing.Any, schema: typing.Any, depth: int = 0) -> typing.Any:
+    """Builds a value intended to satisfy a schema."""
+    if not isinstance(schema, dict) or depth > _MAX_EXAMPLE_DEPTH:
+        return None
+    if "$ref" in schema:
+        return _example(contents, _resolve(contents, schema["$ref"]), depth + 1)
+    for keyword in ("example", "default"):
+        if keyword in schema:
+            return schema[keyword]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for keyword in ("oneOf", "anyOf"):
+        if schema.get(keyword):
+            return _example(contents, schema[keyword][0], depth + 1)
+    if schema.get("allOf"):
+        value: typing.Any = None
+        for part in schema["allOf"]:
+            example = _example(contents, part, depth + 1)
+            if isinstance(value, dict) and isinstance(example, dict):
+                value = {**value, **example}
+            elif example is not None:
+                value = example
+        return value
+    schema_type = schema.get("type")
+    if schema_type == "object" or "properties" in schema:
+        properties = {
+            name: _example(contents, property, depth + 1)
+            for name, property in (schema.get("properties") or {}).items()
+        }
+        return {name: value for name, value in properties.items() if value is not None}
+    if schema_type == "array":
+        item = _example(contents, schema.get("items"), depth + 1)
+        return [] if item is None else [item] * max(1, schema.get("minItems", 1))
+    if schema_type == "integer":
+        return int(schema.get("minimum", 0))
+    if schema_type == "number":
+        return schema.get("minimum", 0)
+    if schema_type == "boolean":
+        return True
+    if schema_type == "string":
+        return _FORMAT_EXAMPLES.get(
+            schema.get("format", ""), "a" * max(1, schema.get("minLength", 1))
+        )
+    return None
+
+
+def _parameter_value(value: typing.Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ",".join(_parameter_value(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return "" if value is None else str(value)
+
+
+def _server_url(*items: typing.Any) -> str:
+    server: dict = next(
+        (item["servers"][0] for item in items if item.get("servers")), {"url": "/"}
+    )
+    url = server.get("url", "/")
+    for name, variable in (server.get("variables") or {}).items():
+        url = url.replace("{" + name + "}", str(variable.get("default", "")))
+    return urllib.parse.urljoin("http://localhost/", url).rstrip("/")
+
+
+def _synthetic_request(
+    contents: typing.Any, path: str, method: str
+) -> tornado.httpclient.HTTPRequest:
+    path_item = contents["paths"][path]
+    operation = path_item[method]
+    parameters = {}
+    for parameter in (path_item.get("parameters") or []) + (
+        operation.get("parameters") or []
+    ):
+        if "$ref" in parameter:
+            parameter = _resolve(contents, parameter["$ref"]) or {}
+        parameters[parameter.get("name"), parameter.get("in")] = parameter
+
+    url = path
+    query: typing.List[typing.Tuple[str, str]] = []
+    headers = tornado.httputil.HTTPHeaders()
+    cookies = []
+    for (name, location), parameter in parameters.items():
+        schema = parameter.get("schema")
+        if schema is None:
+            media_types = parameter.get("content") or {"": {}}
+            schema = next(iter(media_types.values())).get("schema")
+        value = _example(contents, schema)
+        if location == "path":
+            url = url.replace(
+                "{" + name + "}", urllib.parse.quote(_parameter_value(value), safe="")
+            )
+        elif location == "query":
+            if isinstance(value, list) and parameter.get("explode", True):
+                query.extend((name, _parameter_value(item)) for item in value)
+            else:
+                query.append((name, _parameter_value(value)))
+        elif location == "header":
+            headers.add(name, _parameter_value(value))
+        elif location == "cookie":
+            cookies.append("{}={}".format(name, _parameter_value(value)))
+
+    requirements = operation.get("security", contents.get("security")) or [{}]
+    schemes = (contents.get("components") or {}).get("securitySchemes") or {}
+    for name in requirements[0]:
+        scheme = schemes.get(name) or {}
+        if scheme.get("type") == "apiKey":
+            location = scheme.get("in")
+            if location == "query":
+                query.append((scheme.get("name", ""), "key"))
+            elif location == "cookie":
+                cookies.append("{}=key".format(scheme.get("name", "")))
+            else:
+                headers.add(scheme.get("name", ""), "key")
+        elif scheme.get("scheme", "").lower() == "basic":
+            headers.add("Authorization", "Basic " + base64.b64encode(b"a:a").decode())
+        else:
+            headers.add("Authorization", "Bearer token")
+    if cookies:
+        headers.add("Cookie", "; ".join(cookies))
+
+    body = None
+    request_body = operation.get("requestBody")
+    if request_body and "$ref" in request_body:
+        request_body = _resolve(contents, request_body["$ref"])
+    if request_body and request_body.get("content"):
+        content_type, media_type = next(iter(request_body["content"].items()))
+        value = _example(contents, (media_type or {}).get("schema"))
+        if content_type == "application/x-www-form-urlencoded":
+            body = urllib.parse.urlencode(
+                {key: _parameter_value(item) for key, item in (value or {}).items()}
+            ).encode()
+        elif isinstance(value, str):
+            body = value.encode()
+        else:
+            body = json.dumps(value).encode()
+        headers.add("Content-Type", content_type.replace("*", "x"))
+
+    if query:
+        url += "?" + urllib.parse.urlencode(query)
+    return tornado.httpclient.HTTPRequest(
+        _server_url(operation, path_item, contents) + url,
+        method=method.upper(),
+        headers=headers,
+        body=body,
+        allow_nonstandard_methods=True,
+    )
+
+
+def _operation_cost(
+    spec: openapi_core.OpenAPI,
+    contents: typing.Any,
+    path: str,
+    method: str,
+    iterations: int,
+) -> OperationCost:
+    request = _synthetic_request(contents, path, method)
+    result, policy = unmarshal_request(spec, TornadoOpenAPIRequest(request))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        unmarshal_request(spec, TornadoOpenAPIRequest(request))
+    seconds = (time.perf_counter() - started) / iterations
+    return OperationCost(
+        policy.operation_id or "{} {}".format(method.upper(), path),
+        seconds,
+        len(list(result.errors)),
+    )
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Analyzes a JSON or YAML specification from the command line.
+
+    .. code-block:: console
+
+        $ python -m tornado_openapi3.analysis openapi.yaml --top 10
+
+    Exits with a status of 1 if ``--strict`` is given and anything was found.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="tornado-openapi3-analyze",
+        description="Report constructs that make validating requests expensive.",
+    )
+    parser.add_argument("spec", help="an OpenAPI 3 specification (JSON or YAML)")
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=100,
+        help="validations timed per operation (default: %(default)s)",
+    )
+    parser.add_argument("--top", type=int, help="list only the costliest operations")
+    parser.add_argument(
+        "--max-alternatives", type=int, default=Thresholds.max_alternatives
+    )
+    parser.add_argument("--max-ref-depth", type=int, default=Thresholds.max_ref_depth)
+    parser.add_argument("--max-enum", type=int, default=Thresholds.max_enum)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit with an error if anything is found"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec_dict = yaml.safe_load(f)
+    report = analyze(
+        spec_dict,
+        thresholds=Thresholds(
+            max_alternatives=args.max_alternatives,
+            max_ref_depth=args.max_ref_depth,
+            max_enum=args.max_enum,
+        ),
+        iterations=args.iterations,
+        base_uri=pathlib.Path(args.spec).absolute().as_uri(),
+    )
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(report.format(args.top))
+    return 1 if args.strict and report.findings else 0
+
+
+__all__ = ["Finding", "OperationCost", "Report", "Thresholds", "analyze", "main"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
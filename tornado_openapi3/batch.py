@@ -0,0 +1,432 @@
+import base64
+import collections
+import concurrent.futures
+import dataclasses
+import io
+import typing
+
+import openapi_core
+from openapi_core.datatypes import RequestParameters
+from openapi_core.templating.paths.datatypes import PathOperationServer
+from openapi_core.templating.paths.exceptions import PathError
+from openapi_core.unmarshalling.request.datatypes import RequestUnmarshalResult
+from openapi_core.unmarshalling.request.unmarshallers import (
+    APICallRequestUnmarshaller,
+)
+from openapi_core.unmarshalling.response.unmarshallers import (
+    APICallResponseUnmarshaller,
+)
+from tornado.httpclient import HTTPRequest, HTTPResponse
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.responses import TornadoOpenAPIResponse
+from tornado_openapi3.util import LRUCache
+from tornado_openapi3 import validators
+
+#: A zero-argument callable returning a compiled OpenAPI specification.
+SpecFactory = typing.Callable[[], openapi_core.OpenAPI]
+
+#: Operations are grouped by their path template and HTTP method.
+OperationKey = typing.Tuple[str, str]
+
+#: Responses are grouped by their operation's path template, HTTP method and
+#: response status code.
+ResponseKey = typing.Tuple[str, str, int]
+
+#: A request paired with the response it received.
+RequestResponsePair = typing.Tuple[
+    typing.Union[HTTPRequest, HTTPServerRequest], HTTPResponse
+]
+
+_compiled_specs: LRUCache[SpecFactory, openapi_core.OpenAPI] = LRUCache(maxsize=32)
+
+
+@dataclasses.dataclass
+class RequestSnapshot:
+    """A picklable copy of an OpenAPI request.
+
+    Tornado request objects may hold references to live connections, so
+    requests are copied into snapshots before being sent to an executor.
+
+    """
+
+    host_url: str
+    path: str
+    method: str
+    body: typing.Optional[bytes]
+    content_type: str
+    parameters: RequestParameters
+
+    @classmethod
+    def from_request(cls, request: TornadoOpenAPIRequest) -> "RequestSnapshot":
+        return cls(
+            host_url=request.host_url,
+            path=request.path,
+            method=request.method,
+            body=request.body,
+            content_type=request.content_type,
+            parameters=request.parameters,
+        )
+
+
+def compiled_spec(
+    spec: typing.Union[openapi_core.OpenAPI, SpecFactory],
+) -> openapi_core.OpenAPI:
+    """Returns a compiled spec, calling and caching a spec factory if needed.
+
+    The specifications of the 32 most recently used spec factories are kept,
+    so worker processes compile their specification on first use and reuse it
+    afterwards.
+
+    """
+    if isinstance(spec, openapi_core.OpenAPI):
+        return spec
+    compiled = _compiled_specs.get(spec)
+    if compiled is None:
+        compiled = spec()
+        _compiled_specs.set(spec, compiled)
+    return compiled
+
+
+def _find_path(
+    unmarshaller: typing.Union[APICallRequestUnmarshaller, APICallResponseUnmarshaller],
+    request: typing.Any,
+) -> typing.Union[PathOperationServer, PathError]:
+    try:
+        return unmarshaller._find_path(request)
+    except PathError as e:
+        return e
+
+
+def unmarshal_group(
+    spec: typing.Union[openapi_core.OpenAPI, SpecFactory],
+    operation: OperationKey,
+    requests: typing.Sequence[typing.Tuple[int, typing.Any]],
+) -> typing.List[typing.Tuple[int, RequestUnmarshalResult]]:
+    """Unmarshals a group of indexed requests sharing a single operation.
+
+    ``operation`` is the path template and HTTP method the requests were
+    resolved to, and the path parameters of each request must already be set,
+    so that requests are not matched against the specification's paths again.
+    This is the unit of work sent to executors by :func:`unmarshal_requests`.
+
+    """
+    compiled = compiled_spec(spec)
+    unmarshaller = validators.request_unmarshaller(compiled)
+    template, method = operation
+    path = compiled.spec / "paths" / template
+    return [
+        (index, unmarshaller._unmarshal(request, path / method, path))
+        for index, request in requests
+    ]
+
+
+def _chunks(
+    items: typing.Sequence[typing.Tuple[int, typing.Any]], size: int
+) -> typing.Iterator[typing.Sequence[typing.Tuple[int, typing.Any]]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def unmarshal_requests(
+    spec: typing.Union[openapi_core.OpenAPI, SpecFactory],
+    requests: typing.Iterable[typing.Union[HTTPRequest, HTTPServerRequest]],
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    chunksize: int = 100,
+) -> typing.List[RequestUnmarshalResult]:
+    """Validates and unmarshals many Tornado requests at once.
+
+    Requests are grouped by the operation they resolve to, and each group is
+    validated using schema validators compiled once per operation rather than
+    once per request. Results are returned in the same order as the requests
+    were given. Requests that do not match any operation in the specification
+    are returned with a ``PathNotFound`` or ``OperationNotFound`` error, just as
+    :meth:`openapi_core.OpenAPI.unmarshal_request` would.
+
+    If an executor is provided, each operation's requests are split into
+    chunks of at most ``chunksize`` requests and validated in parallel. When
+    using a :class:`concurrent.futures.ProcessPoolExecutor`, ``spec`` must be a
+    picklable factory function (such as a module-level function) returning
+    the compiled spec, which each worker process will call once. Exceptions
+    in the results returned from worker processes do not retain their
+    ``__cause__``.
+
+    """
+    openapi_requests = [TornadoOpenAPIRequest(request) for request in requests]
+    results: typing.List[typing.Optional[RequestUnmarshalResult]] = [None] * len(
+        openapi_requests
+    )
+    unmarshaller = validators.request_unmarshaller(compiled_spec(spec))
+    groups: typing.DefaultDict[
+        OperationKey, typing.List[typing.Tuple[int, typing.Any]]
+    ] = collections.defaultdict(list)
+    for index, request in enumerate(openapi_requests):
+        found = _find_path(unmarshaller, request)
+        if isinstance(found, PathError):
+            results[index] = RequestUnmarshalResult(errors=[found])
+            continue
+        request.parameters.path = request.parameters.path or found.path_result.variables
+        groups[(found.path_result.pattern, request.method)].append((index, request))
+
+    if executor is None:
+        for key, group in groups.items():
+            for index, result in unmarshal_group(spec, key, group):
+                results[index] = result
+    else:
+        futures = [
+            executor.submit(
+                unmarshal_group,
+                spec,
+                key,
+                [
+                    (index, RequestSnapshot.from_request(request))
+                    for index, request in chunk
+                ],
+            )
+            for key, group in groups.items()
+            for chunk in _chunks(group, chunksize)
+        ]
+        for future in futures:
+            for index, result in future.result():
+                results[index] = result
+
+    return typing.cast(typing.List[RequestUnmarshalResult], results)
+
+
+@dataclasses.dataclass
+class OperationSummary:
+    """Validation outcomes for responses sharing an operation and status code."""
+
+    #: The maximum number of error messages kept as samples.
+    max_samples: typing.ClassVar[int] = 5
+
+    validated: int = 0
+    failed: int = 0
+    #: Counts of each type of error encountered, by exception class name.
+    errors: typing.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    #: A few error messages, to help with diagnosing failures.
+    samples: typing.List[str] = dataclasses.field(default_factory=list)
+
+    def add(self, errors: typing.Iterable[Exception]) -> None:
+        self.validated += 1
+        errors = list(errors)
+        if not errors:
+            return
+        self.failed += 1
+        for error in errors:
+            self.errors[type(error).__name__] += 1
+            if len(self.samples) < self.max_samples:
+                self.samples.append(str(error) or repr(error))
+
+    def merge(self, other: "OperationSummary") -> None:
+        self.validated += other.validated
+        self.failed += other.failed
+        self.errors.update(other.errors)
+        available = self.max_samples - len(self.samples)
+        self.samples.extend(other.samples[:available])
+
+
+@dataclasses.dataclass
+class ResponseReport:
+    """A summary of validating many responses against a specification."""
+
+    operations: typing.Dict[ResponseKey, OperationSummary] = dataclasses.field(
+        default_factory=dict
+    )
+    #: Requests that did not match any operation in the specification,
+    #: counted by HTTP method and path.
+    unmatched: typing.Counter[OperationKey] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+
+    @property
+    def validated(self) -> int:
+        return sum(summary.validated for summary in self.operations.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(summary.failed for summary in self.operations.values())
+
+    def summary(self, key: ResponseKey) -> OperationSummary:
+        try:
+            return self.operations[key]
+        except KeyError:
+            self.operations[key] = summary = OperationSummary()
+            return summary
+
+    def format(self) -> str:
+        """Formats the report as human-readable text, one operation per line."""
+        lines = [
+            "{} {} {}: {} of {} failed{}".format(
+                method.upper(),
+                path,
+                status_code,
+                summary.failed,
+                summary.validated,
+                (
+                    " ({})".format(
+                        ", ".join(
+                            "{}: {}".format(name, count)
+                            for name, count in summary.errors.most_common()
+                        )
+                    )
+                    if summary.errors
+                    else ""
+                ),
+            )
+            for (path, method, status_code), summary in sorted(self.operations.items())
+        ]
+        lines.extend(
+            "{} {}: {} unmatched".format(method.upper(), path, count)
+            for (path, method), count in sorted(self.unmatched.items())
+        )
+        return "\n".join(lines)
+
+
+def validate_response_group(
+    spec: typing.Union[openapi_core.OpenAPI, SpecFactory],
+    operation: OperationKey,
+    responses: typing.Sequence[TornadoOpenAPIResponse],
+) -> OperationSummary:
+    """Validates a group of responses sharing an operation and status code.
+
+    ``operation`` is the path template and HTTP method of the requests the
+    responses were made to, so that requests are not matched against the
+    specification's paths again. This is the unit of work sent to executors by
+    :func:`validate_responses`.
+
+    """
+    compiled = compiled_spec(spec)
+    unmarshaller = validators.response_unmarshaller(compiled)
+    template, method = operation
+    path = compiled.spec / "paths" / template
+    summary = OperationSummary()
+    for response in responses:
+        summary.add(unmarshaller._unmarshal(response, path / method).errors)
+    return summary
+
+
+def validate_responses(
+    spec: typing.Union[openapi_core.OpenAPI, SpecFactory],
+    pairs: typing.Iterable[RequestResponsePair],
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    chunksize: int = 100,
+    max_pending: int = 64,
+) -> ResponseReport:
+    """Validates many recorded responses and summarizes the failures.
+
+    Each response is validated against the operation matching the request it
+    was made with. Pairs are consumed lazily, so very large recordings can be
+    streamed through without being loaded into memory at once.
+
+    If an executor is provided, responses are grouped by operation and status
+    code into chunks of at most ``chunksize`` responses that are validated in
+    parallel, with no more than ``max_pending`` chunks waiting at a time. The
+    same restrictions on ``spec`` apply as for :func:`unmarshal_requests`.
+
+    """
+    report = ResponseReport()
+    unmarshaller = validators.response_unmarshaller(compiled_spec(spec))
+    groups: typing.DefaultDict[ResponseKey, typing.List[TornadoOpenAPIResponse]] = (
+        collections.defaultdict(list)
+    )
+    pending: typing.Deque[
+        typing.Tuple[ResponseKey, "concurrent.futures.Future[OperationSummary]"]
+    ] = collections.deque()
+
+    def submit(key: ResponseKey) -> None:
+        assert executor is not None
+        if len(pending) >= max_pending:
+            collect()
+        pending.append(
+            (
+                key,
+                executor.submit(
+                    validate_response_group, spec, key[:2], groups.pop(key)
+                ),
+            )
+        )
+
+    def collect() -> None:
+        key, future = pending.popleft()
+        report.summary(key).merge(future.result())
+
+    for request, response in pairs:
+        openapi_request = TornadoOpenAPIRequest(request)
+        found = _find_path(unmarshaller, openapi_request)
+        if isinstance(found, PathError):
+            report.unmatched[(openapi_request.path, openapi_request.method)] += 1
+            continue
+        key = (found.path_result.pattern, openapi_request.method, response.code)
+        openapi_response = TornadoOpenAPIResponse(response)
+        if executor is None:
+            result = unmarshaller._unmarshal(openapi_response, found.operation)
+            report.summary(key).add(result.errors)
+            continue
+        group = groups[key]
+        group.append(openapi_response)
+        if len(group) >= chunksize:
+            submit(key)
+
+    for key in list(groups):
+        submit(key)
+    while pending:
+        collect()
+    return report
+
+
+def har_pairs(
+    har: typing.Mapping[str, typing.Any],
+) -> typing.Iterator[RequestResponsePair]:
+    """Reads request and response pairs from a HAR document.
+
+    Accepts a parsed `HTTP Archive`_ document, as exported by browsers and
+    many proxies, and yields Tornado request and response objects suitable
+    for :func:`validate_responses`.
+
+    .. _HTTP Archive: http://www.softwareishard.com/blog/har-12-spec/
+
+    """
+    for entry in har["log"]["entries"]:
+        request = HTTPRequest(
+            entry["request"]["url"],
+            method=entry["request"]["method"],
+            headers=_har_headers(entry["request"].get("headers", [])),
+            body=entry["request"].get("postData", {}).get("text"),
+            allow_nonstandard_methods=True,
+        )
+        content = entry["response"].get("content", {})
+        body = content.get("text", "")
+        if content.get("encoding") == "base64":
+            body = base64.b64decode(body)
+        elif isinstance(body, str):
+            body = body.encode()
+        response = HTTPResponse(
+            request,
+            entry["response"]["status"],
+            headers=_har_headers(entry["response"].get("headers", [])),
+            buffer=io.BytesIO(body),
+        )
+        yield request, response
+
+
+def _har_headers(headers: typing.Iterable[typing.Mapping[str, str]]) -> HTTPHeaders:
+    result = HTTPHeaders()
+    for header in headers:
+        result.add(header["name"], header["value"])
+    return result
+
+
+__all__ = [
+    "OperationSummary",
+    "RequestSnapshot",
+    "ResponseReport",
+    "SpecFactory",
+    "compiled_spec",
+    "har_pairs",
+    "unmarshal_group",
+    "unmarshal_requests",
+    "validate_response_group",
+    "validate_responses",
+]
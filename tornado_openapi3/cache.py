@@ -0,0 +1,153 @@
+import copy
+import dataclasses
+import hashlib
+import threading
+import time
+import typing
+import weakref
+
+from jsonschema_path import SchemaPath
+import openapi_core
+from openapi_core.validation.request.exceptions import RequestBodyValidationError
+
+from tornado_openapi3 import formats
+from tornado_openapi3.limits import LimitExceeded, ValidationLimits
+from tornado_openapi3.requests import FormBody
+from tornado_openapi3.util import LRUCache
+
+#: Bodies are identified by their operation, content type, a digest of the body
+#: itself, and the ``max_errors`` and limits they were validated with.
+BodyKey = typing.Tuple[
+    SchemaPath, str, bytes, typing.Optional[int], typing.Optional[ValidationLimits]
+]
+
+
+@dataclasses.dataclass(frozen=True)
+class BodyOutcome:
+    """The cached outcome of validating and unmarshalling a request body."""
+
+    #: The unmarshalled body, or ``None`` if it was missing or invalid.
+    body: typing.Any
+
+    #: The validation error raised for the body, if any.
+    error: typing.Optional[RequestBodyValidationError]
+
+    #: The time after which the outcome may no longer be used, as returned by
+    #: :func:`time.monotonic`.
+    expires: float
+
+    #: The values collected by :class:`~tornado_openapi3.formats.BatchFormatter`
+    #: objects while the body was validated, which are checked again for each
+    #: request.
+    batched: typing.Tuple[typing.Tuple[formats.BatchFormatter, str], ...] = ()
+
+
+class ValidationCache:
+    """A bounded cache of request body validation outcomes.
+
+    Many requests carry bodies identical to earlier ones: retries, webhook
+    redeliveries, or clients repeatedly polling with the same search payload.
+    When a cache is given to
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler` (through its
+    ``openapi_validation_cache`` application setting), request bodies are
+    deserialized and validated once, and repeats reuse the stored outcome for
+    up to ``ttl`` seconds. Parameters and security requirements are still
+    validated on every request.
+
+    Outcomes are cached per compiled specification, so the cache is only
+    effective when the same spec object serves many requests, as it does when
+    using a :class:`~tornado_openapi3.registry.SpecRegistry` or a handler
+    whose :attr:`~tornado_openapi3.handler.OpenAPIRequestHandler.spec` is
+    compiled once.
+
+    At most ``maxsize`` outcomes are kept for each specification, discarding the
+    least recently used. Bodies larger than ``max_body_size`` bytes are never
+    cached.
+
+    Unmarshalled bodies are mutable, so each request receives its own deep copy
+    of a cached body and changes made by one handler are never seen by another.
+
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 60.0, max_body_size: int = 65536
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_body_size = max_body_size
+        self._caches: typing.MutableMapping[
+            openapi_core.OpenAPI, LRUCache[BodyKey, BodyOutcome]
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def cache(self, spec: openapi_core.OpenAPI) -> LRUCache[BodyKey, BodyOutcome]:
+        """Returns the outcomes cached for a specification."""
+        with self._lock:
+            try:
+                return self._caches[spec]
+            except KeyError:
+                cache: LRUCache[BodyKey, BodyOutcome] = LRUCache(self.maxsize)
+                self._caches[spec] = cache
+                return cache
+
+    def unmarshal_body(
+        self,
+        spec: openapi_core.OpenAPI,
+        operation: SchemaPath,
+        body: typing.Optional[bytes],
+        content_type: str,
+        unmarshal: typing.Callable[[], typing.Any],
+        max_errors: typing.Optional[int] = None,
+        limits: typing.Optional[ValidationLimits] = None,
+    ) -> typing.Any:
+        """Returns an unmarshalled body, calling ``unmarshal`` only on a miss.
+
+        Raises the same errors as ``unmarshal``. Empty bodies and bodies
+        larger than ``max_body_size`` are passed straight to ``unmarshal``.
+        Errors caused by :class:`~tornado_openapi3.limits.LimitExceeded` are
+        not cached, as limits such as ``max_seconds`` depend on the load of the
+        server rather than on the body. Outcomes are kept separately for each
+        ``max_errors`` and :class:`~tornado_openapi3.limits.ValidationLimits`
+        that ``unmarshal`` validates with, so that a body accepted without
+        limits is still checked against them.
+
+        Values collected by batch formatters while a body is validated are
+        stored with its outcome, and added to the current
+        :func:`~tornado_openapi3.formats.collect` batch each time the outcome is
+        used. Outside of one, such bodies are unmarshalled again, so that the
+        formatters reject values they cannot check.
+
+        """
+        if not body or len(body) > self.max_body_size:
+            return unmarshal()
+
+        cache = self.cache(spec)
+        raw = body.body if isinstance(body, FormBody) else body
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        key = (operation, content_type, digest, max_errors, limits)
+        now = time.monotonic()
+        outcome = cache.get(key)
+        if outcome is None or outcome.expires < now:
+            error: typing.Optional[RequestBodyValidationError] = None
+            with formats.collect() as batch:
+                try:
+                    value = unmarshal()
+                except RequestBodyValidationError as e:
+                    if isinstance(e.__cause__, LimitExceeded):
+                        raise
+                    value, error = None, e
+            outcome = BodyOutcome(value, error, now + self.ttl, batch.items())
+            cache.set(key, outcome)
+        if outcome.batched:
+            current = formats.current_batch()
+            if current is None:
+                return unmarshal()
+            current.extend(outcome.batched)
+        if outcome.error is not None:
+            # Drop the traceback from the previous raise so that it does not
+            # grow each time the shared error is raised again.
+            raise outcome.error.with_traceback(None)
+        return copy.deepcopy(outcome.body)
+
+
+__all__ = ["BodyKey", "BodyOutcome", "ValidationCache"]
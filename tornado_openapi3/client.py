@@ -0,0 +1,164 @@
+import logging
+import random
+import typing
+
+import openapi_core
+from openapi_core.unmarshalling.datatypes import BaseUnmarshalResult
+import tornado.httpclient
+import tornado.locks
+
+from tornado_openapi3 import patterns, validators
+from tornado_openapi3.operations import read_policies, unmarshal_request
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.responses import TornadoOpenAPIResponse
+from tornado_openapi3.util import LRUCache, digest
+
+logger = logging.getLogger(__name__)
+
+#: Specifications compiled by :func:`compile_spec`, keyed by a digest of their
+#: contents. Clients of the same service share a single compiled specification,
+#: along with the validators compiled for it.
+specs: LRUCache[bytes, openapi_core.OpenAPI] = LRUCache(maxsize=32)
+
+
+def compile_spec(spec_dict: dict) -> openapi_core.OpenAPI:
+    """Returns a compiled specification, compiling it only if it is not cached.
+
+    Its patterns are compiled along with it (see
+    :func:`~tornado_openapi3.patterns.precompile`).
+
+    :raises ValueError: If the policy extensions of an operation are invalid
+        (see :func:`~tornado_openapi3.operations.read_policies`).
+
+    """
+    key = digest(spec_dict)
+    spec = specs.get(key)
+    if spec is None:
+        spec = openapi_core.OpenAPI.from_dict(spec_dict)
+        read_policies(spec)
+        patterns.precompile(spec)
+        specs.set(key, spec)
+    return spec
+
+
+class OpenAPIClient:
+    """An HTTP client validating calls to another service against its spec.
+
+    Wraps a dedicated :class:`tornado.httpclient.AsyncHTTPClient` with a pool of
+    ``max_clients`` connections. Requests are validated before they are sent,
+    and responses are validated as they are received, at the rate set by the
+    ``x-validate-response-sample-rate`` extension of their operation (see
+    :class:`~tornado_openapi3.operations.OperationPolicy`), unless a
+    ``response_sample_rate`` is given for every operation.
+
+    The specification may be given as a dictionary, which is compiled with
+    :func:`compile_spec` and shared with other clients of the same service, or
+    as an already compiled :class:`openapi_core.OpenAPI` object. Validation
+    stops after ``max_errors`` errors, if given.
+
+    If ``max_concurrency`` is given, at most that many requests are in
+    progress at once, and further requests wait for one of them to complete
+    before they are sent.
+
+    Requests and responses that do not match the specification raise an
+    :class:`openapi_core.exceptions.OpenAPIError`, or are logged as warnings
+    if ``raise_errors`` is false.
+
+    .. code-block:: python
+
+        client = OpenAPIClient(users_spec_dict, max_clients=20)
+        response = await client.fetch("https://users.internal/v1/users/1")
+
+    """
+
+    def __init__(
+        self,
+        spec: typing.Union[openapi_core.OpenAPI, dict],
+        max_clients: int = 10,
+        max_concurrency: typing.Optional[int] = None,
+        max_errors: typing.Optional[int] = None,
+        response_sample_rate: typing.Optional[float] = None,
+        raise_errors: bool = True,
+    ) -> None:
+        self.spec = compile_spec(spec) if isinstance(spec, dict) else spec
+        self.http_client = tornado.httpclient.AsyncHTTPClient(
+            force_instance=True, max_clients=max_clients
+        )
+        self.max_errors = max_errors
+        self.response_sample_rate = response_sample_rate
+        self.raise_errors = raise_errors
+        self._semaphore = (
+            None
+            if max_concurrency is None
+            else tornado.locks.Semaphore(max_concurrency)
+        )
+
+    async def fetch(
+        self,
+        request: typing.Union[str, tornado.httpclient.HTTPRequest],
+        raise_error: bool = True,
+        **kwargs: typing.Any,
+    ) -> tornado.httpclient.HTTPResponse:
+        """Validates and sends a request, and validates its response.
+
+        Takes the same arguments as
+        :meth:`tornado.httpclient.AsyncHTTPClient.fetch`.
+
+        """
+        if not isinstance(request, tornado.httpclient.HTTPRequest):
+            request = tornado.httpclient.HTTPRequest(url=request, **kwargs)
+        elif kwargs:
+            raise ValueError("kwargs can't be used if request is an HTTPRequest object")
+        openapi_request = TornadoOpenAPIRequest(request)
+        result, policy = unmarshal_request(
+            self.spec, openapi_request, max_errors=self.max_errors
+        )
+        self._check(result, "Request to", request)
+
+        if self._semaphore is None:
+            response = await self.http_client.fetch(request, raise_error=False)
+        else:
+            async with self._semaphore:
+                response = await self.http_client.fetch(request, raise_error=False)
+
+        if self.response_sample_rate is None:
+            sample = policy.sample_response()
+        else:
+            sample = random.random() < self.response_sample_rate
+        if sample:
+            unmarshaller = validators.response_unmarshaller(self.spec, self.max_errors)
+            self._check(
+                unmarshaller.unmarshal(
+                    openapi_request, TornadoOpenAPIResponse(response)
+                ),
+                "Response from",
+                request,
+            )
+        if raise_error:
+            response.rethrow()
+        return response
+
+    def close(self) -> None:
+        """Closes the client's connections."""
+        self.http_client.close()
+
+    def _check(
+        self,
+        result: BaseUnmarshalResult,
+        message: str,
+        request: tornado.httpclient.HTTPRequest,
+    ) -> None:
+        if not result.errors:
+            return
+        if self.raise_errors:
+            result.raise_for_errors()
+        logger.warning(
+            "%s %s %s does not match its specification: %s",
+            message,
+            request.method,
+            request.url,
+            next(iter(result.errors)),
+        )
+
+
+__all__ = ["OpenAPIClient", "compile_spec", "specs"]
@@ -0,0 +1,106 @@
+import typing
+import zlib
+
+from openapi_core.exceptions import OpenAPIError
+
+from tornado_openapi3.limits import LimitExceeded
+
+#: The ``wbits`` argument of :func:`zlib.decompressobj` for each supported
+#: content coding. ``None`` stands for a body that is not compressed.
+WBITS: typing.Mapping[str, typing.Optional[int]] = {
+    "identity": None,
+    "gzip": 16 + zlib.MAX_WBITS,
+    "x-gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+class DecompressionError(OpenAPIError):
+    """A compressed request body is malformed or incomplete."""
+
+
+class UnsupportedEncoding(OpenAPIError):
+    """A request body is compressed with an unsupported content coding."""
+
+    def __init__(self, encoding: str) -> None:
+        super().__init__("Unsupported content encoding {!r}".format(encoding))
+        self.encoding = encoding
+
+
+class Decompressor:
+    """An incremental decompressor of request bodies with a size limit.
+
+    Compressed data is fed to the decompressor as it arrives, and decompressed
+    at most ``chunk_size`` bytes at a time, so that a small body expanding to
+    gigabytes is never held in memory. Once more than ``max_size`` bytes have
+    been decompressed, a :class:`LimitExceeded` error with a status code of
+    ``413`` is raised. Bodies without a content coding (``identity``) are
+    passed through unchanged, and counted against the same limit.
+
+    :raises UnsupportedEncoding: If ``encoding`` is not one of :data:`WBITS`.
+
+    """
+
+    def __init__(
+        self,
+        encoding: str = "identity",
+        max_size: typing.Optional[int] = None,
+        chunk_size: int = 65536,
+    ) -> None:
+        encoding = encoding.strip().lower() or "identity"
+        try:
+            wbits = WBITS[encoding]
+        except KeyError:
+            raise UnsupportedEncoding(encoding) from None
+        self.encoding = encoding
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+
+        #: The number of bytes decompressed so far.
+        self.size = 0
+
+        self._decompressobj = None if wbits is None else zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes) -> typing.Iterator[bytes]:
+        """Decompresses the next chunk of a body, yielding its content."""
+        if self._decompressobj is None:
+            yield self._count(data)
+            return
+        while data:
+            try:
+                content = self._decompressobj.decompress(data, self.chunk_size)
+            except zlib.error as e:
+                raise DecompressionError(
+                    "Malformed {} request body: {}".format(self.encoding, e)
+                ) from e
+            if self._decompressobj.unused_data:
+                raise DecompressionError(
+                    "Unexpected data after the end of the {} request body".format(
+                        self.encoding
+                    )
+                )
+            data = self._decompressobj.unconsumed_tail
+            if content:
+                yield self._count(content)
+
+    def finish(self) -> bytes:
+        """Returns the remaining content once the entire body has been fed.
+
+        :raises DecompressionError: If the body was incomplete.
+
+        """
+        if self._decompressobj is None:
+            return b""
+        content = self._count(self._decompressobj.flush())
+        if not self._decompressobj.eof:
+            raise DecompressionError("Incomplete {} request body".format(self.encoding))
+        return content
+
+    def _count(self, content: bytes) -> bytes:
+        self.size += len(content)
+        if self.max_size is not None and self.size > self.max_size:
+            raise LimitExceeded("max_body_size", self.max_size, 413)
+        return content
+
+
+__all__ = ["DecompressionError", "Decompressor", "UnsupportedEncoding", "WBITS"]
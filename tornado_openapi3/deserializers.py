@@ -0,0 +1,92 @@
+import functools
+import typing
+
+from tornado_openapi3.types import BufferDeserializer, Deserializer
+
+
+def buffered(deserializer: BufferDeserializer) -> Deserializer:
+    """Makes a deserializer of :class:`memoryview` objects.
+
+    Deserializers are passed request bodies as :class:`bytes`, and slicing
+    ``bytes`` copies them, which for framed binary formats can mean copying an
+    entire multi-megabyte body piece by piece. A deserializer wrapped with this
+    decorator is passed a :class:`memoryview` of the body instead, whose
+    slices share the body's memory.
+
+    .. code-block:: python
+
+        @buffered
+        def frames(value: memoryview) -> list:
+            frames = []
+            while value:
+                size = int.from_bytes(value[:4], "big")
+                frames.append(value[4 : 4 + size].tobytes())
+                value = value[4 + size :]
+            return frames
+
+        class Handler(OpenAPIRequestHandler):
+            custom_media_type_deserializers = {"application/x-frames": frames}
+
+    """
+
+    @functools.wraps(deserializer)
+    def deserialize(value: bytes, **parameters: str) -> typing.Any:
+        return deserializer(memoryview(value), **parameters)
+
+    return deserialize
+
+
+class MsgpackDeserializer:
+    """Deserializes `MessagePack`_ bodies.
+
+    Requires the ``msgpack`` package. Keyword arguments are passed to
+    :func:`msgpack.unpackb`.
+
+    .. code-block:: python
+
+        class Handler(OpenAPIRequestHandler):
+            custom_media_type_deserializers = {
+                "application/msgpack": MsgpackDeserializer(),
+                "application/cbor": CBORDeserializer(),
+            }
+
+    .. _MessagePack: https://msgpack.org/
+
+    """
+
+    def __init__(self, **options: typing.Any) -> None:
+        import msgpack  # type: ignore[import-untyped]
+
+        self.unpackb = msgpack.unpackb
+        self.options = options
+
+    def __call__(self, value: bytes, **parameters: str) -> typing.Any:
+        return self.unpackb(value, **self.options)
+
+
+class CBORDeserializer:
+    """Deserializes `CBOR`_ bodies.
+
+    Requires the ``cbor2`` package. Keyword arguments are passed to
+    :func:`cbor2.loads`.
+
+    .. _CBOR: https://cbor.io/
+
+    """
+
+    def __init__(self, **options: typing.Any) -> None:
+        import cbor2
+
+        self.loads = cbor2.loads
+        self.error = cbor2.CBORDecodeError
+        self.options = options
+
+    def __call__(self, value: bytes, **parameters: str) -> typing.Any:
+        try:
+            return self.loads(value, **self.options)
+        except self.error as e:
+            # Only value errors are reported as invalid bodies.
+            raise ValueError(str(e)) from e
+
+
+__all__ = ["CBORDeserializer", "MsgpackDeserializer", "buffered"]
@@ -0,0 +1,129 @@
+import typing
+
+from jsonschema_path import SchemaPath
+from openapi_core.validation.schemas.validators import SchemaValidator
+
+#: Maps discriminator values to the index of the alternative they select.
+Table = typing.Dict[str, int]
+
+#: The discriminating property of a schema and its :data:`Table`, or ``None``
+#: if the schema has no discriminator.
+Discriminator = typing.Optional[typing.Tuple[str, Table]]
+
+#: Discriminators of ``oneOf`` and ``anyOf`` schemas, keyed by the schema and
+#: keyword.
+Discriminators = typing.Dict[typing.Tuple[SchemaPath, str], Discriminator]
+
+_IMPLICIT = "#/components/schemas/"
+
+
+def table(schema: dict, keyword: str) -> Table:
+    """Maps the discriminator values of a schema to its ``keyword`` alternatives.
+
+    Values are resolved the way the JSON Schema validator resolves them: through
+    the discriminator's ``mapping`` if it has an entry for the value, and
+    otherwise as the name of a schema in ``#/components/schemas``. Values that
+    do not select one of the alternatives are left out.
+
+    """
+    indexes = {
+        alternative["$ref"]: index
+        for index, alternative in enumerate(schema.get(keyword) or [])
+        if isinstance(alternative, dict) and isinstance(alternative.get("$ref"), str)
+    }
+    values = {
+        ref[len(_IMPLICIT) :]: index
+        for ref, index in indexes.items()
+        if ref.startswith(_IMPLICIT)
+    }
+    for value, ref in (schema["discriminator"].get("mapping") or {}).items():
+        values.pop(value, None)
+        if ref in indexes:
+            values[value] = indexes[ref]
+    return values
+
+
+def discriminator(schema: SchemaPath, keyword: str) -> Discriminator:
+    """Reads the discriminator of a schema's ``keyword`` alternatives."""
+    with schema.open() as contents:
+        if not isinstance(contents, dict) or keyword not in contents:
+            return None
+        found = contents.get("discriminator")
+        if not isinstance(found, dict) or "propertyName" not in found:
+            return None
+        return found["propertyName"], table(contents, keyword)
+
+
+class DiscriminatingSchemaValidator(SchemaValidator):
+    """A schema validator that unmarshals only discriminated alternatives.
+
+    Openapi-core finds the ``oneOf`` and ``anyOf`` alternatives a value is
+    unmarshalled with by validating it against each of them in turn, so the
+    cost of unmarshalling grows with the number of alternatives. Values of
+    schemas with a ``discriminator`` are unmarshalled with the alternative
+    their discriminator value selects instead, which is looked up in a table.
+
+    Tables are built the first time a schema is used, and are kept in
+    ``discriminators``, which is shared with evolved validators.
+
+    """
+
+    def __init__(
+        self,
+        schema: SchemaPath,
+        validator: typing.Any,
+        discriminators: typing.Optional[Discriminators] = None,
+    ) -> None:
+        super().__init__(schema, validator)
+        self.discriminators: Discriminators = (
+            {} if discriminators is None else discriminators
+        )
+
+    def evolve(self, schema: SchemaPath) -> "DiscriminatingSchemaValidator":
+        evolved = typing.cast(DiscriminatingSchemaValidator, super().evolve(schema))
+        evolved.discriminators = self.discriminators
+        return evolved
+
+    def select(self, keyword: str, value: typing.Any) -> typing.Optional[int]:
+        """Returns the index of the alternative a value's discriminator selects.
+
+        Returns ``None`` if the schema has no discriminator, or the value has
+        no discriminator value that selects one of the schema's ``keyword``
+        alternatives, in which case each alternative must be tried.
+
+        """
+        if not isinstance(value, dict):
+            return None
+        key = (self.schema, keyword)
+        try:
+            found = self.discriminators[key]
+        except KeyError:
+            found = self.discriminators[key] = discriminator(self.schema, keyword)
+        if found is None:
+            return None
+        property_name, values = found
+        selected = value.get(property_name)
+        return values.get(selected) if isinstance(selected, str) else None
+
+    def get_one_of_schema(self, value: typing.Any) -> typing.Optional[SchemaPath]:
+        index = self.select("oneOf", value)
+        if index is None:
+            return super().get_one_of_schema(value)
+        return self.schema / "oneOf" / index
+
+    def iter_any_of_schemas(self, value: typing.Any) -> typing.Iterator[SchemaPath]:
+        index = self.select("anyOf", value)
+        if index is None:
+            yield from super().iter_any_of_schemas(value)
+        else:
+            yield self.schema / "anyOf" / index
+
+
+__all__ = [
+    "Discriminator",
+    "DiscriminatingSchemaValidator",
+    "Discriminators",
+    "Table",
+    "discriminator",
+    "table",
+]
@@ -0,0 +1,231 @@
+import gzip
+import hashlib
+import json
+import typing
+
+import ietfparse.algorithms
+import ietfparse.errors
+import ietfparse.headers
+import tornado.web
+import yaml  # type: ignore[import-untyped]
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:
+    brotli = None
+
+#: Content types of the formats a :class:`SpecDocument` is served in.
+CONTENT_TYPES = {
+    "json": "application/json",
+    "yaml": "application/yaml",
+}
+
+_Encoder = typing.Callable[[bytes], bytes]
+
+#: Content codings a :class:`SpecDocument` is precompressed with, in order of
+#: preference.
+ENCODERS: typing.Dict[str, _Encoder] = {}
+if brotli is not None:  # pragma: no cover
+    ENCODERS["br"] = lambda data: brotli.compress(data, quality=11)
+ENCODERS["gzip"] = lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class Representation(typing.NamedTuple):
+    """A serialized specification, encoded with a content coding."""
+
+    content_type: str
+    encoding: str
+    body: bytes
+    etag: str
+
+
+class SpecDocument:
+    """An OpenAPI 3 specification document, serialized for serving.
+
+    The specification is serialized as JSON and YAML, and compressed with each
+    of the :data:`ENCODERS` available (``gzip``, and ``br`` if the ``brotli``
+    package is installed), once, when the document is created or updated. Each
+    representation has a strong entity tag derived from its content.
+
+    Serve a document with :class:`SpecDocumentHandler`. Pass the same
+    specification to your request handlers to validate requests against the
+    document clients are given:
+
+    .. code-block:: python
+
+        document = SpecDocument(spec_dict)
+
+        class ResourceHandler(OpenAPIRequestHandler):
+            @property
+            def spec_dict(self) -> dict:
+                return document.spec_dict
+
+    """
+
+    def __init__(self, spec_dict: dict) -> None:
+        self.update(spec_dict)
+
+    @property
+    def spec_dict(self) -> dict:
+        """The specification being served."""
+        return self._spec_dict
+
+    def update(self, spec_dict: dict) -> None:
+        """Replaces the specification being served.
+
+        The new specification is serialized and compressed before it replaces
+        the old one, so concurrent requests are served one or the other in
+        full.
+
+        """
+        representations = {
+            format: _representations(CONTENT_TYPES[format], body)
+            for format, body in (
+                ("json", json.dumps(spec_dict, ensure_ascii=False).encode()),
+                (
+                    "yaml",
+                    yaml.safe_dump(
+                        spec_dict, sort_keys=False, allow_unicode=True
+                    ).encode(),
+                ),
+            )
+        }
+        self._spec_dict, self._representations = spec_dict, representations
+
+    def representation(self, format: str, accept_encoding: str = "") -> Representation:
+        """Returns the best representation of the document for a client.
+
+        ``format`` is a key of :data:`CONTENT_TYPES`, and ``accept_encoding``
+        the value of the client's ``Accept-Encoding`` header.
+
+        """
+        representations = self._representations[format]
+        qualities = _qualities(accept_encoding)
+        best = representations["identity"]
+        quality = 0.0
+        for encoding in ENCODERS:
+            accepted = qualities.get(encoding, qualities.get("*", 0.0))
+            if accepted > quality and encoding in representations:
+                best, quality = representations[encoding], accepted
+        return best
+
+
+def _representations(
+    content_type: str, body: bytes
+) -> typing.Dict[str, Representation]:
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    representations = {
+        "identity": Representation(
+            content_type, "identity", body, '"{}"'.format(digest)
+        )
+    }
+    for encoding, encode in ENCODERS.items():
+        encoded = encode(body)
+        if len(encoded) < len(body):
+            representations[encoding] = Representation(
+                content_type, encoding, encoded, '"{}-{}"'.format(digest, encoding)
+            )
+    return representations
+
+
+def _qualities(accept_encoding: str) -> typing.Dict[str, float]:
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            qualities[name.strip().lower()] = quality
+    return qualities
+
+
+class SpecDocumentHandler(tornado.web.RequestHandler):
+    """Serves a :class:`SpecDocument` as JSON or YAML.
+
+    The format is taken from the first argument of the route, if it has one
+    (``json``, ``yaml`` or ``yml``), and negotiated from the request's
+    ``Accept`` header otherwise, defaulting to JSON. Responses are sent
+    precompressed if the client accepts it, and requests with an
+    ``If-None-Match`` header matching the document's entity tag are answered
+    with ``304 Not Modified``.
+
+    .. code-block:: python
+
+        app = tornado.web.Application(
+            [
+                (r"/openapi\\.(json|ya?ml)", SpecDocumentHandler,
+                 {"document": document}),
+                (r"/openapi", SpecDocumentHandler, {"document": document}),
+                ...
+            ]
+        )
+
+    ``cache_control`` sets the ``Cache-Control`` header of responses. The
+    default requires clients to revalidate their copy (which is cheap, thanks
+    to the entity tag) so that updates to the document are seen immediately.
+
+    """
+
+    def initialize(
+        self, document: SpecDocument, cache_control: str = "no-cache"
+    ) -> None:
+        self.document = document
+        self.cache_control = cache_control
+
+    def get(self, extension: typing.Optional[str] = None) -> None:
+        if extension is None:
+            format = self._negotiate()
+            self.add_header("Vary", "Accept")
+        elif extension in ("json", "yaml", "yml"):
+            format = "json" if extension == "json" else "yaml"
+        else:
+            raise tornado.web.HTTPError(404)
+        self.add_header("Vary", "Accept-Encoding")
+        representation = self.document.representation(
+            format, self.request.headers.get("Accept-Encoding", "")
+        )
+        self.set_header("Cache-Control", self.cache_control)
+        self.set_header("Etag", representation.etag)
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header("Content-Type", representation.content_type)
+        if representation.encoding != "identity":
+            self.set_header("Content-Encoding", representation.encoding)
+        self.finish(representation.body)
+
+    head = get
+
+    def _negotiate(self) -> str:
+        accept = self.request.headers.get("Accept")
+        if not accept:
+            return "json"
+        formats = {
+            content_type: format for format, content_type in CONTENT_TYPES.items()
+        }
+        try:
+            selected, _ = ietfparse.algorithms.select_content_type(
+                ietfparse.headers.parse_accept(accept),
+                [
+                    ietfparse.headers.parse_content_type(content_type)
+                    for content_type in formats
+                ],
+            )
+        except ietfparse.errors.NoMatch:
+            return "json"
+        return formats[str(selected)]
+
+
+__all__ = [
+    "CONTENT_TYPES",
+    "ENCODERS",
+    "Representation",
+    "SpecDocument",
+    "SpecDocumentHandler",
+]
@@ -0,0 +1,178 @@
+import asyncio
+import contextlib
+import contextvars
+import typing
+
+from openapi_core.validation.request.exceptions import RequestValidationError
+
+from tornado_openapi3.types import AsyncFormatter
+from tornado_openapi3.util import LRUCache
+
+_batch: "contextvars.ContextVar[typing.Optional[FormatBatch]]" = contextvars.ContextVar(
+    "tornado_openapi3.formats.batch", default=None
+)
+
+
+class InvalidFormat(RequestValidationError):
+    """A value was rejected by a :class:`BatchFormatter`."""
+
+    def __init__(self, formatter: "BatchFormatter", value: str) -> None:
+        self.formatter = formatter
+        self.value = value
+
+    def __str__(self) -> str:
+        return "Value {!r} does not match its format".format(self.value)
+
+
+class BatchFormatter:
+    """A formatter checking values with an :class:`~.types.AsyncFormatter`.
+
+    Formats that need I/O to validate a value, such as checking that an
+    identifier exists, cannot be checked while a request is validated, as
+    validation is synchronous. A batch formatter accepts such values during
+    validation, collecting them in the :class:`FormatBatch` of the request
+    being validated. Once validation is complete, the values of each batch
+    formatter are validated together with a single call to the async
+    formatter's ``validate_many`` method.
+
+    Batch formatters may be used wherever custom formatters are accepted:
+
+    .. code-block:: python
+
+        class CustomerIds:
+            async def validate_many(self, values):
+                found = await customers.existing(values)
+                return [value in found for value in values]
+
+            def unmarshal(self, value):
+                return value
+
+        class OrderHandler(OpenAPIRequestHandler):
+            custom_formatters = {
+                "customer-id": BatchFormatter(CustomerIds(), cache_size=1000)
+            }
+
+    If ``cache_size`` is given, the outcomes of up to that many values are
+    kept, and values with a known outcome are not validated again.
+
+    Values are checked by
+    :meth:`~tornado_openapi3.handler.OpenAPIRequestHandler.prepare` (and, for
+    streamed bodies, once the body has been received), or by
+    :meth:`FormatBatch.check` within :func:`collect`. Values validated outside
+    :func:`collect`, such as by :func:`~tornado_openapi3.batch.unmarshal_requests`
+    or an :class:`~tornado_openapi3.client.OpenAPIClient`, cannot be checked
+    and are rejected. As values are accepted while the schema is being
+    validated, batch formats should not be relied upon to choose between
+    ``oneOf`` or ``anyOf`` alternatives.
+
+    """
+
+    def __init__(self, formatter: AsyncFormatter, cache_size: int = 0) -> None:
+        self.formatter = formatter
+        self.cache: typing.Optional[LRUCache[str, bool]] = (
+            LRUCache(maxsize=cache_size) if cache_size else None
+        )
+
+    def validate(self, value: str) -> bool:
+        if not isinstance(value, str):
+            return True
+        batch = _batch.get()
+        if batch is None:
+            return False
+        batch.add(self, value)
+        return True
+
+    def unmarshal(self, value: str) -> typing.Any:
+        return self.formatter.unmarshal(value)
+
+    async def validate_many(self, values: typing.Sequence[str]) -> typing.List[bool]:
+        """Validates values, calling the async formatter at most once."""
+        if self.cache is None:
+            return list(await self.formatter.validate_many(values))
+        outcomes = {value: self.cache.get(value) for value in values}
+        unknown = [value for value, outcome in outcomes.items() if outcome is None]
+        if unknown:
+            for value, valid in zip(
+                unknown, await self.formatter.validate_many(unknown)
+            ):
+                outcomes[value] = valid
+                self.cache.set(value, valid)
+        return [bool(outcomes[value]) for value in values]
+
+
+class FormatBatch:
+    """The values collected by :class:`BatchFormatter` objects for a request."""
+
+    def __init__(self) -> None:
+        self.values: typing.Dict[BatchFormatter, typing.Dict[str, None]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.values)
+
+    def add(self, formatter: BatchFormatter, value: str) -> None:
+        """Adds a value to be validated by a formatter."""
+        self.values.setdefault(formatter, {})[value] = None
+
+    def items(self) -> typing.Tuple[typing.Tuple[BatchFormatter, str], ...]:
+        """Returns the formatters and values collected, in the order added."""
+        return tuple(
+            (formatter, value)
+            for formatter, values in self.values.items()
+            for value in values
+        )
+
+    def extend(self, items: typing.Iterable[typing.Tuple[BatchFormatter, str]]) -> None:
+        """Adds values collected by another batch, as returned by :meth:`items`."""
+        for formatter, value in items:
+            self.add(formatter, value)
+
+    async def check(self) -> typing.List[InvalidFormat]:
+        """Validates the values collected, returning an error for each invalid one.
+
+        Each formatter's values are validated with a single call, and the
+        formatters are called concurrently.
+
+        """
+        batches = [
+            (formatter, list(values)) for formatter, values in self.values.items()
+        ]
+        outcomes = await asyncio.gather(
+            *(formatter.validate_many(values) for formatter, values in batches)
+        )
+        return [
+            InvalidFormat(formatter, value)
+            for (formatter, values), valid in zip(batches, outcomes)
+            for value, ok in zip(values, valid)
+            if not ok
+        ]
+
+
+def current_batch() -> typing.Optional[FormatBatch]:
+    """Returns the batch values are being collected in, if any."""
+    return _batch.get()
+
+
+@contextlib.contextmanager
+def collect(batch: typing.Optional[FormatBatch] = None) -> typing.Iterator[FormatBatch]:
+    """Collects the values validated by batch formatters within the block.
+
+    Values are added to ``batch`` if given, so that values validated in several
+    blocks may be checked together.
+
+    """
+    if batch is None:
+        batch = FormatBatch()
+    token = _batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _batch.reset(token)
+
+
+__all__ = [
+    "BatchFormatter",
+    "FormatBatch",
+    "InvalidFormat",
+    "collect",
+    "current_batch",
+]
@@ -1,29 +1,44 @@
 import asyncio
+import contextlib
 import logging
+import time
 import typing
 
-import openapi_core
-import openapi_core.validation.request.exceptions
-from openapi_core.exceptions import OpenAPIError
-from openapi_core.validation.request.exceptions import (
-    RequestBodyValidationError,
-    SecurityValidationError,
-)
-from openapi_core.templating.media_types.exceptions import (
-    MediaTypeNotFound,
-)
-from openapi_core.templating.paths.exceptions import (
-    OperationNotFound,
-    PathNotFound,
-)
+import tornado.httputil
 import tornado.web
 
-import tornado_openapi3.requests
-import tornado_openapi3.types
 from tornado_openapi3.types import Deserializer, Formatter
+from tornado_openapi3.util import LRUCache, digest, is_json, json_dumps
+
+# openapi-core is imported when a spec is first compiled rather than with this
+# module, so processes that never validate a request can import handlers cheaply.
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import openapi_core
+    from openapi_core.exceptions import OpenAPIError
+    from openapi_core.unmarshalling.request.datatypes import RequestUnmarshalResult
+
+    from tornado_openapi3.admission import AdmissionController
+    from tornado_openapi3.cache import ValidationCache
+    from tornado_openapi3.limits import ValidationLimits
+    from tornado_openapi3.metrics import MetricsStore
+    from tornado_openapi3.operations import OperationPolicy
+    from tornado_openapi3.profiling import ValidationProfiler
+    from tornado_openapi3.registry import SpecRegistry
+    from tornado_openapi3.requests import TornadoOpenAPIRequest
 
 logger = logging.getLogger(__name__)
 
+# Specifications compiled by OpenAPIRequestHandler.spec, keyed by handler class
+# and a digest of the specification, and by handler class and the identity of
+# the specification dictionary (which is kept alive along with its spec), so
+# that handlers returning the same dictionary are not hashing it every request.
+_SpecKey = typing.Tuple[type, bytes]
+_SpecDictKey = typing.Tuple[type, int]
+_compiled_specs: "LRUCache[_SpecKey, openapi_core.OpenAPI]" = LRUCache(maxsize=32)
+_spec_dicts: "LRUCache[_SpecDictKey, typing.Tuple[dict, openapi_core.OpenAPI]]" = (
+    LRUCache(maxsize=32)
+)
+
 
 class OpenAPIRequestHandler(tornado.web.RequestHandler):
     """Base class for HTTP request handlers.
@@ -34,6 +49,34 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
 
     """
 
+    def __init__(
+        self,
+        application: tornado.web.Application,
+        request: tornado.httputil.HTTPServerRequest,
+        **kwargs: typing.Any,
+    ) -> None:
+        # Handlers are created once the body of a request has been received,
+        # or its headers if its body is streamed.
+        self._received = time.perf_counter()
+        super().__init__(application, request, **kwargs)
+
+    @property
+    def operation_policy(self) -> "OperationPolicy":
+        """The :class:`~tornado_openapi3.operations.OperationPolicy` applied to
+        the current request by :meth:`prepare`.
+
+        """
+        try:
+            return self._operation_policy
+        except AttributeError:
+            from tornado_openapi3.operations import DEFAULT_POLICY
+
+            return DEFAULT_POLICY
+
+    @operation_policy.setter
+    def operation_policy(self, policy: "OperationPolicy") -> None:
+        self._operation_policy = policy
+
     @property
     def spec_dict(self) -> dict:
         """The OpenAPI 3 specification
@@ -47,15 +90,56 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
         raise NotImplementedError()
 
     @property
-    def spec(self) -> openapi_core.OpenAPI:
+    def spec(self) -> "openapi_core.OpenAPI":
         """The OpenAPI 3 specification.
 
         Override this in your request handlers to customize how your OpenAPI 3
         spec is loaded and validated.
 
+        If the application has an ``openapi_registry`` setting containing a
+        :class:`~tornado_openapi3.registry.SpecRegistry`, the spec mounted at
+        the prefix matching the request path is used. Otherwise, the spec is
+        compiled from :attr:`spec_dict`, once per handler class and
+        specification, along with the :attr:`custom_formatters` and
+        :attr:`custom_media_type_deserializers` of the first handler compiling
+        it. The policies of its operations are read, and its patterns compiled,
+        as it is compiled (see :func:`~tornado_openapi3.operations.read_policies`
+        and :func:`~tornado_openapi3.patterns.precompile`). Compiled specs are
+        shared by every request, so that the operation policies, validation
+        caches and compiled schemas kept for a spec last beyond a single
+        request. Return a new dictionary from
+        :attr:`spec_dict` to change the specification, rather than modifying
+        it in place.
+
         :rtype: :class:`openapi_core.schema.specs.model.Spec`
 
         """
+        registry: typing.Optional["SpecRegistry"] = self.settings.get(
+            "openapi_registry"
+        )
+        if registry is not None:
+            spec = registry.spec(self.request.path)
+            if spec is not None:
+                return spec
+
+        spec_dict = self.spec_dict
+        identity = (type(self), id(spec_dict))
+        cached = _spec_dicts.get(identity)
+        if cached is not None and cached[0] is spec_dict:
+            return cached[1]
+        key = (type(self), digest(spec_dict))
+        spec = _compiled_specs.get(key)
+        if spec is None:
+            spec = self._compile_spec(spec_dict)
+            _compiled_specs.set(key, spec)
+        _spec_dicts.set(identity, (spec_dict, spec))
+        return spec
+
+    def _compile_spec(self, spec_dict: dict) -> "openapi_core.OpenAPI":
+        import openapi_core
+
+        from tornado_openapi3 import operations, patterns
+
         config = openapi_core.Config(
             extra_format_unmarshallers={
                 format: formatter.unmarshal
@@ -67,7 +151,10 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
             },
             extra_media_type_deserializers=self.custom_media_type_deserializers,
         )
-        return openapi_core.OpenAPI.from_dict(self.spec_dict, config=config)
+        spec = openapi_core.OpenAPI.from_dict(spec_dict, config=config)
+        operations.read_policies(spec)
+        patterns.precompile(spec)
+        return spec
 
     @property
     def custom_formatters(self) -> typing.Dict[str, Formatter]:
@@ -75,7 +162,9 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
 
         If your schemas make use of format modifiers, you may specify them in
         this dictionary paired with a Formatter object that provides methods to
-        validate values and unmarshal them into Python objects.
+        validate values and unmarshal them into Python objects. Formats whose
+        values are validated asynchronously may be checked with a
+        :class:`~tornado_openapi3.formats.BatchFormatter`.
 
         :rtype: Mapping[str, :class:`~tornado_openapi3.types.Formatter`]
 
@@ -90,11 +179,91 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
         If your endpoints make use of content types beyond ``application/json``,
         you must add them to this dictionary with a deserializing method that
         converts the raw body (as ``bytes`` or ``str``) to Python objects.
+        Deserializers for binary formats are provided by
+        :mod:`tornado_openapi3.deserializers`.
 
         :rtype: Mapping[str, :attr:`~tornado_openapi3.types.Deserializer`]
         """
         return dict()
 
+    @property
+    def validation_cache(self) -> typing.Optional["ValidationCache"]:
+        """A cache of request body validation outcomes, if any.
+
+        Defaults to the ``openapi_validation_cache`` application setting. See
+        :class:`~tornado_openapi3.cache.ValidationCache`.
+
+        :rtype: :class:`~tornado_openapi3.cache.ValidationCache`
+
+        """
+        return self.settings.get("openapi_validation_cache")
+
+    @property
+    def max_validation_errors(self) -> typing.Optional[int]:
+        """The number of schema errors after which validation stops, if any.
+
+        By default every error in an invalid value is collected before the
+        request is rejected. Setting this (or the
+        ``openapi_max_validation_errors`` application setting) to ``1`` rejects
+        malformed requests as soon as the first error is found. Further errors
+        may still be found by iterating over the ``schema_errors`` of the
+        :class:`~openapi_core.validation.schemas.exceptions.InvalidSchemaValue`
+        causing the error passed to :meth:`on_openapi_error`; see
+        :class:`~tornado_openapi3.validators.SchemaErrors`.
+
+        :rtype: int
+
+        """
+        return self.settings.get("openapi_max_validation_errors")
+
+    @property
+    def validation_limits(self) -> typing.Optional["ValidationLimits"]:
+        """Limits on the work done validating each request, if any.
+
+        Defaults to the ``openapi_validation_limits`` application setting. See
+        :class:`~tornado_openapi3.limits.ValidationLimits`.
+
+        :rtype: :class:`~tornado_openapi3.limits.ValidationLimits`
+
+        """
+        return self.settings.get("openapi_validation_limits")
+
+    @property
+    def validation_profiler(self) -> typing.Optional["ValidationProfiler"]:
+        """A profiler recording requests that are slow to validate, if any.
+
+        Defaults to the ``openapi_validation_profiler`` application setting. See
+        :class:`~tornado_openapi3.profiling.ValidationProfiler`.
+
+        :rtype: :class:`~tornado_openapi3.profiling.ValidationProfiler`
+
+        """
+        return self.settings.get("openapi_validation_profiler")
+
+    @property
+    def admission_controller(self) -> typing.Optional["AdmissionController"]:
+        """A controller turning requests away when the server is overloaded.
+
+        Defaults to the ``openapi_admission_controller`` application setting.
+        See :class:`~tornado_openapi3.admission.AdmissionController`.
+
+        :rtype: :class:`~tornado_openapi3.admission.AdmissionController`
+
+        """
+        return self.settings.get("openapi_admission_controller")
+
+    @property
+    def metrics(self) -> typing.Optional["MetricsStore"]:
+        """A store of per-operation latency and error metrics, if any.
+
+        Defaults to the ``openapi_metrics`` application setting. See
+        :class:`~tornado_openapi3.metrics.MetricsStore`.
+
+        :rtype: :class:`~tornado_openapi3.metrics.MetricsStore`
+
+        """
+        return self.settings.get("openapi_metrics")
+
     async def prepare(self) -> None:
         """Called at the beginning of a request before *get/post/etc*.
 
@@ -118,12 +287,24 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
         |``MissingRequestBody``,      |          |                                     |
         |``ValidateError``            |          |                                     |
         +-----------------------------+----------+-------------------------------------+
+        |``InvalidFormat``            |``400``   |A value was rejected by a            |
+        |                             |          |:class:`~.formats.BatchFormatter`.   |
+        +-----------------------------+----------+-------------------------------------+
         |``InvalidSecurity``          |``401``   |Required authorization was missing   |
         |                             |          |from the request.                    |
         +-----------------------------+----------+-------------------------------------+
-        |``MediaTypeNotFound``        |``415``   |The content type of the request did  |
-        |                             |          |not match any of the types in the    |
-        |                             |          |OpenAPI specification.               |
+        |``MediaTypeNotFound``,       |``415``   |The content type of the request did  |
+        |``UnsupportedEncoding``      |          |not match any of the types in the    |
+        |                             |          |OpenAPI specification, or its body   |
+        |                             |          |was compressed with an unsupported   |
+        |                             |          |content coding.                      |
+        +-----------------------------+----------+-------------------------------------+
+        |``LimitExceeded``            |``413``,  |The message body exceeded one of the |
+        |                             |``400``   |:attr:`validation_limits`, or its    |
+        |                             |          |operation's ``x-max-body-size``.     |
+        +-----------------------------+----------+-------------------------------------+
+        |``Overloaded``               |``503``   |The request was turned away by the   |
+        |                             |          |:attr:`admission_controller`.        |
         +-----------------------------+----------+-------------------------------------+
         |Any other ``OpenAPIError``   |``500``   |An unexpected error occurred.        |
         +-----------------------------+----------+-------------------------------------+
@@ -131,32 +312,206 @@ class OpenAPIRequestHandler(tornado.web.RequestHandler):
         To provide content in these error requests, you may override
         :meth:`on_openapi_error`.
 
+        How much of the request is validated may be tuned per operation with
+        the ``x-validation`` specification extension (see
+        :class:`~tornado_openapi3.operations.OperationPolicy`). The policy
+        applied to the request is available as :attr:`operation_policy`.
+
         """
         maybe_coro = super().prepare()
         if maybe_coro and asyncio.iscoroutine(maybe_coro):  # pragma: no cover
             await maybe_coro
 
-        request = tornado_openapi3.requests.TornadoOpenAPIRequest(self.request)
-        result = self.spec.unmarshal_request(request)
+        from tornado_openapi3 import formats
+        from tornado_openapi3.operations import unmarshal_request
+        from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+        request = TornadoOpenAPIRequest(self.request)
+        spec = self.spec
+        if not self._admit(spec, request):
+            return
+        profiler = self.validation_profiler
+        profiling: typing.ContextManager[None] = (
+            contextlib.nullcontext()
+            if profiler is None
+            else profiler.profile(spec, request)
+        )
+        self._openapi_spec, self._openapi_request = spec, request
+        self._validation_started = time.perf_counter()
+        with profiling, formats.collect() as batch:
+            result, policy = unmarshal_request(
+                spec,
+                request,
+                self.validation_cache,
+                self.max_validation_errors,
+                self.validation_limits,
+                # Streamed bodies have not been received yet.
+                validate_body=not getattr(self, "_stream_request_body", False),
+            )
+        if batch and not result.errors:
+            result.errors = await batch.check()
+        self.operation_policy = policy
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.operation(policy.operation_id).validation.observe(
+                time.perf_counter() - self._validation_started
+            )
+        self._raise_for_errors(result)
+        self.validated = result
+
+    def _admit(
+        self, spec: "openapi_core.OpenAPI", request: "TornadoOpenAPIRequest"
+    ) -> bool:
+        controller = self.admission_controller
+        if controller is None:
+            return True
+
+        from tornado_openapi3.operations import find_policy
+
+        self.operation_policy = find_policy(spec, request)
+        overloaded = controller.admit(
+            self.operation_policy, time.perf_counter() - self._received
+        )
+        if overloaded is not None:
+            self.set_header("Retry-After", str(overloaded.retry_after))
+            self._reject(503, overloaded)
+            return False
+        self._admitted: typing.Optional["AdmissionController"] = controller
+        return True
+
+    def _release_admission(self) -> None:
+        admitted = getattr(self, "_admitted", None)
+        if admitted is not None:
+            self._admitted = None
+            admitted.release()
+
+    def _raise_for_errors(self, result: "RequestUnmarshalResult") -> None:
+        from openapi_core.exceptions import OpenAPIError
+        from openapi_core.templating.media_types.exceptions import MediaTypeNotFound
+        from openapi_core.templating.paths.exceptions import (
+            OperationNotFound,
+            PathNotFound,
+        )
+        from openapi_core.validation.request.exceptions import (
+            RequestBodyValidationError,
+            SecurityValidationError,
+        )
+
+        from tornado_openapi3.decompression import UnsupportedEncoding
+        from tornado_openapi3.formats import InvalidFormat
+        from tornado_openapi3.limits import LimitExceeded
+
         try:
             result.raise_for_errors()
-        except PathNotFound as e:
-            self.on_openapi_error(404, e)
-        except OperationNotFound as e:
-            self.on_openapi_error(405, e)
-        except RequestBodyValidationError as e:
-            if isinstance(e.__cause__, MediaTypeNotFound):
-                self.on_openapi_error(415, e)
-            else:
-                self.on_openapi_error(400, e)
-        except SecurityValidationError as e:
-            self.on_openapi_error(401, e)
-        except OpenAPIError as e:  # pragma: no cover
-            logger.exception("Unexpected validation failure")
-            self.on_openapi_error(500, e)
-        self.validated = result
+        except OpenAPIError as e:
+            # Limits apply to parameters as well as bodies, so they are mapped
+            # whichever error they caused.
+            if isinstance(e.__cause__, LimitExceeded):
+                self._reject(e.__cause__.status_code, e)
+            elif isinstance(e, PathNotFound):
+                self._reject(404, e)
+            elif isinstance(e, OperationNotFound):
+                self._reject(405, e)
+            elif isinstance(e, RequestBodyValidationError):
+                if isinstance(e.__cause__, (MediaTypeNotFound, UnsupportedEncoding)):
+                    self._reject(415, e)
+                else:
+                    self._reject(400, e)
+            elif isinstance(e, SecurityValidationError):
+                self._reject(401, e)
+            elif isinstance(e, InvalidFormat):
+                self._reject(400, e)
+            else:  # pragma: no cover
+                logger.exception("Unexpected validation failure")
+                self._reject(500, e)
+
+    def _reject(self, status_code: int, error: "OpenAPIError") -> None:
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.operation(self.operation_policy.operation_id).count_error(
+                status_code
+            )
+        self.on_openapi_error(status_code, error)
+
+    def on_finish(self) -> None:
+        """Called after the end of a request.
+
+        Records the time taken to handle the request in :attr:`metrics`, and
+        releases the request from the :attr:`admission_controller`. Handlers
+        overriding this method should call the superclass implementation.
+
+        """
+        self._release_admission()
+        metrics = self.metrics
+        started = getattr(self, "_validation_started", None)
+        if metrics is not None and started is not None:
+            metrics.operation(self.operation_policy.operation_id).request.observe(
+                time.perf_counter() - started
+            )
+
+    def on_connection_close(self) -> None:
+        """Called when the client closes the connection of a request.
+
+        Releases the request from the :attr:`admission_controller`, as
+        :meth:`on_finish` is not called for requests that are never finished.
+        Handlers overriding this method should call the superclass
+        implementation.
 
-    def on_openapi_error(self, status_code: int, error: OpenAPIError) -> None:
+        """
+        super().on_connection_close()
+        self._release_admission()
+
+    def write_validated(
+        self,
+        value: typing.Any,
+        status: int = 200,
+        content_type: typing.Optional[str] = None,
+    ) -> None:
+        """Validates a response and writes it.
+
+        ``value`` is validated against the schema of the response documented
+        for the current operation and ``status``, before being serialized, so
+        it must consist of JSON-compatible types (dictionaries, lists, strings,
+        numbers, booleans and ``None``). The media type of the response is
+        ``content_type``, if given, or the first one documented. It is set as
+        the ``Content-Type`` of the response.
+
+        Values are serialized as JSON if the media type is JSON or a wildcard.
+        Strings and bytes may be written as any other media type.
+        Responses are only validated for the fraction of requests given by the
+        ``x-validate-response-sample-rate`` of the :attr:`operation_policy`.
+
+        :raises openapi_core.exceptions.OpenAPIError: If the response is not
+            documented, or the value does not match its schema.
+
+        """
+        from tornado_openapi3.operations import validate_response
+
+        mime_type = validate_response(
+            self._openapi_spec,
+            self._openapi_request,
+            status,
+            value,
+            content_type,
+            validate=self.operation_policy.sample_response(),
+        )
+        self.set_status(status)
+        if mime_type is None:
+            return
+        if is_json(mime_type) or "*" in mime_type:
+            content: typing.Union[bytes, str] = json_dumps(value)
+            if not is_json(mime_type):
+                mime_type = "application/json"
+        elif isinstance(value, (bytes, str)):
+            content = value
+        else:
+            raise TypeError(
+                "Cannot serialize {} as {}".format(type(value).__name__, mime_type)
+            )
+        self.set_header("Content-Type", mime_type)
+        self.write(content)
+
+    def on_openapi_error(self, status_code: int, error: "OpenAPIError") -> None:
         """Sets an HTTP status code and finishes the request.
 
         By default, no content is returned. To provide more informative
@@ -0,0 +1,62 @@
+import typing
+
+from tornado.httputil import HTTPHeaders
+
+
+class TornadoHeaders(typing.Mapping[str, str]):
+    """A read-only view of Tornado HTTP headers for OpenAPI validation.
+
+    Wraps a :class:`tornado.httputil.HTTPHeaders` object without copying it,
+    providing the interface openapi-core expects of a
+    :class:`werkzeug.datastructures.Headers` object: case-insensitive lookups
+    returning the first value of a header, and :meth:`getlist` for headers
+    with multiple values.
+
+    """
+
+    __slots__ = ("headers",)
+
+    def __init__(self, headers: HTTPHeaders) -> None:
+        self.headers = headers
+
+    def __getitem__(self, name: str) -> str:
+        values = self.headers.get_list(name)
+        if not values:
+            raise KeyError(name)
+        return values[0]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.headers
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.headers)
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TornadoHeaders):
+            pairs: typing.Iterable[typing.Tuple[str, str]] = other.headers.get_all()
+        elif isinstance(other, typing.Mapping):
+            # Multi-valued mappings such as werkzeug's Headers return every
+            # value from items(), not just the first.
+            pairs = other.items()
+        else:
+            return NotImplemented
+        return _lowered(self.headers.get_all()) == _lowered(pairs)
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, list(self.headers.get_all()))
+
+    def getlist(self, name: str) -> typing.List[str]:
+        """Returns all values of a header, or an empty list if it is missing."""
+        return list(self.headers.get_list(name))
+
+
+def _lowered(
+    pairs: typing.Iterable[typing.Tuple[str, str]],
+) -> typing.Set[typing.Tuple[str, str]]:
+    return {(name.lower(), value) for name, value in pairs}
+
+
+__all__ = ["TornadoHeaders"]
@@ -0,0 +1,199 @@
+import contextlib
+import contextvars
+import dataclasses
+import time
+import typing
+
+import jsonschema.validators  # type: ignore[import-untyped]
+from openapi_core.exceptions import OpenAPIError
+
+#: The number of values walked between checks of the time limit.
+_CLOCK_INTERVAL = 256
+
+_validator_classes: typing.Dict[type, type] = {}
+
+
+@dataclasses.dataclass(frozen=True)
+class ValidationLimits:
+    """Limits on the work done validating a single request.
+
+    The cost of validating a request grows with its body: deeply nested
+    objects, large arrays and wide ``oneOf`` schemas can make a single request
+    occupy the IOLoop for a long time. Requests exceeding any of these limits
+    are rejected with a :class:`LimitExceeded` error. Limits left as ``None``
+    are not enforced.
+
+    """
+
+    #: The deepest nesting of objects and arrays allowed in a request body.
+    max_depth: typing.Optional[int] = None
+
+    #: The largest array allowed anywhere in a request body.
+    max_array_items: typing.Optional[int] = None
+
+    #: The most schema keywords that may be evaluated validating a request.
+    max_nodes: typing.Optional[int] = None
+
+    #: The most time, in seconds, that may be spent validating a request.
+    max_seconds: typing.Optional[float] = None
+
+
+class LimitExceeded(OpenAPIError):
+    """A request exceeded one of its :class:`ValidationLimits`.
+
+    Limits on the size of a request (``max_array_items`` and ``max_nodes``)
+    have a :attr:`status_code` of ``413``, while the others have ``400``.
+
+    """
+
+    def __init__(self, limit: str, maximum: float, status_code: int) -> None:
+        super().__init__("Request exceeded {} of {}".format(limit, maximum))
+        self.limit = limit
+        self.maximum = maximum
+        self.status_code = status_code
+
+
+class Budget:
+    """Tracks the work done validating a single request against its limits."""
+
+    def __init__(self, limits: ValidationLimits) -> None:
+        self.limits = limits
+        self.nodes = 0
+        self.remaining = limits.max_seconds
+        self.deadline: typing.Optional[float] = None
+        self.resume()
+
+    def resume(self) -> None:
+        """Starts counting time against ``max_seconds``."""
+        if self.remaining is not None:
+            self.deadline = time.monotonic() + self.remaining
+
+    def pause(self) -> None:
+        """Stops counting time against ``max_seconds`` until :meth:`resume`."""
+        if self.deadline is not None:
+            self.remaining = max(0.0, self.deadline - time.monotonic())
+            self.deadline = None
+
+    def visit(self) -> None:
+        """Counts the evaluation of a schema keyword."""
+        self.nodes += 1
+        if self.limits.max_nodes is not None and self.nodes > self.limits.max_nodes:
+            raise LimitExceeded("max_nodes", self.limits.max_nodes, 413)
+        if self.nodes % _CLOCK_INTERVAL == 0:
+            self.check_time()
+
+    def check_time(self) -> None:
+        """Raises :class:`LimitExceeded` if the time limit has passed."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise LimitExceeded(
+                "max_seconds", typing.cast(float, self.limits.max_seconds), 400
+            )
+
+    def check_value(self, value: typing.Any) -> None:
+        """Checks the shape of a deserialized body before it is validated."""
+        max_depth = self.limits.max_depth
+        max_items = self.limits.max_array_items
+        if max_depth is None and max_items is None and self.deadline is None:
+            return
+        stack = [(value, 0)]
+        walked = 0
+        while stack:
+            value, depth = stack.pop()
+            walked += 1
+            if walked % _CLOCK_INTERVAL == 0:
+                self.check_time()
+            if isinstance(value, dict):
+                children: typing.Iterable[typing.Any] = value.values()
+            elif isinstance(value, list):
+                if max_items is not None and len(value) > max_items:
+                    raise LimitExceeded("max_array_items", max_items, 413)
+                children = value
+            else:
+                continue
+            if max_depth is not None and depth >= max_depth:
+                raise LimitExceeded("max_depth", max_depth, 400)
+            stack.extend((child, depth + 1) for child in children)
+
+
+_budget: "contextvars.ContextVar[typing.Optional[Budget]]" = contextvars.ContextVar(
+    "tornado_openapi3.limits.budget", default=None
+)
+
+
+def current_budget() -> typing.Optional[Budget]:
+    """Returns the budget of the request being validated, if it has one."""
+    return _budget.get()
+
+
+@contextlib.contextmanager
+def budget(
+    limits: typing.Union[ValidationLimits, Budget, None],
+) -> typing.Iterator[None]:
+    """Enforces limits on the validation performed within this context.
+
+    A :class:`Budget` may be given instead of limits to count the validation
+    performed within several contexts, such as while the fields of a streamed
+    body arrive, against the same limits. Time spent outside of them does not
+    count towards ``max_seconds``.
+
+    """
+    if limits is None:
+        yield
+        return
+    current = limits if isinstance(limits, Budget) else Budget(limits)
+    current.resume()
+    token = _budget.set(current)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+        current.pause()
+
+
+def _counted(
+    keyword: typing.Callable[..., typing.Any],
+) -> typing.Callable[..., typing.Any]:
+    def counted(
+        validator: typing.Any,
+        value: typing.Any,
+        instance: typing.Any,
+        schema: typing.Any,
+    ) -> typing.Any:
+        current = _budget.get()
+        if current is not None:
+            current.visit()
+        return keyword(validator, value, instance, schema)
+
+    return counted
+
+
+def validator_class(cls: type) -> type:
+    """Extends a JSON Schema validator class to count keyword evaluations.
+
+    Evaluations are only counted while a :func:`budget` is in effect. Every
+    keyword evaluated looks one up, so the extended class should only be used
+    where limits are enforced.
+
+    """
+    try:
+        return _validator_classes[cls]
+    except KeyError:
+        extended = jsonschema.validators.extend(
+            cls,
+            {
+                name: _counted(keyword)
+                for name, keyword in getattr(cls, "VALIDATORS").items()
+            },
+        )
+        _validator_classes[cls] = extended
+        return extended
+
+
+__all__ = [
+    "Budget",
+    "LimitExceeded",
+    "ValidationLimits",
+    "budget",
+    "current_budget",
+    "validator_class",
+]
@@ -0,0 +1,176 @@
+import array
+import bisect
+import threading
+import typing
+
+import tornado.web
+
+#: Histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+#: The status codes :class:`~tornado_openapi3.handler.OpenAPIRequestHandler`
+#: may pass to ``on_openapi_error``.
+ERROR_STATUSES = (400, 401, 404, 405, 413, 415, 500, 503)
+
+_STATUS_INDEX = {status: index for index, status in enumerate(ERROR_STATUSES)}
+
+
+class Histogram:
+    """Counts observations in fixed buckets.
+
+    Counts are kept in a preallocated array, so recording an observation only
+    finds its bucket and increments two counters.
+
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        #: Observations per bucket, the last counting those above every bound.
+        self.counts = array.array("Q", [0] * (len(self.buckets) + 1))
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records an observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        """The number of observations recorded."""
+        return sum(self.counts)
+
+
+class OperationMetrics:
+    """Metrics recorded for a single operation."""
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        #: Time spent validating requests.
+        self.validation = Histogram(buckets)
+
+        #: Time spent handling requests, from validation to finishing the
+        #: response.
+        self.request = Histogram(buckets)
+
+        #: Requests rejected by validation, counted by the status in
+        #: :data:`ERROR_STATUSES` at the same index.
+        self.errors = array.array("Q", [0] * len(ERROR_STATUSES))
+
+    def count_error(self, status_code: int) -> None:
+        """Records a request rejected with an error status."""
+        self.errors[_STATUS_INDEX[status_code]] += 1
+
+
+class MetricsStore:
+    """In-process metrics for each operation in a specification.
+
+    When a store is given to
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler` (through its
+    ``openapi_metrics`` application setting), it records histograms of the time
+    spent validating and handling requests, and counts the errors returned for
+    invalid requests. Metrics are keyed by the ``operationId`` of the operation
+    being requested, or its method and path template if it has none. Requests
+    not matching any operation are recorded with an empty operation.
+
+    Metrics are recorded without locking and should be recorded from a single
+    thread, such as the one running Tornado's IOLoop. They may be exposed to
+    Prometheus with :class:`MetricsHandler`.
+
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.operations: typing.Dict[str, OperationMetrics] = {}
+        self._lock = threading.Lock()
+
+    def operation(self, operation_id: typing.Optional[str]) -> OperationMetrics:
+        """Returns the metrics of an operation, creating them if necessary."""
+        key = operation_id or ""
+        try:
+            return self.operations[key]
+        except KeyError:
+            with self._lock:
+                return self.operations.setdefault(key, OperationMetrics(self.buckets))
+
+    def render(self) -> str:
+        """Formats the metrics in the Prometheus text exposition format."""
+        operations = sorted(self.operations.items())
+        lines: typing.List[str] = []
+        for name, attribute, help in (
+            ("openapi_validation_seconds", "validation", "validating"),
+            ("openapi_request_seconds", "request", "handling"),
+        ):
+            lines.append("# HELP {} Time spent {} requests.".format(name, help))
+            lines.append("# TYPE {} histogram".format(name))
+            for operation, metrics in operations:
+                lines.extend(_histogram(name, operation, getattr(metrics, attribute)))
+        lines.append("# HELP openapi_errors_total Requests rejected by validation.")
+        lines.append("# TYPE openapi_errors_total counter")
+        for operation, metrics in operations:
+            for status, count in zip(ERROR_STATUSES, metrics.errors):
+                if count:
+                    lines.append(
+                        'openapi_errors_total{{operation="{}",status="{}"}} {}'.format(
+                            _escape(operation), status, count
+                        )
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram(name: str, operation: str, histogram: Histogram) -> typing.Iterator[str]:
+    label = 'operation="{}"'.format(_escape(operation))
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        yield '{}_bucket{{{},le="{}"}} {}'.format(
+            name, label, "+Inf" if bound == float("inf") else repr(bound), cumulative
+        )
+    yield "{}_sum{{{}}} {!r}".format(name, label, histogram.sum)
+    yield "{}_count{{{}}} {}".format(name, label, cumulative)
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    """Serves the metrics in a :class:`MetricsStore` to Prometheus.
+
+    .. code-block:: python
+
+        metrics = MetricsStore()
+        app = tornado.web.Application(
+            [(r"/metrics", MetricsHandler, {"store": metrics}), ...],
+            openapi_metrics=metrics,
+        )
+
+    """
+
+    def initialize(self, store: MetricsStore) -> None:
+        self.store = store
+
+    def get(self) -> None:
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(self.store.render())
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "ERROR_STATUSES",
+    "Histogram",
+    "MetricsHandler",
+    "MetricsStore",
+    "OperationMetrics",
+]
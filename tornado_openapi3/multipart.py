@@ -0,0 +1,608 @@
+import dataclasses
+import email.message
+import email.parser
+import email.policy
+import functools
+import io
+import json
+import tempfile
+import typing
+
+from jsonschema_path import SchemaPath
+import openapi_core
+from openapi_core.exceptions import OpenAPIError
+from openapi_core.unmarshalling.request.datatypes import RequestUnmarshalResult
+from openapi_core.unmarshalling.request.unmarshallers import (
+    APICallRequestUnmarshaller,
+)
+from openapi_core.validation.decorators import ValidationErrorWrapper
+from openapi_core.validation.request.exceptions import (
+    InvalidRequestBody,
+    RequestBodyValidationError,
+)
+import tornado.web
+
+from tornado_openapi3 import formats, validators
+from tornado_openapi3.decompression import Decompressor
+from tornado_openapi3.handler import OpenAPIRequestHandler
+from tornado_openapi3.limits import Budget, LimitExceeded, budget, current_budget
+from tornado_openapi3.operations import FULL, unmarshal_body
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+from tornado_openapi3.util import is_json, parse_mimetype
+
+_PREAMBLE, _DELIMITER, _HEADERS, _BODY, _END = range(5)
+
+_header_parser = email.parser.BytesHeaderParser(policy=email.policy.HTTP)
+
+_body_errors = ValidationErrorWrapper(RequestBodyValidationError, InvalidRequestBody)
+
+
+class MultipartError(OpenAPIError):
+    """A ``multipart/form-data`` request body is malformed or incomplete."""
+
+
+class Part:
+    """A single part of a ``multipart/form-data`` request body.
+
+    Parts with a filename are files, and have their content spooled to a
+    temporary file once it grows beyond ``spool_threshold`` bytes. Other parts
+    are form fields, kept in memory and limited to ``max_size`` bytes.
+
+    """
+
+    def __init__(
+        self,
+        headers: email.message.Message,
+        spool_threshold: int,
+        max_size: typing.Optional[int] = None,
+    ) -> None:
+        #: The headers of the part.
+        self.headers = headers
+
+        #: The name of the form field the part holds.
+        self.name: typing.Optional[str] = headers.get_param(
+            "name", header="Content-Disposition"
+        )  # type: ignore[assignment]
+
+        #: The name of the uploaded file, if the part is a file.
+        self.filename = headers.get_filename()
+
+        #: The media type of the part, ``text/plain`` if it was not given.
+        self.content_type = headers.get_content_type()
+
+        #: The size of the part's content, in bytes.
+        self.size = 0
+
+        #: The content of the part, as a binary file object.
+        self.file: typing.IO[bytes] = (
+            io.BytesIO()
+            if self.filename is None
+            else tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+        )
+
+        self.max_size = None if self.filename is not None else max_size
+
+    def write(self, data: typing.Union[bytes, memoryview]) -> None:
+        """Appends data to the part's content."""
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise LimitExceeded("max_field_size", self.max_size, 413)
+        self.file.write(data)
+
+    def read(self) -> bytes:
+        """Returns the entire content of the part."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def text(self) -> str:
+        """Returns the content of the part decoded using its charset."""
+        return self.read().decode(self.headers.get_content_charset() or "utf-8")
+
+    def close(self) -> None:
+        """Discards the content of the part."""
+        self.file.close()
+
+    def __repr__(self) -> str:
+        return "<Part {!r} filename={!r} size={}>".format(
+            self.name, self.filename, self.size
+        )
+
+
+class MultipartParser:
+    """An incremental parser of ``multipart/form-data`` request bodies.
+
+    Data is fed to the parser as it arrives, and ``on_part`` is called with
+    each :class:`Part` once it is complete. Part content is copied straight
+    from the received data into the part.
+
+    """
+
+    def __init__(
+        self,
+        boundary: bytes,
+        on_part: typing.Callable[[Part], None],
+        spool_threshold: int = 1024 * 1024,
+        max_field_size: typing.Optional[int] = 65536,
+        max_header_size: int = 16384,
+    ) -> None:
+        self.on_part = on_part
+        self.spool_threshold = spool_threshold
+        self.max_field_size = max_field_size
+        self.max_header_size = max_header_size
+        self._delimiter = b"\r\n--" + boundary
+        # The first delimiter may appear at the very start of the body.
+        self._buffer = bytearray(b"\r\n")
+        self._state = _PREAMBLE
+        self._part: typing.Optional[Part] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the closing delimiter of the body has been seen."""
+        return self._state == _END
+
+    def feed(self, data: bytes) -> None:
+        """Parses the next chunk of the request body."""
+        if self._state == _END:
+            return
+        self._buffer += data
+        while self._step():
+            pass
+
+    def _step(self) -> bool:
+        buffer = self._buffer
+        if self._state == _PREAMBLE:
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                del buffer[: max(0, len(buffer) - len(self._delimiter) + 1)]
+                return False
+            del buffer[: index + len(self._delimiter)]
+            self._state = _DELIMITER
+        elif self._state == _DELIMITER:
+            if buffer[:2] == b"--":
+                self._state = _END
+                buffer.clear()
+                return False
+            index = buffer.find(b"\r\n")
+            if index < 0:
+                if len(buffer) > self.max_header_size:
+                    raise MultipartError("Malformed multipart delimiter")
+                return False
+            if buffer[:index].strip(b" \t"):
+                raise MultipartError("Malformed multipart delimiter")
+            del buffer[: index + 2]
+            self._state = _HEADERS
+        elif self._state == _HEADERS:
+            if buffer[:2] == b"\r\n":
+                end = 0
+            else:
+                end = buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise MultipartError("Multipart headers are too large")
+                    return False
+                end += 2
+            headers = _header_parser.parsebytes(bytes(buffer[:end]))
+            del buffer[: end + 2]
+            self._part = Part(headers, self.spool_threshold, self.max_field_size)
+            if self._part.name is None:
+                raise MultipartError("Multipart part has no name")
+            self._state = _BODY
+        else:
+            assert self._part is not None
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                # Keep enough data to recognize a delimiter split across chunks.
+                self._write(len(buffer) - len(self._delimiter) + 1)
+                return False
+            self._write(index)
+            del buffer[: len(self._delimiter)]
+            part, self._part = self._part, None
+            part.file.seek(0)
+            self.on_part(part)
+            self._state = _DELIMITER
+        return True
+
+    def _write(self, size: int) -> None:
+        if size > 0:
+            assert self._part is not None
+            with memoryview(self._buffer)[:size] as data:
+                self._part.write(data)
+            del self._buffer[:size]
+
+    def close(self) -> None:
+        """Discards any incomplete part."""
+        if self._part is not None:
+            self._part.close()
+
+
+class MultipartForm:
+    """Validates the parts of a ``multipart/form-data`` body as they arrive.
+
+    Form fields are decoded (as JSON if their media type, or the ``contentType``
+    of their ``encoding`` in the specification, is JSON, and as text
+    otherwise), and validated and unmarshalled against the schema of their
+    property as soon as they are received. Files are not validated, and are
+    kept as :class:`Part` objects. Fields count against the
+    :func:`~tornado_openapi3.limits.budget` in effect when they are added, if
+    any. Once every part has been received, :meth:`finish` checks that all
+    required properties are present.
+
+    If ``media_type`` is ``None``, or ``validate`` is false, fields are decoded
+    but not validated.
+
+    """
+
+    def __init__(
+        self,
+        unmarshaller: APICallRequestUnmarshaller,
+        media_type: typing.Optional[SchemaPath],
+        validate: bool = True,
+    ) -> None:
+        self.unmarshaller = unmarshaller
+        self.schema = (
+            media_type / "schema"
+            if validate and media_type is not None and "schema" in media_type
+            else None
+        )
+        self.encoding = (
+            media_type.getkey("encoding") or {} if media_type is not None else {}
+        )
+        self.parts: typing.List[Part] = []
+        self.values: typing.Dict[str, typing.Any] = {}
+
+    @_body_errors
+    def add(self, part: Part) -> None:
+        """Decodes and validates a part."""
+        self.parts.append(part)
+        name = typing.cast(str, part.name)
+        schema = self._property(name)
+        is_array = schema is not None and schema.getkey("type") == "array"
+        if name in self.values and not is_array:
+            raise MultipartError("Multipart part {!r} is repeated".format(name))
+        if part.filename is not None:
+            value: typing.Any = part
+        else:
+            value = self._decode(name, part)
+            checker = current_budget()
+            if checker is not None:
+                checker.check_value(value)
+            if schema is not None:
+                item_schema = schema / "items" if is_array else schema
+                if isinstance(value, str):
+                    value = self.unmarshaller._cast(item_schema, value)
+                value = self.unmarshaller._unmarshal_schema(item_schema, value)
+        if is_array:
+            self.values.setdefault(name, []).append(value)
+        else:
+            self.values[name] = value
+
+    @_body_errors
+    def finish(self) -> typing.Dict[str, typing.Any]:
+        """Checks that the form is complete, returning its values."""
+        if self.schema is not None:
+            missing = [
+                name
+                for name in self.schema.getkey("required") or []
+                if name not in self.values
+            ]
+            if missing:
+                raise MultipartError(
+                    "Missing required multipart parts: {}".format(", ".join(missing))
+                )
+        return self.values
+
+    def close(self) -> None:
+        """Discards the content of every part."""
+        for part in self.parts:
+            part.close()
+
+    def _property(self, name: str) -> typing.Optional[SchemaPath]:
+        if self.schema is None:
+            return None
+        if "properties" in self.schema and name in self.schema / "properties":
+            return self.schema / "properties" / name
+        additional = self.schema.getkey("additionalProperties", True)
+        if additional is False:
+            raise MultipartError("Unexpected multipart part {!r}".format(name))
+        if isinstance(additional, dict):
+            return self.schema / "additionalProperties"
+        return None
+
+    def _decode(self, name: str, part: Part) -> typing.Any:
+        content_type = part.headers.get("Content-Type") or self.encoding.get(
+            name, {}
+        ).get("contentType", "text/plain")
+        if is_json(content_type):
+            try:
+                return json.loads(part.read())
+            except ValueError:
+                raise MultipartError(
+                    "Multipart part {!r} is not valid JSON".format(name)
+                )
+        return part.text()
+
+
+def form(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    validate: bool = True,
+    max_errors: typing.Optional[int] = None,
+    counted: bool = False,
+) -> MultipartForm:
+    """Creates a form validating a request's body against its operation.
+
+    If ``counted`` is true, fields are validated as by the unmarshaller of
+    :func:`~tornado_openapi3.validators.request_unmarshaller`, counting schema
+    keyword evaluations against the :func:`~tornado_openapi3.limits.budget` in
+    effect when they are added.
+
+    :raises openapi_core.validation.request.exceptions.RequestBodyValidationError:
+        If the operation does not accept ``multipart/form-data`` bodies.
+
+    """
+    unmarshaller = validators.request_unmarshaller(spec, max_errors, counted)
+    return _form(unmarshaller, request, validate)
+
+
+@_body_errors
+def _form(
+    unmarshaller: APICallRequestUnmarshaller,
+    request: TornadoOpenAPIRequest,
+    validate: bool,
+) -> MultipartForm:
+    _, operation, _, _, _ = unmarshaller._find_path(request)
+    if not validate or "requestBody" not in operation:
+        return MultipartForm(unmarshaller, None)
+    _, _, media_type = unmarshaller._find_media_type(
+        operation / "requestBody" / "content", request.content_type
+    )
+    return MultipartForm(unmarshaller, media_type)
+
+
+@tornado.web.stream_request_body
+class StreamingMultipartHandler(OpenAPIRequestHandler):
+    """A request handler validating ``multipart/form-data`` bodies as they arrive.
+
+    Request parameters are validated before the body is received, as usual.
+    ``multipart/form-data`` bodies are then parsed as they are streamed in, each
+    form field being validated against the schema of its property as soon as it
+    arrives (see :class:`MultipartForm`), and files being spooled to temporary
+    files once they grow beyond :attr:`spool_threshold` bytes. Other bodies are
+    buffered and validated once they have been received.
+
+    Once the entire body has been received and validated, the ``body`` of
+    :attr:`validated` maps the names of form fields to their unmarshalled
+    values, and of files to :class:`Part` objects, before the request method
+    (*get/post/etc*) is called. Parts are closed when the request finishes.
+    Values of :class:`~tornado_openapi3.formats.BatchFormatter` formats found in
+    the body are checked together once it has been received, and the
+    :attr:`~tornado_openapi3.handler.OpenAPIRequestHandler.validation_limits`
+    of the handler apply to the fields of a body together, as to any other body.
+
+    Bodies compressed with a ``Content-Encoding`` of ``gzip`` or ``deflate``
+    are decompressed as they arrive (see
+    :class:`~tornado_openapi3.decompression.Decompressor`), before being parsed
+    or buffered, and are rejected with ``413 Request Entity Too Large`` as soon
+    as they exceed the ``x-max-body-size`` of their operation (see
+    :class:`~tornado_openapi3.operations.OperationPolicy`), or
+    :attr:`max_decompressed_size` for operations without one. Bodies with
+    other content codings are rejected with ``415 Unsupported Media Type``.
+    Do not enable Tornado's ``decompress_request`` setting, which buffers
+    request bodies after decompressing them without any limit.
+
+    Tornado's ``max_body_size`` still limits the size of streamed bodies (before
+    they are decompressed); raise it for the request in :meth:`prepare` to
+    accept larger uploads.
+
+    """
+
+    #: File parts larger than this many bytes are written to disk.
+    spool_threshold = 1024 * 1024
+
+    #: The largest form field allowed, in bytes.
+    max_field_size: typing.Optional[int] = 65536
+
+    #: The largest request body allowed once it is decompressed, in bytes, for
+    #: operations without an ``x-max-body-size``.
+    max_decompressed_size: typing.Optional[int] = 100 * 1024 * 1024
+
+    async def prepare(self) -> None:
+        self._chunks: typing.List[bytes] = []
+        self._form: typing.Optional[MultipartForm] = None
+        self._parser: typing.Optional[MultipartParser] = None
+        self._body_error: typing.Optional[OpenAPIError] = None
+        self._decompressor: typing.Optional[Decompressor] = None
+        self._body_validated = False
+        self._format_batch = formats.FormatBatch()
+        limits = self.validation_limits
+        self._budget = None if limits is None else Budget(limits)
+        await super().prepare()
+        if self._finished:
+            return
+
+        try:
+            self._decompressor = self._create_decompressor()
+        except RequestBodyValidationError as e:
+            self._raise_for_errors(_result(e))
+            return
+
+        content_type = self.request.headers.get("Content-Type", "")
+        if parse_mimetype(content_type) == "multipart/form-data":
+            try:
+                boundary = _boundary(content_type)
+                self._form = form(
+                    self._openapi_spec,
+                    self._openapi_request,
+                    self.operation_policy.validation == FULL,
+                    self.max_validation_errors,
+                    self._budget is not None,
+                )
+            except RequestBodyValidationError as e:
+                self._raise_for_errors(_result(e))
+                return
+            self._parser = MultipartParser(
+                boundary,
+                self._form.add,
+                spool_threshold=self.spool_threshold,
+                max_field_size=self.max_field_size,
+            )
+
+    def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Tornado calls the request method as soon as the body has been
+        # received, so the methods of subclasses validate it first.
+        for name in cls.SUPPORTED_METHODS:
+            method = cls.__dict__.get(name.lower())
+            if method is not None:
+                setattr(cls, name.lower(), _validating(method))
+
+    @_body_errors
+    def _create_decompressor(self) -> Decompressor:
+        max_size = self.operation_policy.max_body_size
+        decompressor = Decompressor(
+            self.request.headers.get("Content-Encoding", "identity"),
+            self.max_decompressed_size if max_size is None else max_size,
+        )
+        if decompressor.encoding != "identity":
+            # As Tornado does when it decompresses bodies itself.
+            self.request.headers.add(
+                "X-Consumed-Content-Encoding", self.request.headers["Content-Encoding"]
+            )
+            del self.request.headers["Content-Encoding"]
+        return decompressor
+
+    def data_received(self, chunk: bytes) -> None:
+        if self._body_error is not None or self._decompressor is None:
+            return
+        try:
+            for data in self._decompressor.decompress(chunk):
+                self._feed(data)
+        except OpenAPIError as e:
+            self._fail(e)
+
+    def _feed(self, data: bytes) -> None:
+        if self._parser is None:
+            self._chunks.append(data)
+        else:
+            with formats.collect(self._format_batch), budget(self._budget):
+                self._parser.feed(data)
+
+    def _fail(self, error: OpenAPIError) -> None:
+        self._body_error = error
+        self._chunks.clear()
+        if self._parser is not None:
+            self._parser.close()
+
+    @_body_errors
+    def _check_body(self) -> None:
+        if self._body_error is None:
+            assert self._decompressor is not None
+            try:
+                self._feed(self._decompressor.finish())
+            except OpenAPIError as e:
+                self._fail(e)
+        if self._body_error is not None:
+            raise self._body_error
+        if self._parser is not None and not self._parser.finished:
+            raise MultipartError("Incomplete multipart body")
+
+    async def _call_validated(
+        self,
+        method: typing.Callable[..., typing.Any],
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> None:
+        if await self._finish_body():
+            result = method(self, *args, **kwargs)
+            if result is not None:
+                await result
+
+    async def _finish_body(self) -> bool:
+        try:
+            self._check_body()
+        except RequestBodyValidationError as e:
+            self._raise_for_errors(_result(e))
+            return False
+        with formats.collect(self._format_batch):
+            if self._form is None:
+                self.request.body = b"".join(self._chunks)
+                result = unmarshal_body(
+                    self._openapi_spec,
+                    self._openapi_request,
+                    self.validation_cache,
+                    self.max_validation_errors,
+                    self.validation_limits,
+                )
+                body = result.body
+            else:
+                try:
+                    body = self._form.finish()
+                except RequestBodyValidationError as e:
+                    result = _result(e)
+                else:
+                    result = _result()
+        if self._format_batch and not result.errors:
+            result.errors = await self._format_batch.check()
+        self._raise_for_errors(result)
+        if self._finished:
+            return False
+        self.validated = dataclasses.replace(self.validated, body=body)
+        self._body_validated = True
+        return True
+
+    def on_finish(self) -> None:
+        super().on_finish()
+        self._close_parts()
+
+    def on_connection_close(self) -> None:
+        super().on_connection_close()
+        # Tornado does not call on_finish for requests whose client
+        # disconnected before they were finished.
+        self._close_parts()
+
+    def _close_parts(self) -> None:
+        parser: typing.Optional[MultipartParser] = getattr(self, "_parser", None)
+        if parser is not None:
+            parser.close()
+        form: typing.Optional[MultipartForm] = getattr(self, "_form", None)
+        if form is not None:
+            form.close()
+
+
+def _validating(
+    method: typing.Callable[..., typing.Any],
+) -> typing.Callable[..., typing.Any]:
+    @functools.wraps(method)
+    def validating(
+        self: StreamingMultipartHandler, *args: typing.Any, **kwargs: typing.Any
+    ) -> typing.Any:
+        # Methods called by an overriding method are called as they are.
+        if self._body_validated:
+            return method(self, *args, **kwargs)
+        return self._call_validated(method, *args, **kwargs)
+
+    return validating
+
+
+@_body_errors
+def _boundary(content_type: str) -> bytes:
+    message = email.message.Message()
+    message["Content-Type"] = content_type
+    boundary = message.get_param("boundary")
+    if not isinstance(boundary, str) or not boundary:
+        raise MultipartError("Multipart body has no boundary")
+    return boundary.encode()
+
+
+def _result(*errors: OpenAPIError) -> RequestUnmarshalResult:
+    return RequestUnmarshalResult(errors=list(errors))
+
+
+__all__ = [
+    "MultipartError",
+    "MultipartForm",
+    "MultipartParser",
+    "Part",
+    "StreamingMultipartHandler",
+    "form",
+]
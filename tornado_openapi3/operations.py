@@ -0,0 +1,411 @@
+import dataclasses
+import random
+import typing
+import weakref
+
+from jsonschema_path import SchemaPath
+import openapi_core
+from openapi_core.templating.paths.exceptions import PathError
+from openapi_core.unmarshalling.request.datatypes import RequestUnmarshalResult
+from openapi_core.unmarshalling.request.unmarshallers import (
+    APICallRequestUnmarshaller,
+)
+from openapi_core.exceptions import OpenAPIError
+from openapi_core.validation.decorators import ValidationErrorWrapper
+from openapi_core.validation.request.exceptions import (
+    MissingRequestBody,
+    ParametersError,
+    RequestBodyValidationError,
+    SecurityValidationError,
+)
+from openapi_core.validation.response.exceptions import (
+    DataValidationError,
+    InvalidData,
+)
+
+from tornado_openapi3 import validators
+from tornado_openapi3.cache import ValidationCache
+from tornado_openapi3.limits import ValidationLimits, budget
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+#: Skip validation entirely, only matching the request to an operation.
+NONE = "none"
+
+#: Validate parameters and security requirements, but not the request body.
+PARAMS = "params"
+
+#: Validate the entire request.
+FULL = "full"
+
+VALIDATION_LEVELS = (NONE, PARAMS, FULL)
+
+#: Priorities of operations, from lowest to highest. Requests to operations
+#: with a lower priority are turned away first when a server is overloaded (see
+#: :class:`~tornado_openapi3.admission.AdmissionController`).
+PRIORITIES = ("low", "normal", "high", "critical")
+
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+_policies: typing.MutableMapping[
+    openapi_core.OpenAPI, typing.Dict[SchemaPath, "OperationPolicy"]
+] = weakref.WeakKeyDictionary()
+
+
+@dataclasses.dataclass(frozen=True)
+class OperationPolicy:
+    """How thoroughly requests to, and responses from, an operation are checked.
+
+    Policies are read from the ``x-validation``,
+    ``x-validate-response-sample-rate``, ``x-priority`` and ``x-max-body-size``
+    specification extensions, which may be set on an operation, on a path item
+    (applying to all of its operations) or at the root of the specification
+    (applying to every operation).
+
+    .. code-block:: yaml
+
+        paths:
+          /telemetry:
+            post:
+              x-validation: none
+              x-priority: low
+          /uploads:
+            x-max-body-size: 10485760
+          /admin/users:
+            x-validation: full
+            x-validate-response-sample-rate: 0.1
+
+    """
+
+    #: One of ``none``, ``params`` or ``full``.
+    validation: str = FULL
+
+    #: The fraction of responses that should be validated, from 0 to 1.
+    response_sample_rate: float = 1.0
+
+    #: The ``operationId`` of the operation the policy applies to, or its method
+    #: and path template if it has none.
+    operation_id: typing.Optional[str] = dataclasses.field(default=None, compare=False)
+
+    #: One of ``low``, ``normal``, ``high`` or ``critical``.
+    priority: str = "normal"
+
+    #: The largest request body allowed, in bytes, once it is decompressed (see
+    #: :class:`~tornado_openapi3.multipart.StreamingMultipartHandler`), or
+    #: ``None`` for no limit of the operation's own.
+    max_body_size: typing.Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.validation not in VALIDATION_LEVELS:
+            raise ValueError(
+                "x-validation must be one of {}, not {!r}".format(
+                    ", ".join(VALIDATION_LEVELS), self.validation
+                )
+            )
+        if self.priority not in PRIORITIES:
+            raise ValueError(
+                "x-priority must be one of {}, not {!r}".format(
+                    ", ".join(PRIORITIES), self.priority
+                )
+            )
+        if not 0 <= self.response_sample_rate <= 1:
+            raise ValueError(
+                "x-validate-response-sample-rate must be between 0 and 1, "
+                "not {!r}".format(self.response_sample_rate)
+            )
+        if self.max_body_size is not None and self.max_body_size < 0:
+            raise ValueError(
+                "x-max-body-size must not be negative, not {!r}".format(
+                    self.max_body_size
+                )
+            )
+
+    @classmethod
+    def from_spec(
+        cls, spec: openapi_core.OpenAPI, path: SchemaPath, operation: SchemaPath
+    ) -> "OperationPolicy":
+        """Reads the policy for an operation from its specification."""
+
+        def extension(name: str, default: typing.Any) -> typing.Any:
+            for item in (operation, path, spec.spec):
+                value = item.getkey(name)
+                if value is not None:
+                    return value
+            return default
+
+        return cls(
+            validation=extension("x-validation", FULL),
+            response_sample_rate=float(
+                extension("x-validate-response-sample-rate", 1.0)
+            ),
+            operation_id=operation.getkey("operationId")
+            or "{} {}".format(str(operation.parts[-1]).upper(), path.parts[-1]),
+            priority=extension("x-priority", "normal"),
+            max_body_size=extension("x-max-body-size", None),
+        )
+
+    def sample_response(self) -> bool:
+        """Decides whether a single response should be validated."""
+        return random.random() < self.response_sample_rate
+
+
+#: The policy applied to requests that do not match an operation.
+DEFAULT_POLICY = OperationPolicy()
+
+
+def read_policies(
+    spec: openapi_core.OpenAPI,
+) -> typing.Mapping[SchemaPath, OperationPolicy]:
+    """Reads the policy of every operation in a specification.
+
+    Policies are read once, when a specification is compiled by
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler`, a
+    :class:`~tornado_openapi3.registry.SpecRegistry` or
+    :func:`~tornado_openapi3.client.compile_spec`, and kept for as long as the
+    spec itself is alive.
+
+    :raises ValueError: If the extensions of an operation are invalid.
+
+    """
+    try:
+        return _policies[spec]
+    except KeyError:
+        pass
+    policies: typing.Dict[SchemaPath, OperationPolicy] = {}
+    paths = spec.spec / "paths"
+    for template in paths.keys():
+        path = paths / template
+        for method in path.keys():
+            if method in _METHODS:
+                operation = path / method
+                policies[operation] = OperationPolicy.from_spec(spec, path, operation)
+    _policies[spec] = policies
+    return policies
+
+
+def policy(
+    spec: openapi_core.OpenAPI, path: SchemaPath, operation: SchemaPath
+) -> OperationPolicy:
+    """Returns the policy for an operation (see :func:`read_policies`)."""
+    return read_policies(spec)[operation]
+
+
+def find_policy(
+    spec: openapi_core.OpenAPI, request: TornadoOpenAPIRequest
+) -> OperationPolicy:
+    """Returns the policy for the operation a request is made to.
+
+    Requests that do not match an operation have the :data:`DEFAULT_POLICY`.
+
+    """
+    try:
+        path, operation, _, _, _ = validators.request_unmarshaller(spec)._find_path(
+            request
+        )
+    except PathError:
+        return DEFAULT_POLICY
+    return policy(spec, path, operation)
+
+
+def unmarshal_request(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    cache: typing.Optional[ValidationCache] = None,
+    max_errors: typing.Optional[int] = None,
+    limits: typing.Optional[ValidationLimits] = None,
+    validate_body: bool = True,
+) -> typing.Tuple[RequestUnmarshalResult, OperationPolicy]:
+    """Validates and unmarshals a request according to its operation's policy.
+
+    Returns the result along with the policy that was applied. Requests to
+    operations with a validation level of ``none`` only have their path and
+    method matched, and have neither parameters nor a body in their result.
+    Requests at the ``params`` level have their parameters and security
+    requirements validated, but no body in their result. Requests whose body has
+    not been received yet may be validated at the ``params`` level by setting
+    ``validate_body`` to false, and their body validated later with
+    :func:`unmarshal_body`.
+
+    If a :class:`~tornado_openapi3.cache.ValidationCache` is given, request
+    bodies are validated through it. If ``max_errors`` is given, schema
+    validation of each value stops after finding that many errors. If
+    :class:`~tornado_openapi3.limits.ValidationLimits` are given, requests
+    exceeding them fail with a :class:`~tornado_openapi3.limits.LimitExceeded`
+    error.
+
+    """
+    with budget(limits):
+        return _unmarshal_request(
+            spec, request, cache, max_errors, limits, validate_body
+        )
+
+
+def unmarshal_body(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    cache: typing.Optional[ValidationCache] = None,
+    max_errors: typing.Optional[int] = None,
+    limits: typing.Optional[ValidationLimits] = None,
+) -> RequestUnmarshalResult:
+    """Validates and unmarshals only the body of a request.
+
+    Bodies are only validated for operations with a validation level of
+    ``full``. See :func:`unmarshal_request`.
+
+    """
+    with budget(limits):
+        unmarshaller = validators.request_unmarshaller(
+            spec, max_errors, limits is not None
+        )
+        try:
+            path, operation, _, _, _ = unmarshaller._find_path(request)
+        except PathError as e:
+            return RequestUnmarshalResult(errors=[e])
+        if policy(spec, path, operation).validation != FULL:
+            return RequestUnmarshalResult(errors=[])
+        errors: typing.List[OpenAPIError] = []
+        body = _unmarshal_body(
+            spec, request, cache, unmarshaller, operation, errors, max_errors, limits
+        )
+        return RequestUnmarshalResult(errors=errors, body=body)
+
+
+def _unmarshal_request(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    cache: typing.Optional[ValidationCache],
+    max_errors: typing.Optional[int],
+    limits: typing.Optional[ValidationLimits],
+    validate_body: bool,
+) -> typing.Tuple[RequestUnmarshalResult, OperationPolicy]:
+    unmarshaller = validators.request_unmarshaller(spec, max_errors, limits is not None)
+    try:
+        path, operation, _, path_result, _ = unmarshaller._find_path(request)
+    except PathError as e:
+        return RequestUnmarshalResult(errors=[e]), DEFAULT_POLICY
+    request.parameters.path = request.parameters.path or path_result.variables
+
+    operation_policy = policy(spec, path, operation)
+    full = operation_policy.validation == FULL and validate_body
+    if full and cache is None:
+        return unmarshaller._unmarshal(request, operation, path), operation_policy
+    if operation_policy.validation == NONE:
+        return RequestUnmarshalResult(errors=[]), operation_policy
+
+    try:
+        security = unmarshaller._get_security(request.parameters, operation)
+    except SecurityValidationError as e:
+        return RequestUnmarshalResult(errors=[e]), operation_policy
+    errors: typing.List[OpenAPIError] = []
+    try:
+        parameters = unmarshaller._get_parameters(request.parameters, operation, path)
+    except ParametersError as e:
+        parameters = e.parameters
+        errors.extend(e.errors)
+
+    body = None
+    if full:
+        body = _unmarshal_body(
+            spec, request, cache, unmarshaller, operation, errors, max_errors, limits
+        )
+    return (
+        RequestUnmarshalResult(
+            errors=errors, body=body, parameters=parameters, security=security
+        ),
+        operation_policy,
+    )
+
+
+def _unmarshal_body(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    cache: typing.Optional[ValidationCache],
+    unmarshaller: APICallRequestUnmarshaller,
+    operation: SchemaPath,
+    errors: typing.List[OpenAPIError],
+    max_errors: typing.Optional[int],
+    limits: typing.Optional[ValidationLimits],
+) -> typing.Any:
+    def unmarshal() -> typing.Any:
+        return unmarshaller._get_body(request.body, request.content_type, operation)
+
+    try:
+        if cache is None:
+            return unmarshal()
+        return cache.unmarshal_body(
+            spec,
+            operation,
+            request.body,
+            request.content_type,
+            unmarshal,
+            max_errors,
+            limits,
+        )
+    except MissingRequestBody:
+        return None
+    except RequestBodyValidationError as e:
+        errors.append(e)
+        return None
+
+
+def validate_response(
+    spec: openapi_core.OpenAPI,
+    request: TornadoOpenAPIRequest,
+    status_code: int,
+    data: typing.Any,
+    content_type: typing.Optional[str] = None,
+    validate: bool = True,
+) -> typing.Optional[str]:
+    """Validates response data before it is serialized.
+
+    Finds the response documented for the request's operation and status code,
+    and validates ``data`` (as Python objects, not their serialized form)
+    against the schema of its ``content_type``, or of its first media type if no
+    content type is given. Returns the media type of the response, or ``None``
+    if the response has no content.
+
+    If ``validate`` is false, the media type is found but ``data`` is not
+    validated.
+
+    :raises openapi_core.validation.response.exceptions.DataValidationError:
+        If no media type matches, or ``data`` does not match its schema.
+
+    """
+    unmarshaller = validators.response_unmarshaller(spec)
+    _, operation, _, _, _ = unmarshaller._find_path(request)
+    response = unmarshaller._find_operation_response(status_code, operation)
+    if "content" not in response:
+        return None
+    return _validate_data(
+        unmarshaller, response / "content", data, content_type, validate
+    )
+
+
+@ValidationErrorWrapper(DataValidationError, InvalidData)
+def _validate_data(
+    unmarshaller: typing.Any,
+    content: SchemaPath,
+    data: typing.Any,
+    content_type: typing.Optional[str],
+    validate: bool,
+) -> str:
+    mime_type, _, media_type = unmarshaller._find_media_type(content, content_type)
+    if validate and "schema" in media_type:
+        unmarshaller._validate_schema(media_type / "schema", data)
+    return mime_type
+
+
+__all__ = [
+    "DEFAULT_POLICY",
+    "FULL",
+    "NONE",
+    "OperationPolicy",
+    "PARAMS",
+    "PRIORITIES",
+    "VALIDATION_LEVELS",
+    "find_policy",
+    "policy",
+    "read_policies",
+    "unmarshal_body",
+    "unmarshal_request",
+    "validate_response",
+]
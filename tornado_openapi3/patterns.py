@@ -0,0 +1,325 @@
+import functools
+import logging
+import re
+import threading
+import typing
+import weakref
+
+from jsonschema.exceptions import ValidationError  # type: ignore[import-untyped]
+import jsonschema.validators  # type: ignore[import-untyped]
+import openapi_core
+
+try:
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef]
+
+logger = logging.getLogger(__name__)
+
+#: A compiled pattern's search function, returning a truthy value on a match.
+Matcher = typing.Callable[[str], typing.Any]
+
+#: Regular expression nodes from :mod:`re`'s parser.
+_Node = typing.Tuple[typing.Any, typing.Any]
+
+_ANY = None
+
+
+class PatternReport(typing.NamedTuple):
+    """A schema ``pattern`` that may take exponential time to evaluate."""
+
+    #: A JSON pointer to the pattern within the specification.
+    location: str
+
+    #: The regular expression.
+    pattern: str
+
+    #: Why the pattern is considered dangerous.
+    reason: str
+
+
+class PatternEngine:
+    """Compiles schema patterns using Python's :mod:`re` module.
+
+    Python's regular expression engine backtracks, so some patterns can take
+    time exponential in the length of the string they are matched against.
+    See :class:`RE2Engine` and :class:`TimeoutEngine` for safer alternatives.
+
+    """
+
+    def compile(self, pattern: str) -> Matcher:
+        return re.compile(pattern).search
+
+
+class RE2Engine(PatternEngine):
+    """Compiles schema patterns using the linear-time `RE2`_ engine.
+
+    Requires the ``google-re2`` package. Patterns using features RE2 does not
+    support, such as backreferences and lookaround assertions, fall back to
+    Python's :mod:`re` module.
+
+    .. _RE2: https://github.com/google/re2
+
+    """
+
+    def __init__(self) -> None:
+        import re2  # type: ignore[import-untyped]
+
+        self.re2 = re2
+        self.options = re2.Options()
+        self.options.log_errors = False
+
+    def compile(self, pattern: str) -> Matcher:
+        try:
+            return self.re2.compile(pattern, options=self.options).search
+        except self.re2.error:
+            logger.warning(
+                "Pattern %r is not supported by RE2, falling back to re", pattern
+            )
+            return super().compile(pattern)
+
+
+class TimeoutEngine(PatternEngine):
+    """Compiles schema patterns that give up after ``timeout`` seconds.
+
+    Requires the ``regex`` package. Strings that cannot be matched in time
+    fail validation.
+
+    """
+
+    def __init__(self, timeout: float) -> None:
+        import regex  # type: ignore[import-untyped]
+
+        self.regex = regex
+        self.timeout = timeout
+
+    def compile(self, pattern: str) -> Matcher:
+        return functools.partial(
+            self.regex.compile(pattern).search, timeout=self.timeout
+        )
+
+
+_engine = PatternEngine()
+_compiled: typing.Dict[str, Matcher] = {}
+_reported: typing.Set[str] = set()
+_precompiled: "weakref.WeakSet[openapi_core.OpenAPI]" = weakref.WeakSet()
+_validator_classes: typing.Dict[type, type] = {}
+_lock = threading.Lock()
+
+
+def get_engine() -> PatternEngine:
+    """Returns the engine used to evaluate schema patterns."""
+    return _engine
+
+
+def set_engine(engine: PatternEngine) -> None:
+    """Sets the engine used to evaluate schema patterns.
+
+    Patterns already compiled by the previous engine are discarded.
+
+    """
+    global _engine
+    with _lock:
+        _engine = engine
+        _compiled.clear()
+
+
+def compile_pattern(pattern: str) -> Matcher:
+    """Returns a pattern compiled by the current engine, compiling it once."""
+    try:
+        return _compiled[pattern]
+    except KeyError:
+        matcher = _engine.compile(pattern)
+        with _lock:
+            _compiled[pattern] = matcher
+        return matcher
+
+
+def pattern_keyword(
+    validator: typing.Any, pattern: str, instance: typing.Any, schema: dict
+) -> typing.Iterator[ValidationError]:
+    """Validates the JSON Schema ``pattern`` keyword with precompiled patterns."""
+    if not validator.is_type(instance, "string"):
+        return
+    try:
+        matched = compile_pattern(pattern)(instance)
+    except TimeoutError:
+        yield ValidationError(
+            "{!r} could not be matched against {!r} in time".format(instance, pattern)
+        )
+        return
+    if not matched:
+        yield ValidationError("{!r} does not match {!r}".format(instance, pattern))
+
+
+def validator_class(cls: type) -> type:
+    """Extends a JSON Schema validator class to use precompiled patterns."""
+    try:
+        return _validator_classes[cls]
+    except KeyError:
+        extended = jsonschema.validators.extend(cls, {"pattern": pattern_keyword})
+        _validator_classes[cls] = extended
+        return extended
+
+
+def find_patterns(
+    spec: openapi_core.OpenAPI,
+) -> typing.Iterator[typing.Tuple[str, str]]:
+    """Yields the location and value of every ``pattern`` in a specification."""
+    with spec.spec.open() as contents:
+        yield from _find_patterns(contents, "#")
+
+
+def _find_patterns(
+    value: typing.Any, location: str
+) -> typing.Iterator[typing.Tuple[str, str]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            child = "{}/{}".format(
+                location, str(key).replace("~", "~0").replace("/", "~1")
+            )
+            if key == "pattern" and isinstance(item, str):
+                yield child, item
+            else:
+                yield from _find_patterns(item, child)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _find_patterns(item, "{}/{}".format(location, index))
+
+
+def risk(pattern: str) -> typing.Optional[str]:
+    """Explains why a pattern may backtrack catastrophically, if it might.
+
+    This is a heuristic: it flags repeated groups that contain another
+    quantifier (such as ``(a+)+``) and repeated alternations whose branches
+    can match the same text (such as ``(a|aa)*``). Patterns it does not flag
+    may still be slow, and some it flags may be harmless.
+
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        return "invalid pattern: {}".format(e)
+    return _risk(list(parsed), repeated=False)
+
+
+def _risk(nodes: typing.List[_Node], repeated: bool) -> typing.Optional[str]:
+    for op, av in nodes:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, body = av
+            if repeated and high > 1:
+                return "nested quantifier"
+            unbounded = high == sre_parse.MAXREPEAT
+            reason = _risk(list(body), repeated or unbounded)
+            if reason:
+                return reason
+        elif op == sre_parse.SUBPATTERN:
+            reason = _risk(list(av[-1]), repeated)
+            if reason:
+                return reason
+        elif op == sre_parse.BRANCH:
+            branches = [list(branch) for branch in av[1]]
+            if repeated and _overlapping(branches):
+                return "repeated alternation with overlapping branches"
+            for branch in branches:
+                reason = _risk(branch, repeated)
+                if reason:
+                    return reason
+    return None
+
+
+def _overlapping(branches: typing.List[typing.List[_Node]]) -> bool:
+    seen: typing.Set[int] = set()
+    for branch in branches:
+        first = _first(branch)
+        if first is _ANY or first & seen:
+            return True
+        seen |= first
+    return False
+
+
+def _first(nodes: typing.List[_Node]) -> typing.Optional[typing.Set[int]]:
+    """Returns the characters a sequence may start with, or ``_ANY``."""
+    for op, av in nodes:
+        if op == sre_parse.AT:
+            continue
+        if op == sre_parse.LITERAL:
+            return {av}
+        if op == sre_parse.SUBPATTERN:
+            return _first(list(av[-1]))
+        if op == sre_parse.IN:
+            characters: typing.Set[int] = set()
+            for item_op, item_av in av:
+                if item_op == sre_parse.LITERAL:
+                    characters.add(item_av)
+                elif item_op == sre_parse.RANGE and item_av[1] - item_av[0] < 256:
+                    characters.update(range(item_av[0], item_av[1] + 1))
+                else:
+                    return _ANY
+            return characters
+        return _ANY
+    # An empty branch matches the empty string, which overlaps with anything.
+    return _ANY
+
+
+def analyze(spec: openapi_core.OpenAPI) -> typing.List[PatternReport]:
+    """Reports the patterns in a specification that may backtrack badly."""
+    reports = []
+    for location, pattern in find_patterns(spec):
+        reason = risk(pattern)
+        if reason:
+            reports.append(PatternReport(location, pattern, reason))
+    return reports
+
+
+def precompile(spec: openapi_core.OpenAPI) -> typing.List[PatternReport]:
+    """Compiles every pattern in a specification ahead of validation.
+
+    Called as specifications are compiled by
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler`, a
+    :class:`~tornado_openapi3.registry.SpecRegistry` or
+    :func:`~tornado_openapi3.client.compile_spec`. Potentially catastrophic
+    patterns are logged as warnings the first time they are seen, and returned.
+    Each specification object is only processed once.
+
+    """
+    if spec in _precompiled:
+        return []
+    _precompiled.add(spec)
+    reports = []
+    for location, pattern in find_patterns(spec):
+        try:
+            compile_pattern(pattern)
+        except Exception:
+            logger.warning("Could not compile pattern %r at %s", pattern, location)
+            continue
+        reason = risk(pattern)
+        if reason:
+            reports.append(PatternReport(location, pattern, reason))
+            if pattern not in _reported:
+                _reported.add(pattern)
+                logger.warning(
+                    "Pattern %r at %s may backtrack catastrophically (%s)",
+                    pattern,
+                    location,
+                    reason,
+                )
+    return reports
+
+
+__all__ = [
+    "Matcher",
+    "PatternEngine",
+    "PatternReport",
+    "RE2Engine",
+    "TimeoutEngine",
+    "analyze",
+    "compile_pattern",
+    "find_patterns",
+    "get_engine",
+    "pattern_keyword",
+    "precompile",
+    "risk",
+    "set_engine",
+    "validator_class",
+]
@@ -0,0 +1,153 @@
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+import typing
+
+import openapi_core
+from openapi_core.templating.paths.exceptions import PathError
+
+from tornado_openapi3 import validators
+from tornado_openapi3.requests import TornadoOpenAPIRequest
+
+logger = logging.getLogger(__name__)
+
+#: Headers whose values are kept in request summaries. All other header values,
+#: and every query argument value, are redacted.
+SAFE_HEADERS = frozenset(
+    ["Accept", "Content-Encoding", "Content-Length", "Content-Type"]
+)
+
+REDACTED = "<redacted>"
+
+
+class ValidationProfiler:
+    """Records profiles of requests that are slow to validate.
+
+    When a profiler is given to
+    :class:`~tornado_openapi3.handler.OpenAPIRequestHandler` (through its
+    ``openapi_validation_profiler`` application setting), request validation is
+    run under :mod:`cProfile`. Profiles of requests taking longer than
+    ``threshold`` seconds to validate are written to ``directory`` as
+    ``validation-<n>.prof``, which may be loaded with :mod:`pstats` or tools
+    such as snakeviz, alongside a ``validation-<n>.json`` summary of the
+    request: its operation, method, path template, redacted headers and query
+    arguments, body size and validation time.
+
+    At most ``max_profiles`` profiles are kept, the oldest being overwritten
+    first. Profiling slows down validation considerably, so only a
+    ``sample_rate`` fraction of requests are profiled.
+
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        threshold: float = 0.1,
+        max_profiles: int = 32,
+        sample_rate: float = 1.0,
+    ) -> None:
+        if max_profiles < 1:
+            raise ValueError("max_profiles must be at least 1")
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.directory = directory
+        self.threshold = threshold
+        self.max_profiles = max_profiles
+        self.sample_rate = sample_rate
+        self._written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextlib.contextmanager
+    def profile(
+        self, spec: openapi_core.OpenAPI, request: TornadoOpenAPIRequest
+    ) -> typing.Iterator[None]:
+        """Profiles the validation of a request performed within this context."""
+        if random.random() >= self.sample_rate:
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread.
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        if elapsed > self.threshold:
+            self.record(profiler, spec, request, elapsed)
+
+    def record(
+        self,
+        profiler: cProfile.Profile,
+        spec: openapi_core.OpenAPI,
+        request: TornadoOpenAPIRequest,
+        elapsed: float,
+    ) -> str:
+        """Writes a profile and request summary, returning the profile's path."""
+        with self._lock:
+            slot = self._written % self.max_profiles
+            self._written += 1
+        base = os.path.join(self.directory, "validation-{:03d}".format(slot))
+        summary = summarize(spec, request)
+        summary["elapsed"] = elapsed
+        summary["timestamp"] = time.time()
+        profiler.dump_stats(base + ".prof.tmp")
+        os.replace(base + ".prof.tmp", base + ".prof")
+        with open(base + ".json.tmp", "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(base + ".json.tmp", base + ".json")
+        logger.warning(
+            "Validating %s %s took %.3fs, profile written to %s.prof",
+            summary["method"],
+            summary["path"],
+            elapsed,
+            base,
+        )
+        return base + ".prof"
+
+
+def summarize(
+    spec: openapi_core.OpenAPI, request: TornadoOpenAPIRequest
+) -> typing.Dict[str, typing.Any]:
+    """Describes a request without revealing its contents.
+
+    Paths are given as their template in the specification, so that path
+    parameters are not recorded.
+
+    """
+    operation_id = None
+    path = None
+    try:
+        found_path, operation, _, _, _ = validators.request_unmarshaller(
+            spec
+        )._find_path(request)
+    except PathError:
+        pass
+    else:
+        operation_id = operation.getkey("operationId")
+        path = found_path.parts[-1]
+    return {
+        "operationId": operation_id,
+        "method": request.method.upper(),
+        "path": path,
+        "headers": {
+            name: value if name in SAFE_HEADERS else REDACTED
+            for name, value in request.request.headers.get_all()
+        },
+        "query": {name: REDACTED for name in request.parameters.query},
+        "body_size": len(request.request.body or b""),
+    }
+
+
+__all__ = ["REDACTED", "SAFE_HEADERS", "ValidationProfiler", "summarize"]
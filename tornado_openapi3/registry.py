@@ -0,0 +1,130 @@
+import copy
+import threading
+import typing
+
+import openapi_core
+
+from tornado_openapi3 import operations, patterns
+from tornado_openapi3.types import Deserializer, Formatter
+from tornado_openapi3.util import digest
+
+
+class SpecRegistry:
+    """A collection of OpenAPI 3 specifications mounted at URL prefixes.
+
+    Allows a single :class:`tornado.web.Application` to serve several APIs
+    (for example, ``/v1``, ``/v2`` and an administrative API), each validated
+    against its own specification. Each specification is compiled once, the
+    first time a request is made to it, and shared by every handler. The
+    policies of its operations are read, and its patterns compiled, as it is
+    compiled (see :func:`~tornado_openapi3.operations.read_policies` and
+    :func:`~tornado_openapi3.patterns.precompile`).
+
+    Identical component definitions (schemas, parameters, responses and so
+    on) are shared in memory between the specifications in a registry, so
+    versions of an API with largely overlapping schemas do not each keep their
+    own copies.
+
+    To use a registry, pass it to your application as the ``openapi_registry``
+    setting. :class:`~tornado_openapi3.handler.OpenAPIRequestHandler` will then
+    validate each request against the specification mounted at the longest
+    prefix matching its path.
+
+    """
+
+    def __init__(self) -> None:
+        self._prefixes: typing.List[str] = []
+        self._specs: typing.Dict[str, dict] = {}
+        self._configs: typing.Dict[str, openapi_core.Config] = {}
+        self._compiled: typing.Dict[str, openapi_core.OpenAPI] = {}
+        self._components: typing.Dict[bytes, typing.Any] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        prefix: str,
+        spec_dict: dict,
+        custom_formatters: typing.Optional[typing.Dict[str, Formatter]] = None,
+        custom_media_type_deserializers: typing.Optional[
+            typing.Dict[str, Deserializer]
+        ] = None,
+    ) -> None:
+        """Mounts a specification at a URL prefix.
+
+        Requests whose path is the prefix or begins with the prefix followed by
+        a ``/`` will be validated against this specification. If the
+        specification does not list any servers, the prefix is used as its
+        server URL so that its paths are matched relative to the prefix.
+
+        """
+        prefix = "/" + prefix.strip("/") if prefix.strip("/") else ""
+        if prefix in self._specs:
+            raise ValueError("A spec is already mounted at {!r}".format(prefix))
+        spec_dict = self._share_components(spec_dict)
+        if not spec_dict.get("servers"):
+            spec_dict["servers"] = [{"url": prefix or "/"}]
+        custom_formatters = custom_formatters or dict()
+        self._configs[prefix] = openapi_core.Config(
+            extra_format_unmarshallers={
+                format: formatter.unmarshal
+                for format, formatter in custom_formatters.items()
+            },
+            extra_format_validators={
+                format: formatter.validate
+                for format, formatter in custom_formatters.items()
+            },
+            extra_media_type_deserializers=custom_media_type_deserializers or dict(),
+        )
+        self._specs[prefix] = spec_dict
+        self._prefixes = sorted(self._specs, key=len, reverse=True)
+
+    def prefix(self, path: str) -> typing.Optional[str]:
+        """Returns the longest mounted prefix matching a path."""
+        for prefix in self._prefixes:
+            if path.startswith(prefix) and path[len(prefix) : len(prefix) + 1] in (
+                "",
+                "/",
+            ):
+                return prefix
+        return None
+
+    def spec_dict(self, path: str) -> typing.Optional[dict]:
+        """Returns the specification document for a path, if one is mounted."""
+        prefix = self.prefix(path)
+        return None if prefix is None else self._specs[prefix]
+
+    def spec(self, path: str) -> typing.Optional[openapi_core.OpenAPI]:
+        """Returns the compiled specification for a path, if one is mounted."""
+        prefix = self.prefix(path)
+        if prefix is None:
+            return None
+        try:
+            return self._compiled[prefix]
+        except KeyError:
+            with self._lock:
+                if prefix not in self._compiled:
+                    spec = openapi_core.OpenAPI.from_dict(
+                        self._specs[prefix], config=self._configs[prefix]
+                    )
+                    operations.read_policies(spec)
+                    patterns.precompile(spec)
+                    self._compiled[prefix] = spec
+            return self._compiled[prefix]
+
+    def _share_components(self, spec_dict: dict) -> dict:
+        spec_dict = copy.copy(spec_dict)
+        components = spec_dict.get("components")
+        if not isinstance(components, dict):
+            return spec_dict
+        spec_dict["components"] = components = dict(components)
+        for section, definitions in components.items():
+            if not isinstance(definitions, dict):
+                continue
+            components[section] = {
+                name: self._components.setdefault(digest(definition), definition)
+                for name, definition in definitions.items()
+            }
+        return spec_dict
+
+
+__all__ = ["SpecRegistry"]
@@ -6,7 +6,97 @@ from openapi_core.validation.request.datatypes import RequestParameters
 
 from tornado.httpclient import HTTPRequest
 from tornado.httputil import HTTPServerRequest, parse_cookie
-from werkzeug.datastructures import ImmutableMultiDict, Headers
+from werkzeug.datastructures import ImmutableMultiDict
+
+from tornado_openapi3.headers import TornadoHeaders
+from tornado_openapi3.util import LRUCache
+
+ParsedURL = typing.Tuple[str, str, str, "ImmutableMultiDict[str, str]"]
+
+#: Parsed request URLs (scheme, host, path and query arguments), keyed by URL.
+#: Adjust its ``maxsize`` to tune caching, or set it to zero to disable it.
+url_cache: LRUCache[str, ParsedURL] = LRUCache(maxsize=1024)
+
+#: Parsed cookies, keyed by the values of a request's ``Cookie`` headers.
+#: Adjust its ``maxsize`` to tune caching, or set it to zero to disable it.
+cookie_cache: LRUCache[typing.Tuple[str, ...], "ImmutableMultiDict[str, str]"] = (
+    LRUCache(maxsize=1024)
+)
+
+
+def _parse_url(url: str) -> ParsedURL:
+    parsed = url_cache.get(url)
+    if parsed is None:
+        parts = urllib.parse.urlparse(url)
+        parsed = (
+            parts.scheme,
+            parts.netloc,
+            parts.path,
+            ImmutableMultiDict(parse_qsl(parts.query)),
+        )
+        url_cache.set(url, parsed)
+    return parsed
+
+
+def _parse_cookies(headers: typing.List[str]) -> "ImmutableMultiDict[str, str]":
+    key = tuple(headers)
+    parsed = cookie_cache.get(key)
+    if parsed is None:
+        cookies = {}
+        for values in headers:
+            cookies.update(parse_cookie(values))
+        parsed = ImmutableMultiDict(cookies)
+        cookie_cache.set(key, parsed)
+    return parsed
+
+
+class FormBody:
+    """A form request body, along with the arguments Tornado parsed from it.
+
+    Form bodies are parsed by Tornado as they are received (populating
+    :attr:`~tornado.httputil.HTTPServerRequest.body_arguments` and
+    :attr:`~tornado.httputil.HTTPServerRequest.files`). Request bodies of this
+    type hand those arguments on to validation, so the body is not parsed a
+    second time. The body itself is referenced rather than copied.
+
+    Deserializers of custom media types are passed the :attr:`body` as bytes.
+
+    """
+
+    def __init__(
+        self, body: bytes, arguments: "ImmutableMultiDict[str, typing.Any]"
+    ) -> None:
+        #: The request body, as Tornado received it.
+        self.body = body
+
+        #: The form's fields, as openapi-core's form deserializers return them.
+        self.arguments = arguments
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+
+def _form_body(request: HTTPServerRequest) -> typing.Optional[FormBody]:
+    if not request.body_arguments and not request.files:
+        return None
+    if request.files:
+        fields: typing.List[typing.Tuple[str, typing.Any]] = [
+            (name, value)
+            for name, values in request.body_arguments.items()
+            for value in values
+        ]
+        fields.extend(
+            (name, file.body) for name, files in request.files.items() for file in files
+        )
+    else:
+        # Like openapi-core, omit blank values from urlencoded forms.
+        fields = [
+            (name, value.decode("utf-8", errors="replace"))
+            for name, values in request.body_arguments.items()
+            for value in values
+            if value
+        ]
+    return FormBody(request.body, ImmutableMultiDict(fields))
 
 
 class TornadoOpenAPIRequest:
@@ -16,30 +106,27 @@ class TornadoOpenAPIRequest:
         Supports both :class:`tornado.httpclient.HTTPRequest` and
         :class:`tornado.httputil.HTTPServerRequest` objects.
 
+        Parsed URLs and cookies are cached (see :data:`url_cache` and
+        :data:`cookie_cache`), and the immutable query and cookie parameters
+        are shared between requests with identical URLs and cookies.
+
         """
         self.request = request
         if isinstance(request, HTTPRequest):
-            parts = urllib.parse.urlparse(request.url)
+            url = request.url
         else:
-            parts = urllib.parse.urlparse(request.full_url())
-        protocol = parts.scheme
-        host = parts.netloc
-        path = parts.path
-        query_arguments = parse_qsl(parts.query)
-        self.protocol = protocol
-        self.host = host
-        self.path = path
-        cookies = {}
-        for values in request.headers.get_list("Cookie"):
-            cookies.update(parse_cookie(values))
+            url = request.full_url()
+        self.protocol, self.host, self.path, query = _parse_url(url)
         self.parameters = RequestParameters(
-            query=ImmutableMultiDict(query_arguments),
-            header=Headers(request.headers.get_all()),
-            cookie=ImmutableMultiDict(cookies),
+            query=query,
+            header=TornadoHeaders(request.headers),
+            cookie=_parse_cookies(request.headers.get_list("Cookie")),
         )
         self.content_type = request.headers.get(
             "Content-Type", "application/x-www-form-urlencoded"
         )
+        self._raw_body: typing.Optional[bytes] = None
+        self._body: typing.Optional[bytes] = None
 
     @property
     def host_url(self) -> str:
@@ -52,7 +139,20 @@ class TornadoOpenAPIRequest:
 
     @property
     def body(self) -> typing.Optional[bytes]:
-        return self.request.body
+        """The request body.
+
+        Form bodies already parsed by Tornado are returned as a
+        :class:`FormBody`, which stands in for the body's bytes during
+        validation.
+
+        """
+        body = self.request.body
+        if isinstance(self.request, HTTPRequest) or not body:
+            return body
+        if body is not self._raw_body:
+            self._raw_body = body
+            self._body = typing.cast(bytes, _form_body(self.request)) or body
+        return self._body
 
 
-__all__ = ["TornadoOpenAPIRequest"]
+__all__ = ["FormBody", "TornadoOpenAPIRequest", "cookie_cache", "url_cache"]
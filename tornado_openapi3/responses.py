@@ -1,11 +1,12 @@
 from tornado.httpclient import HTTPResponse
-from werkzeug.datastructures import Headers
+
+from tornado_openapi3.headers import TornadoHeaders
 
 
 class TornadoOpenAPIResponse:
     def __init__(self, response: HTTPResponse) -> None:
         self.status_code = response.code
-        self.headers = Headers(response.headers.get_all())
+        self.headers = TornadoHeaders(response.headers)
         self.content_type = response.headers.get("Content-Type", "text/html")
         self.data = response.body
 
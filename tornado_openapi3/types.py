@@ -1,6 +1,11 @@
 import typing
 import typing_extensions
 
+#: A type representing an OpenAPI deserializer that accepts a :class:`memoryview`
+#: of the body, which may be sliced without copying it (see
+#: :func:`~tornado_openapi3.deserializers.buffered`).
+BufferDeserializer = typing.Callable[[memoryview], typing.Any]
+
 #: A type representing an OpenAPI deserializer.
 Deserializer = typing.Callable[[bytes], typing.Any]
 
@@ -15,3 +20,21 @@ class Formatter(typing_extensions.Protocol):
     def unmarshal(self, value: str) -> typing.Any:  # pragma: no cover
         """Translate the value into a Python object."""
         ...
+
+
+class AsyncFormatter(typing_extensions.Protocol):
+    """A type representing an OpenAPI formatter that validates values in batches.
+
+    See :class:`~tornado_openapi3.formats.BatchFormatter`.
+
+    """
+
+    async def validate_many(
+        self, values: typing.Sequence[str]
+    ) -> typing.Sequence[bool]:  # pragma: no cover
+        """Validate that each of the values matches the expected format."""
+        ...
+
+    def unmarshal(self, value: str) -> typing.Any:  # pragma: no cover
+        """Translate the value into a Python object."""
+        ...
@@ -1,10 +1,106 @@
+import collections
+import hashlib
+import json
+import threading
+import typing
+
 import ietfparse.headers
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
 
 def parse_mimetype(content_type: str) -> str:
-    parsed = ietfparse.headers.parse_content_type(content_type)
+    # Parameters are not needed, and malformed ones would fail to parse.
+    parsed = ietfparse.headers.parse_content_type(content_type.partition(";")[0])
     return "{}/{}{}".format(
         parsed.content_type,
         parsed.content_subtype,
         "+{}".format(parsed.content_suffix) if parsed.content_suffix else "",
     )
+
+
+def json_dumps(value: typing.Any) -> bytes:
+    """Serializes a value as compact JSON, using ``orjson`` if it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def digest(value: typing.Any) -> bytes:
+    """Hashes a JSON-like value, such as a specification or one of its parts."""
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=repr).encode()
+    ).digest()
+
+
+def is_json(content_type: str) -> bool:
+    mimetype = parse_mimetype(content_type)
+    return mimetype == "application/json" or mimetype.endswith("+json")
+
+
+class LRUCache(typing.Generic[K, V]):
+    """A thread-safe, bounded mapping discarding the least recently used items.
+
+    Counts cache hits and misses to help with tuning its size. A cache with a
+    ``maxsize`` of zero stores nothing.
+
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self._items: "collections.OrderedDict[K, V]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """The maximum number of items kept in the cache."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def get(self, key: K) -> typing.Optional[V]:
+        """Returns a cached value, or ``None`` if it is not in the cache."""
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._items[key]
+
+    def set(self, key: K, value: V) -> None:
+        """Stores a value, evicting the least recently used item if full."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+
+    def clear(self) -> None:
+        """Discards all items and resets the hit and miss counters."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self) -> None:
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
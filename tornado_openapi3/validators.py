@@ -0,0 +1,348 @@
+import copy
+import itertools
+import threading
+import typing
+import weakref
+
+from jsonschema_path import SchemaPath
+import openapi_core
+from openapi_core.deserializing.media_types.datatypes import DeserializerCallable
+from openapi_core.deserializing.media_types.factories import (
+    MediaTypeDeserializersFactory,
+)
+from openapi_core.unmarshalling.request.unmarshallers import (
+    APICallRequestUnmarshaller,
+)
+from openapi_core.unmarshalling.response.unmarshallers import (
+    APICallResponseUnmarshaller,
+)
+from openapi_core.unmarshalling.schemas.factories import SchemaUnmarshallersFactory
+from openapi_core.unmarshalling.schemas.unmarshallers import SchemaUnmarshaller
+from openapi_core.validation.schemas.exceptions import InvalidSchemaValue
+from openapi_core.validation.schemas.factories import SchemaValidatorsFactory
+
+from tornado_openapi3 import discriminators, limits, patterns
+from tornado_openapi3.requests import FormBody
+
+_request_unmarshallers: typing.MutableMapping[
+    openapi_core.OpenAPI,
+    typing.Dict[typing.Tuple[typing.Optional[int], bool], APICallRequestUnmarshaller],
+] = weakref.WeakKeyDictionary()
+_response_unmarshallers: typing.MutableMapping[
+    openapi_core.OpenAPI,
+    typing.Dict[typing.Optional[int], APICallResponseUnmarshaller],
+] = weakref.WeakKeyDictionary()
+
+
+class SchemaErrors(typing.Iterable[Exception]):
+    """The errors found validating a value, followed lazily by any others.
+
+    Validation stops once a :class:`CappedSchemaValidator` has found enough
+    errors to reject a value. Iterating over this object yields the errors
+    already found, then resumes validation to find the rest on demand, so
+    error handlers that want every detail can still have it while those that
+    do not pay nothing for it.
+
+    """
+
+    def __init__(
+        self, found: typing.List[Exception], remaining: typing.Iterator[Exception]
+    ) -> None:
+        self.found = found
+        self.remaining = remaining
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> typing.Iterator[Exception]:
+        index = 0
+        while True:
+            with self._lock:
+                if index == len(self.found):
+                    try:
+                        self.found.append(next(self.remaining))
+                    except StopIteration:
+                        return
+                error = self.found[index]
+            yield error
+            index += 1
+
+    def __repr__(self) -> str:
+        return "{}({!r}, ...)".format(type(self).__name__, self.found)
+
+
+class CappedSchemaValidator(discriminators.DiscriminatingSchemaValidator):
+    """A schema validator that stops after finding ``max_errors`` errors.
+
+    Openapi-core collects every error in a value before rejecting it, which
+    for a large array with a systematic problem can mean thousands of error
+    objects. This validator rejects a value as soon as ``max_errors`` errors
+    have been found, reporting them as :class:`SchemaErrors`.
+
+    """
+
+    def __init__(
+        self,
+        schema: SchemaPath,
+        validator: typing.Any,
+        max_errors: int = 1,
+        discriminators: typing.Optional[discriminators.Discriminators] = None,
+    ) -> None:
+        super().__init__(schema, validator, discriminators)
+        self.max_errors = max_errors
+
+    def validate(self, value: typing.Any) -> None:
+        errors = self.validator.iter_errors(value)
+        found = list(itertools.islice(errors, self.max_errors))
+        if found:
+            schema_type = self.schema.getkey("type", "any")
+            raise InvalidSchemaValue(
+                value, schema_type, schema_errors=SchemaErrors(found, errors)
+            )
+
+    def evolve(self, schema: SchemaPath) -> "CappedSchemaValidator":
+        evolved = typing.cast(CappedSchemaValidator, super().evolve(schema))
+        evolved.max_errors = self.max_errors
+        return evolved
+
+
+class CachingSchemaValidatorsFactory(SchemaValidatorsFactory):
+    """A schema validators factory that compiles each schema only once.
+
+    Openapi-core builds a new JSON Schema validator (including a copy of its
+    format checker) every time a value is validated. This factory wraps an
+    existing one and keeps the validator built for each schema, so repeated
+    validation against the same operation reuses it.
+
+    A caching factory must only be used by a single unmarshaller, as cached
+    validators are bound to that unmarshaller's format configuration.
+
+    If ``max_errors`` is given, the validators built are
+    :class:`CappedSchemaValidator` objects that stop at that many errors.
+
+    Schema ``pattern`` keywords are evaluated with patterns precompiled by
+    :mod:`tornado_openapi3.patterns`. If ``counted`` is true, keyword
+    evaluations are counted against any :mod:`~tornado_openapi3.limits` in
+    effect. Values of ``oneOf``
+    and ``anyOf`` schemas with a ``discriminator`` are unmarshalled with the
+    alternative it selects, rather than by trying each alternative (see
+    :mod:`tornado_openapi3.discriminators`).
+
+    """
+
+    def __init__(
+        self,
+        factory: SchemaValidatorsFactory,
+        max_errors: typing.Optional[int] = None,
+        counted: bool = False,
+    ) -> None:
+        super().__init__(factory.schema_validator_class, factory.format_checker)
+        self.factory = copy.copy(factory)
+        validator_class = patterns.validator_class(factory.schema_validator_class)
+        self.factory.schema_validator_class = (
+            limits.validator_class(validator_class) if counted else validator_class
+        )
+        self.max_errors = max_errors
+        self.cache: typing.Dict[SchemaPath, typing.Any] = {}
+        self.discriminators: discriminators.Discriminators = {}
+
+    def create(
+        self,
+        schema: SchemaPath,
+        format_validators: typing.Optional[typing.Any] = None,
+        extra_format_validators: typing.Optional[typing.Any] = None,
+    ) -> typing.Any:
+        try:
+            return self.cache[schema]
+        except KeyError:
+            validator = self.factory.create(
+                schema,
+                format_validators=format_validators,
+                extra_format_validators=extra_format_validators,
+            )
+            if self.max_errors is None:
+                validator = discriminators.DiscriminatingSchemaValidator(
+                    validator.schema, validator.validator, self.discriminators
+                )
+            else:
+                validator = CappedSchemaValidator(
+                    validator.schema,
+                    validator.validator,
+                    self.max_errors,
+                    self.discriminators,
+                )
+            self.cache[schema] = validator
+            return validator
+
+
+class CachingSchemaUnmarshallersFactory(SchemaUnmarshallersFactory):
+    """A schema unmarshallers factory that builds each unmarshaller only once.
+
+    See :class:`CachingSchemaValidatorsFactory`.
+
+    """
+
+    def __init__(
+        self,
+        factory: SchemaUnmarshallersFactory,
+        max_errors: typing.Optional[int] = None,
+        counted: bool = False,
+    ) -> None:
+        super().__init__(
+            CachingSchemaValidatorsFactory(
+                factory.schema_validators_factory, max_errors, counted
+            ),
+            factory.types_unmarshaller,
+            factory.format_unmarshallers,
+        )
+        self.cache: typing.Dict[SchemaPath, SchemaUnmarshaller] = {}
+
+    def create(
+        self,
+        schema: SchemaPath,
+        format_validators: typing.Optional[typing.Any] = None,
+        format_unmarshallers: typing.Optional[typing.Any] = None,
+        extra_format_validators: typing.Optional[typing.Any] = None,
+        extra_format_unmarshallers: typing.Optional[typing.Any] = None,
+    ) -> SchemaUnmarshaller:
+        try:
+            return self.cache[schema]
+        except KeyError:
+            unmarshaller = super().create(
+                schema,
+                format_validators=format_validators,
+                format_unmarshallers=format_unmarshallers,
+                extra_format_validators=extra_format_validators,
+                extra_format_unmarshallers=extra_format_unmarshallers,
+            )
+            self.cache[schema] = unmarshaller
+            return unmarshaller
+
+
+U = typing.TypeVar("U", APICallRequestUnmarshaller, APICallResponseUnmarshaller)
+
+
+def _with_caching_factories(
+    unmarshaller: U, max_errors: typing.Optional[int] = None, counted: bool = False
+) -> U:
+    unmarshaller = copy.copy(unmarshaller)
+    unmarshaller.schema_validators_factory = CachingSchemaValidatorsFactory(
+        unmarshaller.schema_validators_factory, max_errors, counted
+    )
+    unmarshaller.schema_unmarshallers_factory = CachingSchemaUnmarshallersFactory(
+        unmarshaller.schema_unmarshallers_factory, max_errors, counted
+    )
+    unmarshaller.media_type_deserializers_factory = _form_deserializers_factory(
+        unmarshaller.media_type_deserializers_factory
+    )
+    if unmarshaller.extra_media_type_deserializers:
+        unmarshaller.extra_media_type_deserializers = {
+            mimetype: _raw_body_loads(loads)
+            for mimetype, loads in unmarshaller.extra_media_type_deserializers.items()
+        }
+    setattr(
+        unmarshaller,
+        "_deserialise_media_type",
+        _checked_deserializer(unmarshaller._deserialise_media_type),
+    )
+    return unmarshaller
+
+
+def _form_deserializers_factory(
+    factory: MediaTypeDeserializersFactory,
+) -> MediaTypeDeserializersFactory:
+    factory = copy.copy(factory)
+    factory.media_type_deserializers = dict(factory.media_type_deserializers)
+    for mimetype in ("application/x-www-form-urlencoded", "multipart/form-data"):
+        loads = factory.media_type_deserializers.get(mimetype)
+        if loads is not None:
+            factory.media_type_deserializers[mimetype] = _form_loads(loads)
+    return factory
+
+
+def _form_loads(loads: DeserializerCallable) -> DeserializerCallable:
+    def form_loads(value: bytes, **parameters: str) -> typing.Any:
+        if isinstance(value, FormBody):
+            return value.arguments
+        return loads(value, **parameters)
+
+    return form_loads
+
+
+def _raw_body_loads(loads: DeserializerCallable) -> DeserializerCallable:
+    def raw_body_loads(value: typing.Any, **parameters: str) -> typing.Any:
+        if isinstance(value, FormBody):
+            value = value.body
+        return loads(value, **parameters)
+
+    return raw_body_loads
+
+
+def _checked_deserializer(
+    deserialise: typing.Callable[..., typing.Any],
+) -> typing.Callable[..., typing.Any]:
+    def checked(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        value = deserialise(*args, **kwargs)
+        budget = limits.current_budget()
+        if budget is not None:
+            budget.check_value(value)
+        return value
+
+    return checked
+
+
+def request_unmarshaller(
+    spec: openapi_core.OpenAPI,
+    max_errors: typing.Optional[int] = None,
+    counted: bool = False,
+) -> APICallRequestUnmarshaller:
+    """Returns a request unmarshaller for a spec that reuses compiled validators.
+
+    The unmarshaller is created once per spec object (and value of
+    ``max_errors`` and ``counted``) and kept for as long as the spec itself is
+    alive. If ``max_errors`` is given, schema validation stops after finding
+    that many errors (see :class:`CappedSchemaValidator`). If ``counted`` is
+    true, schema keyword evaluations are counted against the
+    :func:`~tornado_openapi3.limits.budget` in effect, which is only needed to
+    enforce :class:`~tornado_openapi3.limits.ValidationLimits`.
+
+    """
+    unmarshallers = _request_unmarshallers.setdefault(spec, {})
+    try:
+        return unmarshallers[max_errors, counted]
+    except KeyError:
+        unmarshaller = _with_caching_factories(
+            typing.cast(APICallRequestUnmarshaller, spec.request_unmarshaller),
+            max_errors,
+            counted,
+        )
+        unmarshallers[max_errors, counted] = unmarshaller
+        return unmarshaller
+
+
+def response_unmarshaller(
+    spec: openapi_core.OpenAPI, max_errors: typing.Optional[int] = None
+) -> APICallResponseUnmarshaller:
+    """Returns a response unmarshaller for a spec that reuses compiled validators.
+
+    See :func:`request_unmarshaller`.
+
+    """
+    unmarshallers = _response_unmarshallers.setdefault(spec, {})
+    try:
+        return unmarshallers[max_errors]
+    except KeyError:
+        unmarshaller = _with_caching_factories(
+            typing.cast(APICallResponseUnmarshaller, spec.response_unmarshaller),
+            max_errors,
+        )
+        unmarshallers[max_errors] = unmarshaller
+        return unmarshaller
+
+
+__all__ = [
+    "CachingSchemaUnmarshallersFactory",
+    "CachingSchemaValidatorsFactory",
+    "CappedSchemaValidator",
+    "SchemaErrors",
+    "request_unmarshaller",
+    "response_unmarshaller",
+]